@@ -0,0 +1,128 @@
+"""
+Book appointments with one doctor from many parallel clients and report
+throughput, the share of 409 conflicts and any double bookings.
+
+Every client picks random half-hour slots from a shared grid that is smaller
+than the number of attempts, so clients keep colliding on the same slots.
+
+Usage:
+    python -m benchmarks.bench_booking [--attempts 400] [--slots 150] [--clients 1 10 100]
+"""
+
+import argparse
+import asyncio
+import random
+from collections import Counter
+from datetime import datetime, time, timedelta
+from time import perf_counter
+
+from benchmarks.common import SessionLocal, issue_token, reset_database, seed_doctor
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import text
+from core.enums import WeekdayEnum
+from core.interval_index import appointment_index
+from models import Availability, Patient, User
+from routers.patients import patients_router
+
+GRID_START = datetime(2030, 1, 7, 8)
+
+
+def seed() -> tuple:
+    reset_database()
+    appointment_index.drop()
+    db = SessionLocal()
+    doctor_id = seed_doctor(db)
+    db.add_all(
+        Availability(
+            doctor_id=doctor_id,
+            weekday=weekday,
+            start_time=time(0, 0),
+            end_time=time(23, 59),
+            available=True,
+        )
+        for weekday in WeekdayEnum
+    )
+    user = User(
+        email="booking-patient@example.com",
+        first_name="Booking",
+        last_name="Patient",
+        hashed_password="not-a-real-hash",
+        role="patient",
+    )
+    db.add(user)
+    db.flush()
+    patient = Patient(user_id=user.id)
+    db.add(patient)
+    db.commit()
+    token = issue_token(user.id, "patient", patient_id=patient.id)
+    db.close()
+    return doctor_id, token
+
+
+def double_bookings() -> int:
+    with SessionLocal() as db:
+        return db.execute(
+            text(
+                "SELECT COUNT(*) FROM appointments a JOIN appointments b "
+                "ON a.doctor_id = b.doctor_id AND a.id < b.id "
+                "AND a.scheduled_start < b.scheduled_end "
+                "AND b.scheduled_start < a.scheduled_end"
+            )
+        ).scalar()
+
+
+async def drive(clients: int, attempts: int, slots: int) -> str:
+    doctor_id, token = seed()
+    app = FastAPI()
+    app.include_router(patients_router)
+    headers = {"Authorization": f"Bearer {token}"}
+    rng = random.Random(clients)
+    outcomes = Counter()
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        remaining = attempts
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                start = GRID_START + timedelta(minutes=30 * rng.randrange(slots))
+                response = await client.post(
+                    "/patients/create-new-appointment",
+                    headers=headers,
+                    json={
+                        "doctor_id": doctor_id,
+                        "scheduled_start": start.isoformat(),
+                        "scheduled_end": (start + timedelta(minutes=30)).isoformat(),
+                        "status": "scheduled",
+                    },
+                )
+                outcomes[response.status_code] += 1
+
+        started = perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = perf_counter() - started
+
+    return (
+        f"{clients:4} clients: {attempts / elapsed:7.0f} req/s, "
+        f"{outcomes[201]:4} booked, {outcomes[409] / attempts:6.1%} conflicts, "
+        f"{outcomes[503]} busy, other {sum(outcomes.values()) - outcomes[201] - outcomes[409] - outcomes[503]}, "
+        f"double bookings {double_bookings()}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--attempts", type=int, default=400)
+    parser.add_argument("--slots", type=int, default=150)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+    for clients in args.clients:
+        print(asyncio.run(drive(clients, args.attempts, args.slots)))
+
+
+if __name__ == "__main__":
+    main()
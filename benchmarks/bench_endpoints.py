@@ -0,0 +1,757 @@
+"""
+Load-test every route of the auth, admin, doctor and patient routers against
+a seeded synthetic dataset and write throughput and latency percentiles per
+endpoint to a JSON file.
+
+The dataset is bulk-inserted through the models into the local benchmark
+database, and requests go through the ASGI app in-process, so the run needs
+no network, MySQL, Redis or SMTP. Endpoints run one after another, each with
+the same number of requests at the same concurrency. Reads run before writes,
+and the rows a write endpoint consumes (appointments to report on, slots and
+users to delete) are created just before it runs.
+
+Pass --baseline with the JSON of an earlier run to fail when an endpoint's
+p95 latency regressed by more than --max-regression.
+
+Usage:
+    python -m benchmarks.bench_endpoints [--doctors 50] [--patients 500]
+        [--appointments 5000] [--records 2000] [--requests 100]
+        [--concurrency 10] [--output bench-endpoints.json]
+        [--baseline previous.json] [--max-regression 0.25]
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+from collections import Counter
+from datetime import datetime, time, timedelta, timezone
+from time import perf_counter
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from benchmarks.common import SessionLocal, engine, issue_token, reset_database
+import httpx
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from sqlalchemy import insert
+from core.enums import AppointmentStatusEnum, WeekdayEnum
+from core.interval_index import appointment_index
+from core.security import hash_password
+from deps.utils import normalize_specialization
+from models import Appointment, Availability, Doctor, MedicalRecord, Patient, User
+from routers.auth import auth_router
+from routers.doctors import doctors_router
+from routers.patients import patients_router
+from routers.users import users_router
+
+ROUTERS = (auth_router, users_router, doctors_router, patients_router)
+
+PASSWORD = "bench-password"
+SPECIALIZATIONS = [
+    "Cardiology",
+    "Dermatology",
+    "General Surgery",
+    "Neurology",
+    "Pediatrics",
+    "Orthopedic Surgery",
+    "Psychiatry",
+    "Ophthalmology",
+]
+SEED_EPOCH = datetime(2024, 1, 1, 8)
+REPORT_EPOCH = datetime(2029, 1, 1, 8)
+BOOKING_EPOCH = datetime(2030, 1, 7)
+WEEKDAYS = list(WeekdayEnum)
+# Bookable half hours of the seeded availability: 08:00-12:00 and 13:00-17:00
+BOOKABLE = [
+    timedelta(hours=hour, minutes=minute)
+    for hour in (8, 9, 10, 11, 13, 14, 15, 16)
+    for minute in (0, 30)
+]
+
+
+class Endpoint(NamedTuple):
+    method: str
+    path: str
+    expected: int
+    request: Callable[[int], dict]
+    prepare: Optional[Callable[[int], None]] = None
+
+
+class Dataset:
+    """
+    The IDs and tokens of the seeded rows the requests refer to.
+    """
+
+    def __init__(self):
+        self.admin_id = ""
+        self.doctor_ids: List[str] = []
+        self.patient_ids: List[str] = []
+        self.patient_user_ids: List[str] = []
+        self.slot_id = ""
+        self.record_patient_id = ""
+        self.record_doctor_id = ""
+        self.headers: Dict[str, dict] = {}
+        self.fixtures: List[str] = []
+
+
+def minute_slot(i: int, first_hour: int) -> tuple:
+    """
+    Give request i its own one-minute weekly slot, so template requests never
+    conflict with each other.
+    """
+    start = datetime.combine(SEED_EPOCH.date(), time(first_hour)) + timedelta(
+        minutes=i // len(WEEKDAYS)
+    )
+    return (
+        WEEKDAYS[i % len(WEEKDAYS)].value,
+        start.time().isoformat(),
+        (start + timedelta(minutes=1)).time().isoformat(),
+    )
+
+
+def seed(doctors: int, patients: int, appointments: int, records: int) -> Dataset:
+    reset_database()
+    appointment_index.drop()
+    rng = random.Random(0)
+    data = Dataset()
+    hashed = hash_password(PASSWORD)
+
+    def user(user_id: str, role: str) -> dict:
+        return {
+            "id": user_id,
+            "email": f"{user_id}@example.com",
+            "first_name": "Bench",
+            "last_name": role.title(),
+            "hashed_password": hashed,
+            "role": role,
+        }
+
+    data.admin_id = "admin-0"
+    data.doctor_ids = [f"doctor-{i}" for i in range(doctors)]
+    data.patient_ids = [f"patient-{i}" for i in range(patients)]
+    data.patient_user_ids = [f"patient-user-{i}" for i in range(patients)]
+
+    with SessionLocal() as db:
+        db.execute(
+            insert(User),
+            [user(data.admin_id, "admin")]
+            + [user(f"doctor-user-{i}", "doctor") for i in range(doctors)]
+            + [user(user_id, "patient") for user_id in data.patient_user_ids],
+        )
+        db.execute(
+            insert(Doctor),
+            [
+                {
+                    "id": doctor_id,
+                    "user_id": f"doctor-user-{i}",
+                    "specialization": SPECIALIZATIONS[i % len(SPECIALIZATIONS)],
+                    "specialization_key": normalize_specialization(
+                        SPECIALIZATIONS[i % len(SPECIALIZATIONS)]
+                    ),
+                }
+                for i, doctor_id in enumerate(data.doctor_ids)
+            ],
+        )
+        db.execute(
+            insert(Patient),
+            [
+                {
+                    "id": patient_id,
+                    "user_id": data.patient_user_ids[i],
+                    "insurance_provider": "Bench Mutual",
+                    "insurance_number": f"BM-{i:06}",
+                }
+                for i, patient_id in enumerate(data.patient_ids)
+            ],
+        )
+        db.execute(
+            insert(Availability),
+            [
+                {
+                    "id": f"slot-{doctor_id}-{weekday.value}-{hour}",
+                    "doctor_id": doctor_id,
+                    "weekday": weekday,
+                    "start_time": time(hour),
+                    "end_time": time(hour + 4),
+                    "available": True,
+                }
+                for doctor_id in data.doctor_ids
+                for weekday in WEEKDAYS
+                for hour in (8, 13)
+            ],
+        )
+
+        # Appointments of one doctor follow each other every half hour
+        rows = []
+        for i in range(appointments):
+            start = SEED_EPOCH + timedelta(minutes=30 * (i // doctors))
+            rows.append(
+                {
+                    "id": f"appointment-{i}",
+                    "doctor_id": data.doctor_ids[i % doctors],
+                    "patient_id": (
+                        data.patient_ids[0]
+                        if i % doctors == 0
+                        else rng.choice(data.patient_ids)
+                    ),
+                    "scheduled_start": start,
+                    "scheduled_end": start + timedelta(minutes=30),
+                    "status": AppointmentStatusEnum.completed,
+                }
+            )
+        db.execute(insert(Appointment), rows)
+        db.execute(
+            insert(MedicalRecord),
+            [
+                {
+                    "id": f"record-{i}",
+                    "doctor_id": row["doctor_id"],
+                    "patient_id": row["patient_id"],
+                    "appointment_id": row["id"],
+                    "notes": "Routine check-up, no findings.",
+                    "created_at": row["scheduled_end"],
+                }
+                for i, row in enumerate(rows[:records])
+            ],
+        )
+        db.commit()
+
+    data.slot_id = f"slot-{data.doctor_ids[0]}-monday-8"
+    # Doctor 0 sees patient 0 in every one of its appointments
+    data.record_doctor_id = data.doctor_ids[0]
+    data.record_patient_id = data.patient_ids[0]
+    data.headers = {
+        "admin": auth(issue_token(data.admin_id, "admin")),
+        "doctor": auth(
+            issue_token("doctor-user-0", "doctor", doctor_id=data.doctor_ids[0])
+        ),
+        "patient": auth(
+            issue_token(
+                data.patient_user_ids[0], "patient", patient_id=data.patient_ids[0]
+            )
+        ),
+    }
+    return data
+
+
+def auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def build_endpoints(data: Dataset) -> List[Endpoint]:
+    admin, doctor, patient = (data.headers[r] for r in ("admin", "doctor", "patient"))
+    doctor_id = data.doctor_ids[0]
+
+    def get(path: str, headers: dict, **params) -> Callable[[int], dict]:
+        return lambda i: {"url": path, "headers": headers, "params": params}
+
+    def new_user(kind: str, i: int, **extra) -> dict:
+        return {
+            "email": f"bench-{kind}-{i}@example.com",
+            "first_name": "New",
+            "last_name": kind.title(),
+            "role": kind if kind != "self-patient" else "patient",
+            "hashed_password": PASSWORD,
+            **extra,
+        }
+
+    def booking(i: int) -> dict:
+        start = (
+            BOOKING_EPOCH
+            + timedelta(days=i // len(BOOKABLE))
+            + BOOKABLE[i % len(BOOKABLE)]
+        )
+        return {
+            "url": "/patients/create-new-appointment",
+            "headers": patient,
+            "json": {
+                "doctor_id": doctor_id,
+                "scheduled_start": start.isoformat(),
+                "scheduled_end": (start + timedelta(minutes=30)).isoformat(),
+                "status": AppointmentStatusEnum.scheduled.value,
+            },
+        }
+
+    def template(i: int, first_hour: int) -> List[dict]:
+        weekday, start, end = minute_slot(i, first_hour)
+        return [{"weekday": weekday, "start_time": start, "end_time": end}]
+
+    def prepare_reports(n: int):
+        data.fixtures = [f"report-appointment-{i}" for i in range(n)]
+        with SessionLocal() as db:
+            db.execute(
+                insert(Appointment),
+                [
+                    {
+                        "id": appointment_id,
+                        "doctor_id": doctor_id,
+                        "patient_id": data.patient_ids[0],
+                        "scheduled_start": REPORT_EPOCH + timedelta(minutes=30 * i),
+                        "scheduled_end": REPORT_EPOCH + timedelta(minutes=30 * i + 30),
+                        "status": AppointmentStatusEnum.completed,
+                    }
+                    for i, appointment_id in enumerate(data.fixtures)
+                ],
+            )
+            db.commit()
+
+    def prepare_slots(n: int):
+        data.fixtures = [f"delete-slot-{i}" for i in range(n)]
+        with SessionLocal() as db:
+            db.execute(
+                insert(Availability),
+                [
+                    {
+                        "id": slot_id,
+                        "doctor_id": doctor_id,
+                        "weekday": WEEKDAYS[i % len(WEEKDAYS)],
+                        "start_time": time(6),
+                        "end_time": time(7),
+                        "available": True,
+                    }
+                    for i, slot_id in enumerate(data.fixtures)
+                ],
+            )
+            db.commit()
+
+    def prepare_users(n: int):
+        data.fixtures = [f"delete-user-{i}" for i in range(n)]
+        with SessionLocal() as db:
+            db.execute(
+                insert(User),
+                [
+                    {
+                        "id": user_id,
+                        "email": f"{user_id}@example.com",
+                        "first_name": "Delete",
+                        "last_name": "Me",
+                        "hashed_password": "not-a-real-hash",
+                        "role": "patient",
+                    }
+                    for user_id in data.fixtures
+                ],
+            )
+            db.commit()
+
+    # Calendar window over the first week of seeded appointments
+    week = {
+        "from": SEED_EPOCH.date().isoformat(),
+        "to": (SEED_EPOCH.date() + timedelta(days=7)).isoformat(),
+    }
+
+    return [
+        # Reads
+        Endpoint(
+            "POST",
+            "/auth/login",
+            200,
+            lambda i: {
+                "url": "/auth/login",
+                "data": {
+                    "username": f"{data.patient_user_ids[i % len(data.patient_user_ids)]}@example.com",
+                    "password": PASSWORD,
+                },
+            },
+        ),
+        Endpoint("GET", "/admin/all-users", 200, get("/admin/all-users", admin)),
+        Endpoint(
+            "GET",
+            "/admin/user/{user_id}",
+            200,
+            lambda i: {
+                "url": f"/admin/user/{data.patient_user_ids[i % len(data.patient_user_ids)]}",
+                "headers": admin,
+            },
+        ),
+        Endpoint("GET", "/doctors/me", 200, get("/doctors/me", doctor)),
+        Endpoint(
+            "GET", "/doctors/all-doctors", 200, get("/doctors/all-doctors", doctor)
+        ),
+        Endpoint(
+            "GET",
+            "/doctors/search",
+            200,
+            lambda i: {
+                "url": "/doctors/search",
+                "headers": patient,
+                "params": {"q": ("card", "surg", "pediatric", "neurolgy")[i % 4]},
+            },
+        ),
+        Endpoint(
+            "GET", "/doctors/appointments", 200, get("/doctors/appointments", doctor)
+        ),
+        Endpoint(
+            "GET",
+            "/doctors/calendar",
+            200,
+            lambda i: {"url": "/doctors/calendar", "headers": doctor, "params": week},
+        ),
+        Endpoint(
+            "GET",
+            "/doctors/medical-records",
+            200,
+            get("/doctors/medical-records", doctor),
+        ),
+        Endpoint(
+            "GET",
+            "/doctors/medical-records/{patient_id}",
+            200,
+            get(f"/doctors/medical-records/{data.record_patient_id}", doctor),
+        ),
+        Endpoint(
+            "GET",
+            "/patients/view-all-doctors",
+            200,
+            get("/patients/view-all-doctors", patient),
+        ),
+        Endpoint(
+            "GET",
+            "/patients/doctor/availability/{doctor_id}",
+            200,
+            lambda i: {
+                "url": f"/patients/doctor/availability/{data.doctor_ids[i % len(data.doctor_ids)]}",
+                "headers": patient,
+                "params": {"start_date": SEED_EPOCH.date().isoformat()},
+            },
+        ),
+        Endpoint(
+            "GET",
+            "/patients/doctor/appointments",
+            200,
+            get("/patients/doctor/appointments", patient),
+        ),
+        Endpoint(
+            "GET",
+            "/patients/calendar",
+            200,
+            lambda i: {"url": "/patients/calendar", "headers": patient, "params": week},
+        ),
+        Endpoint(
+            "GET",
+            "/patients/doctor/appointments/{doctor_id}",
+            200,
+            lambda i: {
+                "url": f"/patients/doctor/appointments/{data.doctor_ids[i % len(data.doctor_ids)]}",
+                "headers": patient,
+            },
+        ),
+        Endpoint(
+            "GET",
+            "/patients/medical-records/",
+            200,
+            get("/patients/medical-records/", patient),
+        ),
+        Endpoint(
+            "GET",
+            "/patients/medical-records/{doctor_id}",
+            200,
+            get(f"/patients/medical-records/{data.record_doctor_id}", patient),
+        ),
+        # Writes
+        Endpoint(
+            "POST",
+            "/patients/register-new-patient",
+            201,
+            lambda i: {
+                "url": "/patients/register-new-patient",
+                "json": new_user(
+                    "self-patient",
+                    i,
+                    insurance_provider="Bench Mutual",
+                    insurance_number=f"SP-{i:06}",
+                ),
+            },
+        ),
+        Endpoint(
+            "POST",
+            "/admin/register-new-admin",
+            201,
+            lambda i: {
+                "url": "/admin/register-new-admin",
+                "json": new_user("admin", i),
+            },
+        ),
+        Endpoint(
+            "POST",
+            "/admin/register-new-doctor",
+            201,
+            lambda i: {
+                "url": "/admin/register-new-doctor",
+                "headers": admin,
+                "json": new_user(
+                    "doctor",
+                    i,
+                    specialization=SPECIALIZATIONS[i % len(SPECIALIZATIONS)],
+                ),
+            },
+        ),
+        Endpoint(
+            "POST",
+            "/admin/register-new-patient",
+            201,
+            lambda i: {
+                "url": "/admin/register-new-patient",
+                "headers": admin,
+                "json": new_user(
+                    "patient",
+                    i,
+                    insurance_provider="Bench Mutual",
+                    insurance_number=f"AP-{i:06}",
+                ),
+            },
+        ),
+        Endpoint("POST", "/patients/create-new-appointment", 201, booking),
+        Endpoint(
+            "POST",
+            "/doctors/new-availability-slot",
+            201,
+            lambda i: {
+                "url": "/doctors/new-availability-slot",
+                "headers": doctor,
+                "json": dict(
+                    zip(
+                        ("weekday", "start_time", "end_time"),
+                        minute_slot(i, first_hour=0),
+                    ),
+                    doctor_id=doctor_id,
+                ),
+            },
+        ),
+        Endpoint(
+            "POST",
+            "/doctors/availability-template",
+            201,
+            lambda i: {
+                "url": "/doctors/availability-template",
+                "headers": doctor,
+                "json": {"slots": template(i, first_hour=18)},
+            },
+        ),
+        Endpoint(
+            "POST",
+            "/admin/availability-template",
+            201,
+            lambda i: {
+                "url": "/admin/availability-template",
+                "headers": admin,
+                "json": {
+                    "doctor_ids": data.doctor_ids[1:3],
+                    "slots": template(i, first_hour=18),
+                },
+            },
+        ),
+        Endpoint(
+            "PATCH",
+            "/doctors/availability/change-availability/{slot_id}",
+            200,
+            lambda i: {
+                "url": f"/doctors/availability/change-availability/{data.slot_id}",
+                "headers": doctor,
+            },
+        ),
+        Endpoint(
+            "POST",
+            "/doctors/new-medical-report/{appointment_id}",
+            201,
+            lambda i: {
+                "url": f"/doctors/new-medical-report/{data.fixtures[i]}",
+                "headers": doctor,
+                "json": {
+                    "patient_id": data.patient_ids[0],
+                    "doctor_id": doctor_id,
+                    "appointment_id": data.fixtures[i],
+                    "notes": "Follow-up in six months.",
+                },
+            },
+            prepare_reports,
+        ),
+        Endpoint(
+            "DELETE",
+            "/doctors/availability/delete-availability/{slot_id}",
+            200,
+            lambda i: {
+                "url": f"/doctors/availability/delete-availability/{data.fixtures[i]}",
+                "headers": doctor,
+            },
+            prepare_slots,
+        ),
+        Endpoint(
+            "DELETE",
+            "/admin/delete-user/{user_id}",
+            200,
+            lambda i: {
+                "url": f"/admin/delete-user/{data.fixtures[i]}",
+                "headers": admin,
+            },
+            prepare_users,
+        ),
+    ]
+
+
+def check_coverage(endpoints: List[Endpoint]):
+    """
+    Fail when a route of the benchmarked routers has no endpoint scenario,
+    so new routes cannot silently drop out of the benchmark.
+    """
+    covered = {(e.method, e.path) for e in endpoints}
+    missing = sorted(
+        f"{method} {route.path}"
+        for router in ROUTERS
+        for route in router.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+        if (method, route.path) not in covered
+    )
+    if missing:
+        sys.exit("No benchmark scenario for: " + ", ".join(missing))
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile of an ascending list.
+    """
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+async def run_endpoint(
+    client: httpx.AsyncClient, endpoint: Endpoint, requests: int, concurrency: int
+) -> dict:
+    if endpoint.prepare:
+        endpoint.prepare(requests)
+
+    latencies: List[float] = []
+    statuses = Counter()
+    pending = iter(range(requests))
+
+    async def worker():
+        for i in pending:
+            kwargs = endpoint.request(i)
+            started = perf_counter()
+            response = await client.request(endpoint.method, **kwargs)
+            latencies.append(perf_counter() - started)
+            statuses[response.status_code] += 1
+
+    started = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = perf_counter() - started
+
+    latencies.sort()
+    return {
+        "method": endpoint.method,
+        "path": endpoint.path,
+        "requests": requests,
+        "errors": requests - statuses[endpoint.expected],
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        "throughput_rps": round(requests / elapsed, 1),
+        "latency_ms": {
+            "mean": round(1000 * sum(latencies) / len(latencies), 3),
+            "p50": round(1000 * percentile(latencies, 50), 3),
+            "p95": round(1000 * percentile(latencies, 95), 3),
+            "p99": round(1000 * percentile(latencies, 99), 3),
+            "max": round(1000 * latencies[-1], 3),
+        },
+    }
+
+
+def compare(
+    results: List[dict], baseline_path: str, max_regression: float
+) -> List[str]:
+    with open(baseline_path) as f:
+        baseline = {
+            (e["method"], e["path"]): e["latency_ms"]["p95"]
+            for e in json.load(f)["endpoints"]
+        }
+    regressions = []
+    for result in results:
+        before = baseline.get((result["method"], result["path"]))
+        after = result["latency_ms"]["p95"]
+        if before and after > before * (1 + max_regression):
+            regressions.append(
+                f"{result['method']} {result['path']}: p95 {before:.1f} -> {after:.1f} ms"
+            )
+    return regressions
+
+
+async def drive(args) -> dict:
+    data = seed(args.doctors, args.patients, args.appointments, args.records)
+    endpoints = build_endpoints(data)
+    check_coverage(endpoints)
+
+    app = FastAPI()
+    for router in ROUTERS:
+        app.include_router(router)
+
+    results = []
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        for endpoint in endpoints:
+            result = await run_endpoint(
+                client, endpoint, args.requests, args.concurrency
+            )
+            results.append(result)
+            latency = result["latency_ms"]
+            print(
+                f"{endpoint.method:6} {endpoint.path:55} "
+                f"{result['throughput_rps']:8.1f} req/s  p50 {latency['p50']:8.2f}  "
+                f"p95 {latency['p95']:8.2f}  p99 {latency['p99']:8.2f} ms  "
+                f"errors {result['errors']}"
+            )
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "database": engine.dialect.name,
+        "dataset": {
+            "doctors": args.doctors,
+            "patients": args.patients,
+            "appointments": args.appointments,
+            "records": args.records,
+        },
+        "requests_per_endpoint": args.requests,
+        "concurrency": args.concurrency,
+        "endpoints": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--doctors", type=int, default=50)
+    parser.add_argument("--patients", type=int, default=500)
+    parser.add_argument("--appointments", type=int, default=5000)
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--output", default="bench-endpoints.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+    if args.doctors < 3:
+        parser.error("--doctors must be at least 3")
+    if args.records > args.appointments:
+        parser.error("--records must not exceed --appointments")
+    # Template requests take one-minute slots between 18:00 and 23:59
+    max_requests = (6 * 60 - 1) * len(WEEKDAYS)
+    if args.requests > max_requests:
+        parser.error(f"--requests must not exceed {max_requests}")
+
+    report = asyncio.run(drive(args))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    failed = [e for e in report["endpoints"] if e["errors"]]
+    if args.baseline:
+        regressions = compare(report["endpoints"], args.baseline, args.max_regression)
+        for line in regressions:
+            print("Regression:", line)
+        failed += regressions
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
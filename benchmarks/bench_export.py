@@ -0,0 +1,139 @@
+"""
+Seed a large appointments table, stream it through the export endpoint and
+report throughput and the peak resident memory of the process.
+
+The rows are read through a server-side cursor and encoded batch by batch,
+so the peak RSS should stay close to the baseline whatever the row count.
+
+Usage:
+    python -m benchmarks.bench_export [--rows 1000000] [--format ndjson]
+"""
+
+import argparse
+import asyncio
+import resource
+import sys
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from benchmarks.common import SessionLocal, issue_token, reset_database, seed_doctor
+from fastapi import FastAPI
+from sqlalchemy import insert
+from core.enums import AppointmentStatusEnum
+from models import Appointment, Patient, User
+from routers.exports import exports_router
+
+SEED_BATCH = 10000
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def seed(rows: int) -> str:
+    reset_database()
+    db = SessionLocal()
+    doctor_id = seed_doctor(db)
+    patient = Patient(user_id=None)
+    admin = User(
+        email="export-admin@example.com",
+        first_name="Export",
+        last_name="Admin",
+        hashed_password="not-a-real-hash",
+        role="admin",
+    )
+    db.add_all([patient, admin])
+    db.commit()
+
+    start = datetime(2025, 1, 1, 8)
+    for offset in range(0, rows, SEED_BATCH):
+        db.execute(
+            insert(Appointment),
+            [
+                {
+                    "doctor_id": doctor_id,
+                    "patient_id": patient.id,
+                    "scheduled_start": start + timedelta(minutes=30 * n),
+                    "scheduled_end": start + timedelta(minutes=30 * n + 30),
+                    "status": AppointmentStatusEnum.scheduled,
+                }
+                for n in range(offset, min(offset + SEED_BATCH, rows))
+            ],
+        )
+        db.commit()
+    token = issue_token(admin.id, "admin")
+    db.close()
+    return token
+
+
+async def drive(rows: int, fmt: str):
+    token = seed(rows)
+    app = FastAPI()
+    app.include_router(exports_router)
+    baseline = peak_rss_mb()
+
+    # Call the ASGI app directly: httpx's ASGI transport buffers the whole
+    # body before returning it, which would hide the server's memory profile
+    received = 0
+    lines = 0
+    statuses = []
+    requested = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal received, lines
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+        elif message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+            lines += message.get("body", b"").count(b"\n")
+            if not message.get("more_body", False):
+                finished.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/admin/export/appointments",
+        "raw_path": b"/admin/export/appointments",
+        "root_path": "",
+        "query_string": f"format={fmt}".encode(),
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    started = perf_counter()
+    await app(scope, receive, send)
+    elapsed = perf_counter() - started
+    if statuses != [200]:
+        raise RuntimeError(f"export failed with status {statuses}")
+
+    print(
+        f"{lines} lines, {received / (1024 * 1024):.1f} MiB in {elapsed:.2f} s "
+        f"({lines / elapsed:.0f} rows/s)"
+    )
+    print(f"peak RSS: {baseline:.1f} MiB before export, {peak_rss_mb():.1f} MiB after")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    args = parser.parse_args()
+    asyncio.run(drive(args.rows, args.format))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Show query plans and timings of the scheduling hot paths before and after
+the index migrations are applied.
+
+Usage:
+    python -m benchmarks.bench_indexes [--doctors 200] [--appointments 200000]
+"""
+
+import argparse
+import random
+from datetime import datetime, time, timedelta
+from time import perf_counter
+
+from benchmarks.common import SessionLocal, engine, reset_database, seed_doctor
+from sqlalchemy import insert, text
+from migrations import MIGRATIONS, downgrade, upgrade
+from models import Appointment, Availability, MedicalRecord, Patient, User
+from core.enums import WeekdayEnum
+
+EPOCH = datetime(2024, 1, 1, 8)
+
+
+def seed(doctors: int, patients: int, appointments: int):
+    reset_database()
+    db = SessionLocal()
+    rng = random.Random(0)
+
+    doctor_ids = [seed_doctor(db) for _ in range(doctors)]
+
+    users = [
+        {
+            "id": f"user-{i}",
+            "email": f"patient{i}@example.com",
+            "first_name": "Bench",
+            "last_name": "Patient",
+            "hashed_password": "not-a-real-hash",
+            "role": "patient",
+        }
+        for i in range(patients)
+    ]
+    db.execute(insert(User), users)
+    patient_ids = [f"patient-{i}" for i in range(patients)]
+    db.execute(
+        insert(Patient),
+        [{"id": pid, "user_id": f"user-{i}"} for i, pid in enumerate(patient_ids)],
+    )
+
+    db.execute(
+        insert(Availability),
+        [
+            {
+                "doctor_id": doctor_id,
+                "weekday": weekday,
+                "start_time": time(hour),
+                "end_time": time(hour + 4),
+                "available": True,
+            }
+            for doctor_id in doctor_ids
+            for weekday in WeekdayEnum
+            for hour in (8, 13)
+        ],
+    )
+
+    rows = []
+    for i in range(appointments):
+        start = EPOCH + timedelta(minutes=30 * rng.randrange(100_000))
+        rows.append(
+            {
+                "id": f"appointment-{i}",
+                "doctor_id": rng.choice(doctor_ids),
+                "patient_id": rng.choice(patient_ids),
+                "scheduled_start": start,
+                "scheduled_end": start + timedelta(minutes=30),
+            }
+        )
+    for offset in range(0, len(rows), 10_000):
+        db.execute(insert(Appointment), rows[offset : offset + 10_000])
+
+    records = [
+        {
+            "doctor_id": row["doctor_id"],
+            "patient_id": row["patient_id"],
+            "appointment_id": row["id"],
+            "notes": "Routine check-up.",
+        }
+        for row in rows[: appointments // 2]
+    ]
+    for offset in range(0, len(records), 10_000):
+        db.execute(insert(MedicalRecord), records[offset : offset + 10_000])
+
+    db.commit()
+    db.close()
+    return doctor_ids, patient_ids
+
+
+def hot_queries(doctor_id: str, patient_id: str):
+    start = EPOCH + timedelta(days=30)
+    return {
+        "appointment overlap": (
+            "SELECT id FROM appointments WHERE doctor_id = :doctor_id "
+            "AND scheduled_start < :end AND scheduled_end > :start LIMIT 1",
+            {"doctor_id": doctor_id, "start": start, "end": start + timedelta(hours=1)},
+        ),
+        "patient appointments": (
+            "SELECT id FROM appointments WHERE patient_id = :patient_id",
+            {"patient_id": patient_id},
+        ),
+        "availability lookup": (
+            "SELECT id FROM availability WHERE doctor_id = :doctor_id "
+            "AND weekday = 'monday' AND available = 1",
+            {"doctor_id": doctor_id},
+        ),
+        "medical records": (
+            "SELECT id FROM medical_records WHERE doctor_id = :doctor_id "
+            "AND patient_id = :patient_id",
+            {"doctor_id": doctor_id, "patient_id": patient_id},
+        ),
+    }
+
+
+def report(label: str, queries: dict, repeat: int):
+    print(f"\n== {label}")
+    explain = "EXPLAIN QUERY PLAN" if engine.dialect.name == "sqlite" else "EXPLAIN"
+    with engine.connect() as conn:
+        for name, (sql, params) in queries.items():
+            plan = conn.execute(text(f"{explain} {sql}"), params).all()
+            started = perf_counter()
+            for _ in range(repeat):
+                conn.execute(text(sql), params).all()
+            elapsed = (perf_counter() - started) / repeat * 1e3
+            print(f"{name:<22} {elapsed:9.3f} ms")
+            for row in plan:
+                print(f"    {row[-1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--doctors", type=int, default=200)
+    parser.add_argument("--patients", type=int, default=5_000)
+    parser.add_argument("--appointments", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    doctor_ids, patient_ids = seed(args.doctors, args.patients, args.appointments)
+    queries = hot_queries(doctor_ids[0], patient_ids[0])
+
+    # The seeded tables come from the models, which already declare the indexes
+    upgrade(engine)
+    for migration in reversed(MIGRATIONS):
+        downgrade(engine, migration.VERSION)
+    report("before migrations", queries, args.repeat)
+
+    upgrade(engine)
+    report("after migrations", queries, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Compare booking conflict checks through the in-memory interval index with
+the overlap query on the appointments table.
+
+Usage:
+    python -m benchmarks.bench_interval_index [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from benchmarks.common import SessionLocal, reset_database, seed_doctor
+from sqlalchemy import insert
+from core.database import AsyncSessionLocal
+from core.interval_index import AppointmentIndexRegistry
+from models.appointment import Appointment
+
+SLOT = timedelta(minutes=30)
+EPOCH = datetime(2020, 1, 1, 8)
+
+
+def seed_appointments(db, doctor_id: str, count: int):
+    """
+    Book `count` back-to-back appointments, leaving every third slot free.
+    """
+    batch = []
+    for i in range(count):
+        start = EPOCH + SLOT * (i + i // 2)
+        batch.append(
+            {
+                "doctor_id": doctor_id,
+                "scheduled_start": start,
+                "scheduled_end": start + SLOT,
+            }
+        )
+        if len(batch) == 10_000:
+            db.execute(insert(Appointment), batch)
+            batch.clear()
+    if batch:
+        db.execute(insert(Appointment), batch)
+    db.commit()
+
+
+def query_overlaps(db, doctor_id: str, start: datetime, end: datetime) -> bool:
+    return (
+        db.query(Appointment.id)
+        .filter(
+            Appointment.doctor_id == doctor_id,
+            Appointment.scheduled_start < end,
+            Appointment.scheduled_end > start,
+        )
+        .first()
+        is not None
+    )
+
+
+def run(size: int, probes: int):
+    reset_database()
+    db = SessionLocal()
+    doctor_id = seed_doctor(db)
+    seed_appointments(db, doctor_id, size)
+
+    span = SLOT * (size + size // 2)
+    rng = random.Random(size)
+    windows = []
+    for _ in range(probes):
+        start = EPOCH + timedelta(minutes=rng.randrange(span // timedelta(minutes=1)))
+        windows.append((start, start + SLOT))
+
+    async def warm_index():
+        async with AsyncSessionLocal() as session:
+            return await AppointmentIndexRegistry(ttl_seconds=60).lookup(
+                session, doctor_id
+            )
+
+    warm_start = perf_counter()
+    index = asyncio.run(warm_index())
+    warm = perf_counter() - warm_start
+
+    start = perf_counter()
+    index_hits = sum(index.overlaps(s, e) for s, e in windows)
+    index_us = (perf_counter() - start) / probes * 1e6
+
+    start = perf_counter()
+    query_hits = sum(query_overlaps(db, doctor_id, s, e) for s, e in windows)
+    query_us = (perf_counter() - start) / probes * 1e6
+
+    assert index_hits == query_hits, (index_hits, query_hits)
+    db.close()
+
+    print(
+        f"{size:>9,} appointments | warm {warm * 1e3:9.1f} ms | "
+        f"index {index_us:8.2f} us/check | query {query_us:10.1f} us/check | "
+        f"speedup {query_us / index_us:8.0f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--probes", type=int, default=200)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.probes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Compare loading list pages as full ORM entities and as column projections.
+
+Seeds one doctor's appointments and medical records, then pages through
+them as the list endpoints do, encoding every page with page_response:
+
+- entity: select(Model), the way the endpoints loaded rows before
+- columns: select(*loaders.<SHAPE>_COLUMNS), only the schema's columns as
+  plain rows that skip the identity map
+
+Reports rows per second over the whole table and the memory allocated per
+row while one page is held, measured with tracemalloc.
+
+Usage:
+    python -m benchmarks.bench_projection [--rows 20000] [--page 200]
+"""
+
+import argparse
+import asyncio
+import tracemalloc
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from benchmarks.common import SessionLocal, reset_database, seed_doctor
+from sqlalchemy import insert, select
+from core.database import AsyncSessionLocal
+from core.enums import AppointmentStatusEnum
+from core.serialization import page_response
+from deps.pagination import paginate
+from models import Appointment, MedicalRecord, Patient, loaders
+from schemas.appointment import AppointmentOut
+from schemas.medical_record import MedicalRecordOut
+from schemas.pagination import PageParams
+
+SEED_BATCH = 10000
+NOTES = "Patient reports mild symptoms; follow up in two weeks. " * 8
+
+
+def seed(rows: int) -> str:
+    reset_database()
+    db = SessionLocal()
+    doctor_id = seed_doctor(db)
+    patient = Patient(user_id=None)
+    db.add(patient)
+    db.commit()
+
+    start = datetime(2025, 1, 1, 8)
+    for offset in range(0, rows, SEED_BATCH):
+        batch = range(offset, min(offset + SEED_BATCH, rows))
+        db.execute(
+            insert(Appointment),
+            [
+                {
+                    "id": f"appointment-{n:08}",
+                    "doctor_id": doctor_id,
+                    "patient_id": patient.id,
+                    "scheduled_start": start + timedelta(minutes=30 * n),
+                    "scheduled_end": start + timedelta(minutes=30 * n + 30),
+                    "status": AppointmentStatusEnum.completed,
+                }
+                for n in batch
+            ],
+        )
+        db.execute(
+            insert(MedicalRecord),
+            [
+                {
+                    "doctor_id": doctor_id,
+                    "patient_id": patient.id,
+                    "appointment_id": f"appointment-{n:08}",
+                    "notes": NOTES,
+                    "created_at": start + timedelta(minutes=30 * n),
+                }
+                for n in batch
+            ],
+        )
+        db.commit()
+    db.close()
+    return doctor_id
+
+
+async def scan(query, order_by, schema, page_size: int) -> int:
+    rows = 0
+    params = PageParams(limit=page_size, cursor=None)
+    async with AsyncSessionLocal() as db:
+        while True:
+            page = await paginate(db, query, order_by, params)
+            page_response(schema, page)
+            rows += len(page["items"])
+            if page["next_cursor"] is None:
+                return rows
+            params = PageParams(limit=page_size, cursor=page["next_cursor"])
+            # The endpoints serve one page per session
+            db.expunge_all()
+
+
+async def page_bytes_per_row(query, order_by, page_size: int) -> float:
+    async with AsyncSessionLocal() as db:
+        # Warm up the statement cache so only the page itself is counted
+        await paginate(db, query, order_by, PageParams(limit=page_size))
+        db.expunge_all()
+
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        page = await paginate(db, query, order_by, PageParams(limit=page_size))
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        held = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        return held / len(page["items"])
+
+
+async def drive(rows: int, page_size: int):
+    doctor_id = seed(rows)
+    shapes = [
+        (
+            "appointments",
+            AppointmentOut,
+            [Appointment.scheduled_start, Appointment.id],
+            select(Appointment).where(Appointment.doctor_id == doctor_id),
+            select(*loaders.APPOINTMENT_OUT_COLUMNS).where(
+                Appointment.doctor_id == doctor_id
+            ),
+        ),
+        (
+            "medical records",
+            MedicalRecordOut,
+            [MedicalRecord.created_at, MedicalRecord.id],
+            select(MedicalRecord).where(MedicalRecord.doctor_id == doctor_id),
+            select(*loaders.MEDICAL_RECORD_OUT_COLUMNS).where(
+                MedicalRecord.doctor_id == doctor_id
+            ),
+        ),
+    ]
+
+    for name, schema, order_by, entity_query, column_query in shapes:
+        for label, query in (("entity", entity_query), ("columns", column_query)):
+            started = perf_counter()
+            scanned = await scan(query, order_by, schema, page_size)
+            elapsed = perf_counter() - started
+            per_row = await page_bytes_per_row(query, order_by, page_size)
+            print(
+                f"{name:16} {label:8} {scanned / elapsed:9.0f} rows/s  "
+                f"{per_row:7.0f} bytes/row"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--page", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(drive(args.rows, args.page))
+
+
+if __name__ == "__main__":
+    main()
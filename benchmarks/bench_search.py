@@ -0,0 +1,104 @@
+"""
+Measure specialization search latency with a large doctor population.
+
+The index is built in memory from synthetic doctors spread over a realistic
+vocabulary; query latency should not depend on the number of doctors.
+
+Usage:
+    python -m benchmarks.bench_search [--doctors 100000] [--queries 2000]
+"""
+
+import argparse
+import random
+from statistics import median, quantiles
+from time import perf_counter
+
+import benchmarks.common  # noqa: F401
+from core.search import SpecializationIndex
+from deps.utils import normalize_specialization
+
+BASE_SPECIALIZATIONS = [
+    "Allergy and Immunology",
+    "Anesthesiology",
+    "Cardiology",
+    "Cardiothoracic Surgery",
+    "Dermatology",
+    "Emergency Medicine",
+    "Endocrinology",
+    "Family Medicine",
+    "Gastroenterology",
+    "General Surgery",
+    "Geriatrics",
+    "Hematology",
+    "Infectious Disease",
+    "Internal Medicine",
+    "Nephrology",
+    "Neurology",
+    "Neurosurgery",
+    "Obstetrics and Gynecology",
+    "Oncology",
+    "Ophthalmology",
+    "Orthopedic Surgery",
+    "Otolaryngology",
+    "Pathology",
+    "Pediatrics",
+    "Physical Medicine and Rehabilitation",
+    "Plastic Surgery",
+    "Psychiatry",
+    "Pulmonology",
+    "Radiology",
+    "Rheumatology",
+    "Sports Medicine",
+    "Urology",
+    "Vascular Surgery",
+]
+QUALIFIERS = ["", "Pediatric ", "Adult ", "Interventional ", "Clinical "]
+
+QUERIES = [
+    "card",
+    "Cardiology",
+    "surg",
+    "neuro",
+    "pediatric on",
+    "cardiolgy",
+    "urolgy",
+    "xyz",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--doctors", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    vocabulary = [q + s for s in BASE_SPECIALIZATIONS for q in QUALIFIERS]
+    rng = random.Random(7)
+    doctors = [
+        (f"doctor-{n}", normalize_specialization(rng.choice(vocabulary)))
+        for n in range(args.doctors)
+    ]
+
+    index = SpecializationIndex(refresh_seconds=300)
+    started = perf_counter()
+    index.rebuild(doctors)
+    print(
+        f"built index for {args.doctors} doctors, {len(vocabulary)} specializations "
+        f"in {(perf_counter() - started) * 1000:.1f} ms"
+    )
+
+    for query in QUERIES:
+        timings = []
+        for _ in range(args.queries):
+            started = perf_counter()
+            matches = index.search(query)
+            timings.append((perf_counter() - started) * 1_000_000)
+        p99 = quantiles(timings, n=100)[98]
+        print(
+            f"{query!r:16} {len(matches):2} matches  "
+            f"p50 {median(timings):7.1f} us  p99 {p99:7.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Compare the per-row cost of encoding list responses.
+
+Pages of appointments and medical records are encoded by:
+
+- fastapi: what FastAPI does with a response_model, validating the page from
+  the ORM objects and dumping the validated models to JSON
+- jsonable: validating, then jsonable_encoder and json.dumps, as FastAPI
+  versions before the Rust serializer did
+- fast: page_response, projecting the rows onto the model's fields and
+  encoding them with orjson, without validation
+
+Every path must produce the same JSON; the script exits if they differ.
+
+Usage:
+    python -m benchmarks.bench_serialization [--rows 1000] [--repeat 20]
+"""
+
+import argparse
+import json
+from datetime import datetime, timedelta
+from statistics import median
+from time import perf_counter
+from typing import Any, Callable, Dict
+
+import benchmarks.common  # noqa: F401
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from core.enums import AppointmentStatusEnum
+from core.serialization import page_response
+from models import Appointment, MedicalRecord
+from schemas.appointment import AppointmentOut
+from schemas.medical_record import MedicalRecordOut
+from schemas.pagination import Page
+
+NOTES = "Patient reports mild symptoms; follow up in two weeks. " * 8
+
+
+def appointments(count: int) -> list:
+    start = datetime(2025, 1, 6, 9, 0)
+    statuses = list(AppointmentStatusEnum)
+    return [
+        Appointment(
+            id=f"appointment-{n:08}",
+            doctor_id=f"doctor-{n % 50:04}",
+            patient_id=f"patient-{n % 500:04}",
+            scheduled_start=start + timedelta(minutes=30 * n),
+            scheduled_end=start + timedelta(minutes=30 * n + 30),
+            status=statuses[n % len(statuses)],
+        )
+        for n in range(count)
+    ]
+
+
+def medical_records(count: int) -> list:
+    return [
+        MedicalRecord(
+            id=f"record-{n:08}",
+            doctor_id=f"doctor-{n % 50:04}",
+            patient_id=f"patient-{n % 500:04}",
+            appointment_id=f"appointment-{n:08}",
+            notes=NOTES,
+        )
+        for n in range(count)
+    ]
+
+
+def encoders(model) -> Dict[str, Callable[[dict], bytes]]:
+    adapter = TypeAdapter(Page[model])
+
+    def fastapi_path(page: dict) -> bytes:
+        return adapter.dump_json(adapter.validate_python(page, from_attributes=True))
+
+    def jsonable_path(page: dict) -> bytes:
+        body = adapter.validate_python(page, from_attributes=True)
+        return json.dumps(jsonable_encoder(body)).encode()
+
+    def fast_path(page: dict) -> bytes:
+        return page_response(model, page).body
+
+    return {"fastapi": fastapi_path, "jsonable": jsonable_path, "fast": fast_path}
+
+
+def measure(encode: Callable[[dict], Any], page: dict, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = perf_counter()
+        encode(page)
+        timings.append(perf_counter() - started)
+    return median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for model, rows in (
+        (AppointmentOut, appointments(args.rows)),
+        (MedicalRecordOut, medical_records(args.rows)),
+    ):
+        page = {"items": rows, "next_cursor": "bench-cursor"}
+        paths = encoders(model)
+
+        outputs = {name: json.loads(encode(page)) for name, encode in paths.items()}
+        if any(output != outputs["fastapi"] for output in outputs.values()):
+            raise SystemExit(f"{model.__name__}: encoders disagree")
+
+        baseline = None
+        for name, encode in paths.items():
+            seconds = measure(encode, page, args.repeat)
+            baseline = baseline or seconds
+            print(
+                f"{model.__name__:17} {name:9} "
+                f"{seconds * 1_000_000 / args.rows:6.2f} us/row  "
+                f"{seconds * 1000:7.2f} ms/page  {baseline / seconds:5.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
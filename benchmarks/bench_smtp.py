@@ -0,0 +1,166 @@
+"""
+Compare the per-message SMTP path with the pooled one against a local
+aiosmtpd server speaking implicit TLS and AUTH LOGIN.
+
+The per-message path opens a TLS connection and logs in for every email,
+as the worker used to. The pooled path reuses sessions from SMTPConnectionPool,
+once with one send per message (one Celery task per email) and once with
+every message sent over a single session.
+
+Requires aiosmtpd (pip install aiosmtpd).
+
+Usage:
+    python -m benchmarks.bench_smtp [--messages 300]
+"""
+
+import argparse
+import datetime
+import os
+import smtplib
+import ssl
+import tempfile
+import warnings
+from time import perf_counter
+
+import benchmarks.common  # noqa: F401
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from tasks.email import build_message
+from tasks.smtp import SMTPConnectionPool
+
+HOST = "127.0.0.1"
+PORT = 8465
+USERNAME = "bench@example.com"
+PASSWORD = "bench"
+
+# aiosmtpd warns about its own internal use of a deprecated attribute
+warnings.filterwarnings("ignore", message="Session.login_data is deprecated")
+
+
+class CountingHandler:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def authenticate(server, session, envelope, mechanism, auth_data):
+    ok = (
+        auth_data.login.decode() == USERNAME and auth_data.password.decode() == PASSWORD
+    )
+    return AuthResult(success=ok)
+
+
+def self_signed_context() -> ssl.SSLContext:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, HOST)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    directory = tempfile.mkdtemp()
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_path, key_path)
+    return context
+
+
+def client_context() -> ssl.SSLContext:
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def per_message(messages):
+    for msg in messages:
+        with smtplib.SMTP_SSL(HOST, PORT, context=client_context()) as smtp:
+            smtp.login(USERNAME, PASSWORD)
+            smtp.send_message(msg)
+
+
+def pooled_single(pool, messages):
+    for msg in messages:
+        pool.send([msg])
+
+
+def pooled_batch(pool, messages):
+    pool.send(messages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=300)
+    args = parser.parse_args()
+
+    handler = CountingHandler()
+    controller = Controller(
+        handler,
+        hostname=HOST,
+        port=PORT,
+        ssl_context=self_signed_context(),
+        authenticator=authenticate,
+        auth_require_tls=False,
+    )
+    controller.start()
+
+    messages = [
+        build_message("Benchmark", f"user{n}@example.com", "Hello")
+        for n in range(args.messages)
+    ]
+    pool = SMTPConnectionPool(
+        HOST,
+        PORT,
+        username=USERNAME,
+        password=PASSWORD,
+        size=1,
+        max_messages=args.messages,
+        ssl_context=client_context(),
+    )
+
+    try:
+        for label, run in [
+            ("per-message connection", lambda: per_message(messages)),
+            ("pooled, one send per email", lambda: pooled_single(pool, messages)),
+            ("pooled, one batch", lambda: pooled_batch(pool, messages)),
+        ]:
+            before = handler.received
+            started = perf_counter()
+            run()
+            elapsed = perf_counter() - started
+            delivered = handler.received - before
+            print(
+                f"{label:28} {delivered} emails in {elapsed:.2f} s "
+                f"({delivered / elapsed:.0f} emails/s)"
+            )
+    finally:
+        pool.close()
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
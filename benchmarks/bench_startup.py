@@ -0,0 +1,127 @@
+"""
+Measure how long the app takes to become ready, and check that workers
+starting together seed exactly one super admin.
+
+Each worker is a fresh interpreter that imports main, runs the lifespan
+startup and serves one request. Scenarios:
+
+- cold: one worker against an empty schema, so it hashes and seeds the admin
+- warm: one worker against a database that already has the admin
+- race: several workers started at once against an empty schema
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--workers 4]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from statistics import median
+from time import perf_counter
+from typing import List
+
+from benchmarks.common import SessionLocal, engine
+from sqlalchemy import func, select
+from migrations import create_schema
+from models import User
+
+ADMIN_EMAIL = "startup-admin@example.com"
+
+# Runs in each worker interpreter; timings are taken before anything of the
+# project is imported
+WORKER = """
+import asyncio, json, sys
+from time import perf_counter
+
+started = perf_counter()
+import httpx
+import main
+imported = perf_counter()
+
+
+async def serve():
+    async with main.app.router.lifespan_context(main.app):
+        ready = perf_counter()
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=main.app), base_url="http://bench"
+        ) as client:
+            response = await client.get("/metrics")
+        served = perf_counter()
+    return ready, served, response.status_code
+
+
+ready, served, status = asyncio.run(serve())
+print(json.dumps({
+    "import_ms": 1000 * (imported - started),
+    "startup_ms": 1000 * (ready - imported),
+    "first_request_ms": 1000 * (served - ready),
+    "status": status,
+}))
+"""
+
+
+def start_workers(count: int) -> List[dict]:
+    env = dict(os.environ, ADMIN_EMAIL=ADMIN_EMAIL, ADMIN_PASSWORD="startup-password")
+    started = perf_counter()
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER], env=env, stdout=subprocess.PIPE, text=True
+        )
+        for _ in range(count)
+    ]
+    results = []
+    for worker in workers:
+        out, _ = worker.communicate()
+        if worker.returncode != 0:
+            sys.exit(f"Worker failed with exit code {worker.returncode}")
+        result = json.loads(out.strip().splitlines()[-1])
+        result["process_ms"] = 1000 * (perf_counter() - started)
+        results.append(result)
+    return results
+
+
+def admins() -> int:
+    with SessionLocal() as db:
+        return db.scalar(
+            select(func.count()).select_from(User).where(User.email == ADMIN_EMAIL)
+        )
+
+
+def summarize(name: str, results: List[dict]) -> str:
+    def med(key: str) -> float:
+        return median(r[key] for r in results)
+
+    return (
+        f"{name:6} import {med('import_ms'):7.1f} ms  startup {med('startup_ms'):7.1f} ms  "
+        f"first request {med('first_request_ms'):6.1f} ms  "
+        f"process to exit {med('process_ms'):7.1f} ms  (median of {len(results)})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    cold, warm, race = [], [], []
+    duplicates = 0
+    for _ in range(args.runs):
+        create_schema(engine, reset=True)
+        cold += start_workers(1)
+        warm += start_workers(1)
+
+        create_schema(engine, reset=True)
+        race += start_workers(args.workers)
+        duplicates += admins() != 1
+
+    print(summarize("cold", cold))
+    print(summarize("warm", warm))
+    print(summarize("race", race))
+    print(f"race runs without exactly one admin: {duplicates} of {args.runs}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Shared setup for the benchmark scripts.
+
+Import this module before any project module: it points the settings at a
+local SQLite database and an in-memory Celery broker so the benchmarks run
+without MySQL, Redis or SMTP.
+"""
+
+import os
+import tempfile
+from typing import Optional
+
+BENCH_DB_PATH = os.path.join(tempfile.gettempdir(), "appointments_bench.db")
+
+os.environ.setdefault("MYSQL_USER", "bench")
+os.environ.setdefault("MYSQL_PASSWORD", "bench")
+os.environ.setdefault("MYSQL_DATABASE", "bench")
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("EMAIL_ADDRESS", "bench@example.com")
+os.environ.setdefault("EMAIL_PASSWORD", "bench")
+os.environ.setdefault("DEV_ENV", "bench")
+os.environ.setdefault("PROD_DB", f"sqlite:///{BENCH_DB_PATH}")
+# In-process broker: task.delay() queues in memory instead of reaching Redis
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+
+import models  # noqa: E402,F401
+from core.database import Base, SessionLocal, engine  # noqa: E402
+from core.security import create_access_token  # noqa: E402
+from models import Doctor, User  # noqa: E402
+
+
+def reset_database():
+    """
+    Drop and recreate every table of the benchmark database.
+    """
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def seed_doctor(db, specialization: str = "cardiology") -> str:
+    """
+    Create a doctor user and profile.
+
+    Args:
+        db (Session): The database session.
+        specialization (str, optional): The doctor's specialization. Defaults to "cardiology".
+
+    Returns:
+        str: The ID of the new doctor.
+    """
+    user = User(
+        email=f"{os.urandom(6).hex()}@example.com",
+        first_name="Bench",
+        last_name="Doctor",
+        hashed_password="not-a-real-hash",
+        role="doctor",
+    )
+    db.add(user)
+    db.flush()
+
+    doctor = Doctor(user_id=user.id, specialization=specialization)
+    db.add(doctor)
+    db.commit()
+    return doctor.id
+
+
+def issue_token(
+    user_id: str,
+    role: str,
+    doctor_id: Optional[str] = None,
+    patient_id: Optional[str] = None,
+) -> str:
+    """
+    Sign an access token carrying the same claims the login route issues.
+
+    Args:
+        user_id (str): The ID of the user.
+        role (str): The role of the user.
+        doctor_id (Optional[str], optional): The doctor profile ID. Defaults to None.
+        patient_id (Optional[str], optional): The patient profile ID. Defaults to None.
+
+    Returns:
+        str: The access token.
+    """
+    return create_access_token(
+        data={
+            "sub": user_id,
+            "role": role,
+            "doctor_id": doctor_id,
+            "patient_id": patient_id,
+        }
+    )
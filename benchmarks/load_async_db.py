@@ -0,0 +1,102 @@
+"""
+Fire concurrent requests at a database-backed endpoint and report how many
+of them were in flight at the same time.
+
+With the async database layer, requests awaiting the database yield the
+event loop, so the peak overlap should approach the concurrency level.
+
+Usage:
+    python -m benchmarks.load_async_db [--requests 200] [--concurrency 20]
+"""
+
+import argparse
+import asyncio
+from time import perf_counter
+
+from benchmarks.common import SessionLocal, issue_token, reset_database, seed_doctor
+import httpx
+from fastapi import FastAPI, Request
+from models import Patient, User
+from routers.patients import patients_router
+
+
+class InFlight:
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+
+def build_app(in_flight: InFlight) -> FastAPI:
+    app = FastAPI()
+    app.include_router(patients_router)
+
+    @app.middleware("http")
+    async def track_in_flight(request: Request, call_next):
+        in_flight.current += 1
+        in_flight.peak = max(in_flight.peak, in_flight.current)
+        try:
+            return await call_next(request)
+        finally:
+            in_flight.current -= 1
+
+    return app
+
+
+def seed() -> tuple:
+    reset_database()
+    db = SessionLocal()
+    doctor_id = seed_doctor(db)
+    patient = User(
+        email="load-patient@example.com",
+        first_name="Load",
+        last_name="Patient",
+        hashed_password="not-a-real-hash",
+        role="patient",
+    )
+    db.add(patient)
+    db.flush()
+    profile = Patient(user_id=patient.id)
+    db.add(profile)
+    db.commit()
+    token = issue_token(patient.id, "patient", patient_id=profile.id)
+    db.close()
+    return doctor_id, token
+
+
+async def drive(total: int, concurrency: int):
+    doctor_id, token = seed()
+    in_flight = InFlight()
+    app = build_app(in_flight)
+    headers = {"Authorization": f"Bearer {token}"}
+    url = f"/patients/doctor/availability/{doctor_id}"
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                response = await client.get(url, headers=headers)
+                response.raise_for_status()
+
+        started = perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = perf_counter() - started
+
+    print(
+        f"{total} requests, concurrency {concurrency}: {elapsed:.2f} s, "
+        f"{total / elapsed:.0f} req/s, peak in flight {in_flight.peak}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(drive(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
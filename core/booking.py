@@ -0,0 +1,180 @@
+import asyncio
+import random
+import zlib
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, List, TypeVar
+from fastapi import HTTPException, status
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from core.metrics import Counter
+from models.doctor import Doctor
+
+T = TypeVar("T")
+
+# MySQL: 1213 deadlock found, 1205 lock wait timeout exceeded
+DEADLOCK_CODES = {1213}
+LOCK_TIMEOUT_CODES = {1205}
+
+booking_retries_total = Counter(
+    "booking_retries_total", "Booking transactions retried after a deadlock"
+)
+booking_lock_timeouts_total = Counter(
+    "booking_lock_timeouts_total",
+    "Bookings rejected because the doctor lock could not be taken in time",
+    labelnames=("scope",),
+)
+
+
+class StripedLock:
+    """
+    A fixed set of asyncio locks shared by key hash.
+
+    Keys mapping to the same stripe are serialized together, which bounds
+    memory regardless of how many doctors exist.
+    """
+
+    def __init__(self, stripes: int):
+        self._locks: List[asyncio.Lock] = [asyncio.Lock() for _ in range(stripes)]
+
+    def _lock_for(self, key: str) -> asyncio.Lock:
+        return self._locks[zlib.crc32(key.encode()) % len(self._locks)]
+
+    @asynccontextmanager
+    async def hold(self, key: str, timeout: float):
+        """
+        Hold the stripe of a key, waiting at most timeout seconds for it.
+
+        Args:
+            key (str): The key to serialize on.
+            timeout (float): The longest time to wait for the lock.
+
+        Raises:
+            HTTPException: 503 if the lock was not acquired in time.
+        """
+        lock = self._lock_for(key)
+        try:
+            await asyncio.wait_for(lock.acquire(), timeout)
+        except asyncio.TimeoutError:
+            booking_lock_timeouts_total.labels(scope="process").inc()
+            raise busy()
+        try:
+            yield
+        finally:
+            lock.release()
+
+
+def busy() -> HTTPException:
+    """
+    Build the response for a booking that could not get the doctor lock.
+
+    Returns:
+        HTTPException: A 503 asking the client to retry shortly.
+    """
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent bookings for this doctor, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+def error_code(exc: OperationalError) -> int:
+    """
+    Get the driver error code of an operational error, or 0 if it has none.
+
+    Args:
+        exc (OperationalError): The error raised by the driver.
+
+    Returns:
+        int: The error code.
+    """
+    args = getattr(exc.orig, "args", ())
+    return args[0] if args and isinstance(args[0], int) else 0
+
+
+async def lock_doctor(db: AsyncSession, doctor_id: str) -> bool:
+    """
+    Take the row lock of a doctor for the rest of the transaction.
+
+    On MySQL the lock wait is bounded by BOOKING_LOCK_TIMEOUT_SECONDS; the
+    session's own timeout is restored once the lock is taken or the wait
+    fails, so it does not carry over to other users of the pooled
+    connection. SQLite has no row locks and serializes writers on its own.
+
+    Args:
+        db (AsyncSession): The database session, outside any transaction.
+        doctor_id (str): The ID of the doctor.
+
+    Returns:
+        bool: True if the doctor exists, False otherwise.
+    """
+    query = select(Doctor.id).where(Doctor.id == doctor_id).with_for_update()
+    if db.bind.dialect.name != "mysql":
+        return await db.scalar(query) is not None
+
+    await db.execute(
+        text(
+            "SET @booking_lock_wait_timeout = @@SESSION.innodb_lock_wait_timeout, "
+            "SESSION innodb_lock_wait_timeout = :timeout"
+        ),
+        {"timeout": max(1, int(settings.BOOKING_LOCK_TIMEOUT_SECONDS))},
+    )
+    try:
+        doctor = await db.scalar(query)
+    finally:
+        await db.execute(
+            text("SET SESSION innodb_lock_wait_timeout = @booking_lock_wait_timeout")
+        )
+    return doctor is not None
+
+
+async def run_serialized(
+    db: AsyncSession, doctor_id: str, operation: Callable[[], Awaitable[T]]
+) -> T:
+    """
+    Run a booking transaction serialized per doctor, retrying on deadlock.
+
+    Bookings for one doctor first queue on an in-process striped lock, so
+    only one of them per worker contends for the database row lock. The
+    operation must start by calling lock_doctor and end by committing; it
+    is rerun from scratch after a deadlock, with jittered backoff.
+
+    Args:
+        db (AsyncSession): The database session.
+        doctor_id (str): The ID of the doctor.
+        operation (Callable[[], Awaitable[T]]): The transaction body.
+
+    Returns:
+        T: The result of the operation.
+
+    Raises:
+        HTTPException: 503 if a lock could not be taken in time or the
+            deadlock retries ran out.
+    """
+    # End any open transaction first: it returns the connection to the pool
+    # while queuing, and makes the row lock the first read of the booking
+    # transaction, so later reads are not served from an older snapshot
+    await db.rollback()
+    async with booking_locks.hold(doctor_id, settings.BOOKING_LOCK_TIMEOUT_SECONDS):
+        for attempt in range(settings.BOOKING_MAX_RETRIES + 1):
+            try:
+                return await operation()
+            except OperationalError as e:
+                await db.rollback()
+                code = error_code(e)
+                if code in LOCK_TIMEOUT_CODES:
+                    booking_lock_timeouts_total.labels(scope="database").inc()
+                    raise busy()
+                if code not in DEADLOCK_CODES:
+                    raise
+                if attempt == settings.BOOKING_MAX_RETRIES:
+                    raise busy()
+                booking_retries_total.inc()
+                await asyncio.sleep(random.uniform(0, 0.05 * 2**attempt))
+            except BaseException:
+                await db.rollback()
+                raise
+
+
+booking_locks = StripedLock(settings.BOOKING_LOCK_STRIPES)
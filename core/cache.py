@@ -0,0 +1,279 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+import redis
+import redis.asyncio as aioredis
+from core.config import settings
+from core.metrics import Counter
+from core.pubsub import subscriber
+from schemas.auth import Principal
+
+logger = logging.getLogger(__name__)
+
+cache_hits_total = Counter("cache_hits_total", "Cache lookups served", ("cache",))
+cache_misses_total = Counter(
+    "cache_misses_total", "Cache lookups not served", ("cache",)
+)
+cache_evictions_total = Counter(
+    "cache_evictions_total", "Entries evicted to stay within capacity", ("cache",)
+)
+
+
+class TTLLRUCache:
+    """
+    A thread-safe LRU cache whose entries also expire after a fixed TTL.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached value.
+
+        Args:
+            key (Hashable): The cache key.
+
+        Returns:
+            Optional[Any]: The cached value, or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                cache_misses_total.labels(cache=self.name).inc()
+                return None
+            self._entries.move_to_end(key)
+        cache_hits_total.labels(cache=self.name).inc()
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        """
+        Cache a value, evicting the least recently used entries if full.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value to cache.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                cache_evictions_total.labels(cache=self.name).inc()
+
+    def invalidate(self, key: Hashable):
+        """
+        Drop a cached value.
+
+        Args:
+            key (Hashable): The cache key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Drop every cached value.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+class PrincipalCache:
+    """
+    Read-only principal snapshots keyed by user id.
+
+    The first tier is an in-process TTLLRUCache. When REDIS_URL is set, Redis
+    is a shared second tier and carries invalidations to every worker over
+    the shared subscriber; the first tier is dropped whenever it
+    (re)subscribes, since invalidations may have been missed meanwhile.
+    """
+
+    CHANNEL = "principal-invalidations"
+
+    def __init__(self, max_entries: int, ttl_seconds: int, redis_url: Optional[str]):
+        self.local = TTLLRUCache("principal", max_entries, ttl_seconds)
+        self.ttl_seconds = ttl_seconds
+        self.redis_url = redis_url
+        self._redis = aioredis.from_url(redis_url) if redis_url else None
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"principal:{user_id}"
+
+    def _on_message(self, message: dict):
+        self.local.invalidate(message["data"].decode())
+
+    def _on_connect(self, client: redis.Redis):
+        self.local.clear()
+
+    async def get(self, user_id: str) -> Optional[Principal]:
+        """
+        Get the cached principal of a user.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Returns:
+            Optional[Principal]: The cached principal, or None on a miss.
+        """
+        principal = self.local.get(user_id)
+        if principal is not None or self._redis is None:
+            return principal
+
+        try:
+            data = await self._redis.get(self._key(user_id))
+        except redis.RedisError as e:
+            logger.warning("Principal cache second tier unavailable: %s", e)
+            return None
+
+        if data is None:
+            return None
+        principal = Principal.model_validate(json.loads(data))
+        self.local.set(user_id, principal)
+        return principal
+
+    async def set(self, principal: Principal):
+        """
+        Cache the principal of a user.
+
+        Args:
+            principal (Principal): The principal to cache.
+        """
+        self.local.set(principal.id, principal)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(
+                self._key(principal.id),
+                principal.model_dump_json(),
+                ex=self.ttl_seconds,
+            )
+        except redis.RedisError as e:
+            logger.warning("Principal cache second tier unavailable: %s", e)
+
+    async def invalidate(self, user_id: str):
+        """
+        Drop the cached principal of a user in every tier and worker.
+
+        Args:
+            user_id (str): The ID of the user.
+        """
+        self.local.invalidate(user_id)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.delete(self._key(user_id))
+            await self._redis.publish(self.CHANNEL, user_id)
+        except redis.RedisError as e:
+            logger.warning("Principal cache second tier unavailable: %s", e)
+
+
+class DirectoryCache:
+    """
+    Pre-serialized doctor directory pages, keyed by a directory version.
+
+    Every write to the directory bumps the version, so pages rendered before
+    the write are never served again and simply age out of the LRU. When
+    REDIS_URL is set, version bumps are broadcast to every worker over the
+    shared subscriber, and the version is also bumped whenever it
+    (re)subscribes. The ETag is a hash of the body, so all workers agree on
+    it for the same content.
+    """
+
+    CHANNEL = "directory-invalidations"
+
+    def __init__(self, max_entries: int, ttl_seconds: int, redis_url: Optional[str]):
+        self.local = TTLLRUCache("directory", max_entries, ttl_seconds)
+        self.redis_url = redis_url
+        self.version = 0
+        self._redis = aioredis.from_url(redis_url) if redis_url else None
+        self._lock = threading.Lock()
+
+    def _bump(self):
+        with self._lock:
+            self.version += 1
+        self.local.clear()
+
+    def _on_message(self, message: dict):
+        self._bump()
+
+    def _on_connect(self, client: redis.Redis):
+        self._bump()
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, str]]:
+        """
+        Get a cached page rendered at the current directory version.
+
+        Args:
+            key (Hashable): The page key.
+
+        Returns:
+            Optional[Tuple[bytes, str]]: The body and ETag, or None on a miss.
+        """
+        return self.local.get((self.version, key))
+
+    def set(self, key: Hashable, body: bytes, version: int) -> Tuple[bytes, str]:
+        """
+        Cache a rendered page under the version it was read at.
+
+        Args:
+            key (Hashable): The page key.
+            body (bytes): The serialized page.
+            version (int): The directory version read before querying.
+
+        Returns:
+            Tuple[bytes, str]: The body and its strong ETag.
+        """
+        entry = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        self.local.set((version, key), entry)
+        return entry
+
+    async def invalidate(self):
+        """
+        Bump the directory version in every worker.
+        """
+        self._bump()
+        if self._redis is None:
+            return
+        try:
+            await self._redis.publish(self.CHANNEL, "bump")
+        except redis.RedisError as e:
+            logger.warning("Directory cache invalidation channel unavailable: %s", e)
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    redis_url=settings.REDIS_URL,
+)
+
+directory_cache = DirectoryCache(
+    max_entries=settings.DIRECTORY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.DIRECTORY_CACHE_TTL_SECONDS,
+    redis_url=settings.REDIS_URL,
+)
+
+subscriber.subscribe(
+    PrincipalCache.CHANNEL,
+    principal_cache._on_message,
+    on_connect=principal_cache._on_connect,
+)
+subscriber.subscribe(
+    DirectoryCache.CHANNEL,
+    directory_cache._on_message,
+    on_connect=directory_cache._on_connect,
+)
@@ -10,11 +10,42 @@ class Settings(BaseSettings):
     MYSQL_DATABASE: str
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     EMAIL_ADDRESS: str
     EMAIL_PASSWORD: str
+    SMTP_HOST: str = "smtp.gmail.com"
+    SMTP_PORT: int = 465
+    SMTP_USE_SSL: bool = True
+    SMTP_POOL_SIZE: int = 2
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_HEALTHCHECK_AFTER_SECONDS: float = 30.0
+    CELERY_BROKER_URL: str = "redis://redis:6379/0"
+    CELERY_METRICS_PORT: int = 0
+    NOTIFICATION_DIGEST_WINDOW_SECONDS: int = 30
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
     DEV_ENV: Optional[str] = "test"
     PROD_DB: Optional[str] = None
+    READ_DB: Optional[str] = None
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    PASSWORD_POOL_WORKERS: int = 2
+    PASSWORD_POOL_MAX_QUEUE: int = 64
+    REDIS_URL: Optional[str] = None
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    DIRECTORY_CACHE_MAX_ENTRIES: int = 1024
+    DIRECTORY_CACHE_TTL_SECONDS: int = 300
+    SEARCH_INDEX_REFRESH_SECONDS: int = 300
+    APPOINTMENT_INDEX_TTL_SECONDS: int = 60
+    BOOKING_LOCK_TIMEOUT_SECONDS: float = 5.0
+    BOOKING_MAX_RETRIES: int = 3
+    BOOKING_LOCK_STRIPES: int = 256
+    QUERY_TRACKING_ENABLED: bool = False
+    N_PLUS_ONE_THRESHOLD: int = 5
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
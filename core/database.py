@@ -1,8 +1,15 @@
-from sqlalchemy import create_engine
+from time import perf_counter
+from typing import Type
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from core.config import settings
-from sqlalchemy.engine import URL
+from core.metrics import Counter, Gauge, Histogram
+from core.query_budget import enable_query_tracking
+from sqlalchemy.engine import URL, Engine, make_url
 
 if settings.DEV_ENV != "test":
     url = settings.PROD_DB
@@ -15,8 +22,190 @@ else:
         database=settings.MYSQL_DATABASE,
     )
 
-engine = create_engine(url)
+db_pool_checkout_wait_seconds = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    labelnames=("pool",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+db_pool_checkout_timeouts_total = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Connection checkouts that gave up after DB_POOL_TIMEOUT_SECONDS",
+    labelnames=("pool",),
+)
+db_pool_connections_in_use = Gauge(
+    "db_pool_connections_in_use",
+    "Pooled database connections currently checked out",
+    labelnames=("pool",),
+    multiprocess_mode="livesum",
+)
+
+# Async drivers used by the request path, keyed by database backend
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(sync_url) -> URL:
+    """
+    Convert a database URL to the async driver of the same backend.
+
+    Args:
+        sync_url (str | URL): The database URL.
+
+    Returns:
+        URL: The URL using the async driver.
+    """
+    sync_url = make_url(sync_url)
+    driver = ASYNC_DRIVERS.get(sync_url.get_backend_name(), sync_url.drivername)
+    return sync_url.set(drivername=driver)
+
+
+def timed_pool(base: Type[QueuePool], name: str) -> Type[QueuePool]:
+    """
+    Build a queue pool class that records how long checkouts wait.
+
+    The wait is timed around Pool.connect(), the public checkout entry point,
+    since pool events only fire once a connection has been handed out and
+    not at all on a timeout. It includes opening a new connection and the
+    pre-ping, when those happen. The name is a class attribute so it survives
+    the pool being recreated, e.g. by engine.dispose().
+
+    Args:
+        base (Type[QueuePool]): The pool class to extend.
+        name (str): The pool label in the metrics.
+
+    Returns:
+        Type[QueuePool]: The timed pool class.
+    """
+
+    def connect(self):
+        started = perf_counter()
+        try:
+            return base.connect(self)
+        except PoolTimeoutError:
+            db_pool_checkout_timeouts_total.labels(pool=self.pool_name).inc()
+            raise
+        finally:
+            db_pool_checkout_wait_seconds.labels(pool=self.pool_name).observe(
+                perf_counter() - started
+            )
+
+    return type(
+        f"Timed{base.__name__}", (base,), {"pool_name": name, "connect": connect}
+    )
+
+
+def pool_options(db_url, name: str, is_async: bool = False) -> dict:
+    """
+    Build the connection pool arguments of an engine from the settings.
+
+    In-memory SQLite keeps the default single-connection pool, which the
+    sizing options do not apply to.
+
+    Args:
+        db_url (str | URL): The database URL.
+        name (str): The pool label in the metrics.
+        is_async (bool, optional): Whether the engine is async. Defaults to False.
+
+    Returns:
+        dict: The keyword arguments for create_engine or create_async_engine.
+    """
+    db_url = make_url(db_url)
+    if db_url.get_backend_name() == "sqlite" and db_url.database in (
+        None,
+        "",
+        ":memory:",
+    ):
+        return {}
+
+    return {
+        "poolclass": timed_pool(AsyncAdaptedQueuePool if is_async else QueuePool, name),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def track_connections_in_use(engine: Engine, name: str):
+    """
+    Keep the in-use connection gauge of an engine's pool up to date.
+
+    Args:
+        engine (Engine): The engine. For an async engine, pass its sync_engine.
+        name (str): The pool label in the metrics.
+    """
+    event.listen(
+        engine, "checkout", lambda *args: db_pool_connections_in_use.labels(name).inc()
+    )
+    event.listen(
+        engine, "checkin", lambda *args: db_pool_connections_in_use.labels(name).dec()
+    )
+
+
+def enforce_foreign_keys(engine: Engine):
+    """
+    Make SQLite honour the ON DELETE rules of the schema, as MySQL does.
+
+    SQLite leaves foreign keys unenforced unless every connection opts in.
+
+    Args:
+        engine (Engine): The engine. For an async engine, pass its sync_engine.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    def _enable(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    event.listen(engine, "connect", _enable)
+
+
+# Synchronous engine for schema setup, migrations and background workers
+engine = create_engine(url, **pool_options(url, "sync"))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the route handlers, so queries never block the event loop
+async_engine = create_async_engine(
+    to_async_url(url), **pool_options(url, "primary", is_async=True)
+)
+
+# Read-only engine for handlers that tolerate replication lag; without a
+# replica configured, reads share the primary engine
+if settings.READ_DB:
+    async_read_engine = create_async_engine(
+        to_async_url(settings.READ_DB),
+        **pool_options(settings.READ_DB, "replica", is_async=True),
+    )
+else:
+    async_read_engine = async_engine
+
+for _engine in {engine, async_engine.sync_engine, async_read_engine.sync_engine}:
+    enforce_foreign_keys(_engine)
+
+track_connections_in_use(engine, "sync")
+track_connections_in_use(async_engine.sync_engine, "primary")
+if async_read_engine is not async_engine:
+    track_connections_in_use(async_read_engine.sync_engine, "replica")
+
+# Opt-in statement tracking for query budgets and N+1 detection
+if settings.QUERY_TRACKING_ENABLED:
+    enable_query_tracking(engine)
+    enable_query_tracking(async_engine.sync_engine)
+    enable_query_tracking(async_read_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
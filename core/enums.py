@@ -21,3 +21,8 @@ class WeekdayEnum(str, Enum):
     friday = "friday"
     saturday = "saturday"
     sunday = "sunday"
+
+
+class ExportFormatEnum(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
@@ -0,0 +1,153 @@
+from contextvars import ContextVar
+from time import perf_counter
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from core.metrics import Counter, Gauge, Histogram
+
+http_requests_total = Counter(
+    "http_requests_total",
+    "HTTP requests served, by route template and status code",
+    labelnames=("method", "route", "status"),
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Time to serve an HTTP request, up to the last body chunk",
+    labelnames=("method", "route"),
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+    multiprocess_mode="livesum",
+)
+http_request_db_statements = Histogram(
+    "http_request_db_statements",
+    "SQL statements executed while serving an HTTP request",
+    labelnames=("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+http_request_db_seconds = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL statements while serving an HTTP request",
+    labelnames=("method", "route"),
+)
+db_statement_duration_seconds = Histogram(
+    "db_statement_duration_seconds",
+    "Time to execute a single SQL statement, by statement type",
+    labelnames=("operation",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+
+# Route label of requests that matched no route, so unknown paths cannot
+# grow the number of series
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestStats:
+    """
+    Statements and database time accumulated by the current request.
+    """
+
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and database use per route.
+
+    Written against the raw ASGI interface rather than as an HTTP middleware
+    function, so streamed responses pass through untouched and the cost per
+    request is a few clock reads and dictionary updates.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        started = perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = perf_counter() - started
+            http_requests_in_flight.dec()
+            _request_stats.reset(token)
+
+            route = scope.get("route")
+            labels = {
+                "method": scope["method"],
+                "route": getattr(route, "path", UNMATCHED_ROUTE),
+            }
+            http_requests_total.labels(status=status_code, **labels).inc()
+            http_request_duration_seconds.labels(**labels).observe(elapsed)
+            http_request_db_statements.labels(**labels).observe(stats.statements)
+            http_request_db_seconds.labels(**labels).observe(stats.db_seconds)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started: List[float] = conn.info.get("query_started")
+    if not started:
+        return
+    elapsed = perf_counter() - started.pop()
+
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+    db_statement_duration_seconds.labels(operation=operation).observe(elapsed)
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start
+    # time so later statements are not timed from it
+    conn = exception_context.connection
+    if conn is None:
+        return
+    started: List[float] = conn.info.get("query_started")
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine: Engine):
+    """
+    Time every statement run on an engine and charge it to the current request.
+
+    For an async engine, pass its sync_engine: the events fire there.
+
+    Args:
+        engine (Engine): The engine to instrument.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,195 @@
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+import redis
+import redis.asyncio as aioredis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from core.enums import AppointmentStatusEnum
+from core.pubsub import subscriber
+from core.scheduling import Interval, merge_intervals
+from models.appointment import Appointment
+
+logger = logging.getLogger(__name__)
+
+
+class DoctorIntervalIndex:
+    """
+    Booked intervals of a single doctor, kept merged and sorted.
+
+    Because the stored intervals are disjoint, both the start and end arrays
+    are sorted, so overlap checks and inserts are binary searches.
+    """
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        merged = merge_intervals(intervals)
+        self._starts = [start for start, _ in merged]
+        self._ends = [end for _, end in merged]
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        """
+        Check whether [start, end) overlaps any booked interval.
+
+        Args:
+            start (datetime): The start of the interval.
+            end (datetime): The end of the interval.
+
+        Returns:
+            bool: True if the interval overlaps a booked one, False otherwise.
+        """
+        i = bisect_left(self._starts, end)
+        return i > 0 and self._ends[i - 1] > start
+
+    def add(self, start: datetime, end: datetime):
+        """
+        Add a booked interval, merging it with the intervals it touches.
+
+        Args:
+            start (datetime): The start of the interval.
+            end (datetime): The end of the interval.
+        """
+        lo = bisect_left(self._ends, start)
+        hi = bisect_right(self._starts, end)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+
+class AppointmentIndexRegistry:
+    """
+    Per-doctor interval indexes, warmed lazily from the database.
+
+    An index only sees bookings made through this process and the
+    invalidations it has received, so a hit means "probably taken": the
+    booking re-checks the database under the doctor lock, which stays the
+    final arbiter, and drops the doctor's index when the two disagree.
+    Indexes also expire after a TTL. When REDIS_URL is set, invalidations
+    are broadcast to every worker over the shared subscriber, and every
+    index is dropped whenever it (re)subscribes.
+    """
+
+    CHANNEL = "appointment-index-invalidations"
+    # Message data meaning every doctor
+    ALL = "*"
+
+    def __init__(self, ttl_seconds: float, redis_url: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self._indexes: Dict[str, Tuple[float, DoctorIntervalIndex]] = {}
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._redis = aioredis.from_url(redis_url) if redis_url else None
+
+    def _on_message(self, message: dict):
+        doctor_id = message["data"].decode()
+        self.drop(None if doctor_id == self.ALL else doctor_id)
+
+    def _on_connect(self, client: redis.Redis):
+        self.drop()
+
+    async def lookup(self, db: AsyncSession, doctor_id: str) -> DoctorIntervalIndex:
+        """
+        Get the index of a doctor, loading it from the database if needed.
+
+        Args:
+            db (AsyncSession): The database session.
+            doctor_id (str): The ID of the doctor.
+
+        Returns:
+            DoctorIntervalIndex: The doctor's interval index.
+        """
+        with self._lock:
+            entry = self._indexes.get(doctor_id)
+            generation = (self._epoch, self._generations.get(doctor_id, 0))
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        rows = await db.execute(
+            select(Appointment.scheduled_start, Appointment.scheduled_end).where(
+                Appointment.doctor_id == doctor_id,
+                Appointment.status != AppointmentStatusEnum.cancelled,
+            )
+        )
+        index = DoctorIntervalIndex((start, end) for start, end in rows)
+
+        with self._lock:
+            # Only publish the index if nothing changed while it was loading
+            if (self._epoch, self._generations.get(doctor_id, 0)) == generation:
+                self._indexes[doctor_id] = (time.monotonic() + self.ttl_seconds, index)
+        return index
+
+    def record(
+        self,
+        doctor_id: str,
+        start: datetime,
+        end: datetime,
+        status: AppointmentStatusEnum,
+    ):
+        """
+        Record a committed booking in the doctor's index.
+
+        Cancelled appointments free their interval, so they are not recorded.
+
+        Args:
+            doctor_id (str): The ID of the doctor.
+            start (datetime): The start of the booking.
+            end (datetime): The end of the booking.
+            status (AppointmentStatusEnum): The status of the booking.
+        """
+        if status == AppointmentStatusEnum.cancelled:
+            return
+        with self._lock:
+            self._generations[doctor_id] = self._generations.get(doctor_id, 0) + 1
+            entry = self._indexes.get(doctor_id)
+            if entry is not None:
+                entry[1].add(start, end)
+
+    def drop(self, doctor_id: Optional[str] = None):
+        """
+        Drop the index of a doctor, or of every doctor, in this process only.
+
+        Args:
+            doctor_id (Optional[str], optional): The ID of the doctor. Defaults to None.
+        """
+        with self._lock:
+            if doctor_id is None:
+                self._epoch += 1
+                self._indexes.clear()
+                return
+            self._generations[doctor_id] = self._generations.get(doctor_id, 0) + 1
+            self._indexes.pop(doctor_id, None)
+
+    async def invalidate(self, doctor_id: Optional[str] = None):
+        """
+        Drop the index of a doctor, or of every doctor, in every worker.
+
+        Args:
+            doctor_id (Optional[str], optional): The ID of the doctor. Defaults to None.
+        """
+        self.drop(doctor_id)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.publish(self.CHANNEL, doctor_id or self.ALL)
+        except redis.RedisError as e:
+            logger.warning("Appointment index invalidation channel unavailable: %s", e)
+
+
+appointment_index = AppointmentIndexRegistry(
+    ttl_seconds=settings.APPOINTMENT_INDEX_TTL_SECONDS,
+    redis_url=settings.REDIS_URL,
+)
+subscriber.subscribe(
+    AppointmentIndexRegistry.CHANNEL,
+    appointment_index._on_message,
+    on_connect=appointment_index._on_connect,
+)
@@ -0,0 +1,94 @@
+"""
+Prometheus metrics shared by every process of a service.
+
+The metric types are prometheus_client's. When PROMETHEUS_MULTIPROC_DIR is
+set, each process (uvicorn workers, Celery pool children) writes its samples
+to that directory and the exposition aggregates them, so a scrape covers the
+whole service rather than whichever process answered it. The directory must
+exist and be emptied before the service starts.
+"""
+
+import os
+from typing import Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client import start_http_server as _start_http_server
+
+__all__ = [
+    "CONTENT_TYPE",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "mark_process_dead",
+    "render",
+    "start_http_server",
+]
+
+# Media type of the Prometheus text exposition format
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+def multiprocess_enabled() -> bool:
+    """
+    Check whether samples are shared between processes.
+
+    Returns:
+        bool: True if PROMETHEUS_MULTIPROC_DIR is set, False otherwise.
+    """
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def collector_registry() -> CollectorRegistry:
+    """
+    Get the registry to expose: every process's samples, or this process's.
+
+    Returns:
+        CollectorRegistry: The registry.
+    """
+    if not multiprocess_enabled():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render() -> bytes:
+    """
+    Render the metrics in the Prometheus text format.
+
+    Returns:
+        bytes: The exposition body.
+    """
+    return generate_latest(collector_registry())
+
+
+def start_http_server(port: int, addr: str = "0.0.0.0"):
+    """
+    Serve the metrics over HTTP from a daemon thread.
+
+    Meant for processes without a web app, such as the Celery worker.
+
+    Args:
+        port (int): The port to listen on.
+        addr (str, optional): The address to bind. Defaults to "0.0.0.0".
+    """
+    _start_http_server(port, addr, registry=collector_registry())
+
+
+def mark_process_dead(pid: Optional[int] = None):
+    """
+    Drop the live gauges of an exiting process from the aggregate.
+
+    Args:
+        pid (Optional[int], optional): The process ID. Defaults to the current process.
+    """
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -0,0 +1,118 @@
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+import redis
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Subscriber:
+    """
+    One Redis pub/sub connection per process, dispatching messages by channel.
+
+    Handlers are registered at import time and the subscriber is started from
+    the app lifespan, so requests never open or wait on the connection. It
+    runs in a daemon thread and reconnects with exponential backoff while
+    Redis is unreachable. After each (re)subscribe the on_connect callbacks
+    run with a client, so state that may have been missed while disconnected
+    can be reloaded or dropped.
+    """
+
+    def __init__(self, redis_url: Optional[str], max_backoff: float = 30.0):
+        self.redis_url = redis_url
+        self.max_backoff = max_backoff
+        self._handlers: Dict[str, Callable[[dict], None]] = {}
+        self._on_connect: List[Callable[[redis.Redis], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._delay = 1.0
+
+    def subscribe(
+        self,
+        channel: str,
+        handler: Callable[[dict], None],
+        on_connect: Optional[Callable[[redis.Redis], None]] = None,
+    ):
+        """
+        Register the handler of a channel; takes effect on the next connect.
+
+        Args:
+            channel (str): The channel name.
+            handler (Callable[[dict], None]): Called with each message of the channel.
+            on_connect (Optional[Callable[[redis.Redis], None]], optional): Called
+                with a client after every (re)subscribe. Defaults to None.
+        """
+        self._handlers[channel] = handler
+        if on_connect is not None:
+            self._on_connect.append(on_connect)
+
+    def start(self):
+        """
+        Start listening in a background thread, unless Redis is not configured.
+        """
+        if self.redis_url is None or not self._handlers or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="redis-subscriber", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop listening and wait for the background thread to exit.
+
+        Args:
+            timeout (float, optional): The longest time to wait, in seconds. Defaults to 5.0.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _dispatch(self, message: dict):
+        channel = message["channel"]
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        handler = self._handlers.get(channel)
+        if handler is None:
+            return
+        try:
+            handler(message)
+        except Exception:
+            logger.exception("Handler of channel %s failed", channel)
+
+    def _listen(self):
+        client = redis.Redis.from_url(self.redis_url)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(*self._handlers)
+            # Subscribed first, so nothing published from here on is missed
+            for callback in self._on_connect:
+                callback(client)
+            logger.info("Subscribed to %s", ", ".join(self._handlers))
+            self._delay = 1.0
+            while not self._stop.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message is not None:
+                    self._dispatch(message)
+        finally:
+            pubsub.close()
+            client.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except redis.RedisError as e:
+                logger.warning(
+                    "Redis subscriber disconnected, retrying in %.0fs: %s",
+                    self._delay,
+                    e,
+                )
+                self._stop.wait(self._delay)
+                self._delay = min(self._delay * 2, self.max_backoff)
+
+
+subscriber = Subscriber(settings.REDIS_URL)
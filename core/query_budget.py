@@ -0,0 +1,206 @@
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%s|:\w+|%\(\w+\)s)"
+_IN_LIST = re.compile(rf"\bin \(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_VALUES = re.compile(r"(\bvalues \([^)]*\))(?:\s*,\s*\([^)]*\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Reduce a SQL statement to its shape.
+
+    Literals become placeholders, IN lists and multi-row VALUES collapse to
+    one entry, and whitespace and case are normalized, so the same query run
+    for different rows gets the same fingerprint.
+
+    Args:
+        statement (str): The SQL statement.
+
+    Returns:
+        str: The fingerprint.
+    """
+    shape = _WHITESPACE.sub(" ", statement.strip()).lower()
+    shape = _STRING.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("in (...)", shape)
+    return _VALUES.sub(r"\1", shape)
+
+
+class QueryTracker:
+    """
+    The statements run within one scope, counted by fingerprint.
+    """
+
+    def __init__(self):
+        self.statements: List[str] = []
+        self.shapes: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def record(self, statement: str):
+        """
+        Count a statement.
+
+        Args:
+            statement (str): The SQL statement.
+        """
+        self.statements.append(statement)
+        self.shapes[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Get the statement shapes run at least threshold times, most frequent first.
+
+        Args:
+            threshold (int): The number of runs from which a shape is reported.
+
+        Returns:
+            List[Tuple[str, int]]: The (fingerprint, count) of each repeated shape.
+        """
+        return [(s, n) for s, n in self.shapes.most_common() if n >= threshold]
+
+
+# Tracker of the request being served, set by QueryBudgetMiddleware
+_request_tracker: ContextVar[Optional[QueryTracker]] = ContextVar(
+    "request_query_tracker", default=None
+)
+
+# Trackers of active query_budget blocks; global rather than per context so
+# apps run on another thread, as by the sync test client, are counted too
+_budget_trackers: List[QueryTracker] = []
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    tracker = _request_tracker.get()
+    if tracker is not None:
+        tracker.record(statement)
+    for tracker in _budget_trackers:
+        tracker.record(statement)
+
+
+def enable_query_tracking(engine: Engine):
+    """
+    Start counting the statements of an engine for query budgets.
+
+    For an async engine, pass its sync_engine: the events fire there.
+
+    Args:
+        engine (Engine): The engine to track.
+    """
+    if not event.contains(engine, "before_cursor_execute", _record_statement):
+        event.listen(engine, "before_cursor_execute", _record_statement)
+
+
+class QueryBudgetMiddleware:
+    """
+    ASGI middleware logging requests that look like an N+1 query pattern.
+
+    A request is flagged when one statement shape runs at least threshold
+    times, which is what lazy loading a relationship per row looks like.
+    Meant for development and CI; fingerprinting every statement has a cost.
+    """
+
+    def __init__(self, app: ASGIApp, threshold: int = 5):
+        self.app = app
+        self.threshold = threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tracker = QueryTracker()
+        token = _request_tracker.set(tracker)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_tracker.reset(token)
+            route = getattr(scope.get("route"), "path", scope["path"])
+            for shape, count in tracker.repeated(self.threshold):
+                logger.warning(
+                    "Possible N+1 on %s %s: %d of %d statements are %s",
+                    scope["method"],
+                    route,
+                    count,
+                    len(tracker),
+                    shape,
+                )
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when a block runs more statements than its budget allows.
+    """
+
+
+@contextmanager
+def query_budget(
+    max_statements: int,
+    max_repeats: Optional[int] = None,
+    engines: Optional[List[Engine]] = None,
+) -> Iterator[QueryTracker]:
+    """
+    Fail if the enclosed block runs more statements than its budget.
+
+    Meant for tests pinning the number of queries of an endpoint:
+
+        with query_budget(3):
+            response = await client.get("/doctors/appointments", headers=headers)
+
+    Args:
+        max_statements (int): The most statements the block may run.
+        max_repeats (Optional[int], optional): The most times any one statement shape may run. Defaults to None (no limit).
+        engines (Optional[List[Engine]], optional): The engines to track. Defaults to the application's engines, read replica included.
+
+    Returns:
+        Iterator[QueryTracker]: The tracker of the block.
+
+    Raises:
+        QueryBudgetExceeded: If the block ran over its budget.
+    """
+    if engines is None:
+        # Imported here: core.database imports this module to enable tracking
+        from core.database import async_engine, async_read_engine, engine
+
+        engines = [
+            engine,
+            async_engine.sync_engine,
+            async_read_engine.sync_engine,
+        ]
+    for tracked in engines:
+        enable_query_tracking(tracked)
+
+    tracker = QueryTracker()
+    _budget_trackers.append(tracker)
+    try:
+        yield tracker
+    finally:
+        _budget_trackers.remove(tracker)
+
+    problems = []
+    if len(tracker) > max_statements:
+        problems.append(f"{len(tracker)} statements, budget is {max_statements}")
+    if max_repeats is not None:
+        problems.extend(
+            f"{count} runs of {shape}"
+            for shape, count in tracker.repeated(max_repeats + 1)
+        )
+    if problems:
+        listing = "\n".join(f"  {s}" for s in tracker.statements)
+        raise QueryBudgetExceeded(
+            "Query budget exceeded: " + "; ".join(problems) + "\n" + listing
+        )
@@ -0,0 +1,99 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+import redis
+import redis.asyncio as aioredis
+from core.config import settings
+from core.pubsub import subscriber
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationSet:
+    """
+    Users whose tokens issued up to a given time must be rejected.
+
+    Tokens only live for the access token TTL, so an entry can be dropped
+    once every token it could match has expired; this keeps the set small.
+
+    When REDIS_URL is set, revocations are stored in Redis for the token TTL
+    and broadcast to every worker over the shared subscriber. A worker loads
+    the stored ones whenever it (re)subscribes, so it also rejects tokens
+    revoked before it started or while it was disconnected.
+    """
+
+    CHANNEL = "token-revocations"
+
+    def __init__(self, ttl_seconds: int, redis_url: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self.redis_url = redis_url
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._redis = aioredis.from_url(redis_url) if redis_url else None
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"revoked:{user_id}"
+
+    def _record(self, user_id: str, revoked_at: float):
+        with self._lock:
+            self._revoked[user_id] = max(revoked_at, self._revoked.get(user_id, 0))
+            self._prune()
+
+    def _on_message(self, message: dict):
+        user_id, revoked_at = message["data"].decode().rsplit(" ", 1)
+        self._record(user_id, float(revoked_at))
+
+    def _load(self, client: redis.Redis):
+        for key in client.scan_iter(match=self._key("*")):
+            revoked_at = client.get(key)
+            if revoked_at is not None:
+                user_id = key.decode().split(":", 1)[1]
+                self._record(user_id, float(revoked_at))
+
+    async def revoke(self, user_id: str, revoked_at: Optional[float] = None):
+        """
+        Revoke every token issued to a user so far, in every worker.
+
+        Args:
+            user_id (str): The ID of the user.
+            revoked_at (float, optional): The revocation timestamp. Defaults to now.
+        """
+        revoked_at = revoked_at or time.time()
+        self._record(user_id, revoked_at)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(self._key(user_id), revoked_at, ex=self.ttl_seconds)
+            await self._redis.publish(self.CHANNEL, f"{user_id} {revoked_at}")
+        except redis.RedisError as e:
+            logger.warning("Token revocation channel unavailable: %s", e)
+
+    def is_revoked(self, user_id: str, issued_at: float) -> bool:
+        """
+        Check whether a token has been revoked.
+
+        Args:
+            user_id (str): The ID of the user the token was issued to.
+            issued_at (float): The time the token was issued at.
+
+        Returns:
+            bool: True if the token is revoked, False otherwise.
+        """
+        revoked_at = self._revoked.get(user_id)
+        return revoked_at is not None and issued_at <= revoked_at
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl_seconds
+        for user_id in [u for u, at in self._revoked.items() if at < cutoff]:
+            del self._revoked[user_id]
+
+
+revoked_tokens = RevocationSet(
+    ttl_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    redis_url=settings.REDIS_URL,
+)
+subscriber.subscribe(
+    RevocationSet.CHANNEL, revoked_tokens._on_message, on_connect=revoked_tokens._load
+)
@@ -0,0 +1,268 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.enums import AppointmentStatusEnum, WeekdayEnum
+from models.appointment import Appointment
+from models.availability import Availability
+
+Interval = Tuple[datetime, datetime]
+
+WeeklySlot = Tuple[WeekdayEnum, time, time]
+
+MAX_AVAILABILITY_RANGE_DAYS = 31
+
+# WeekdayEnum is declared monday..sunday, matching date.weekday()
+_WEEKDAYS = list(WeekdayEnum)
+
+
+def weekday_of(day: date) -> WeekdayEnum:
+    """
+    Get the weekday of a date.
+
+    Args:
+        day (date): The date.
+
+    Returns:
+        WeekdayEnum: The weekday of the date.
+    """
+    return _WEEKDAYS[day.weekday()]
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """
+    Merge overlapping and touching intervals.
+
+    Args:
+        intervals (Iterable[Interval]): The intervals to merge.
+
+    Returns:
+        List[Interval]: The merged intervals, sorted by start.
+    """
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(
+    windows: List[Interval], booked: List[Interval]
+) -> List[Interval]:
+    """
+    Subtract booked intervals from availability windows in a single sweep.
+
+    Args:
+        windows (List[Interval]): Merged availability windows, sorted by start.
+        booked (List[Interval]): Merged booked intervals, sorted by start.
+
+    Returns:
+        List[Interval]: The free sub-intervals, sorted by start.
+    """
+    free: List[Interval] = []
+    i = 0
+    for window_start, window_end in windows:
+        cursor = window_start
+        while i < len(booked) and booked[i][1] <= cursor:
+            i += 1
+
+        j = i
+        while j < len(booked) and booked[j][0] < window_end:
+            booked_start, booked_end = booked[j]
+            if booked_start > cursor:
+                free.append((cursor, booked_start))
+            cursor = max(cursor, booked_end)
+            j += 1
+
+        if cursor < window_end:
+            free.append((cursor, window_end))
+    return free
+
+
+def compute_free_slots(
+    slots: Iterable[Availability],
+    appointments: Iterable[Interval],
+    start_date: date,
+    end_date: date,
+) -> Dict[date, List[Interval]]:
+    """
+    Compute the free intervals for every date in a range.
+
+    Args:
+        slots (Iterable[Availability]): The doctor's weekly availability slots.
+        appointments (Iterable[Interval]): The booked (start, end) intervals.
+        start_date (date): The first date of the range.
+        end_date (date): The last date of the range (inclusive).
+
+    Returns:
+        Dict[date, List[Interval]]: The free intervals keyed by date.
+    """
+    weekly = defaultdict(list)
+    for slot in slots:
+        weekly[slot.weekday].append((slot.start_time, slot.end_time))
+
+    windows: List[Interval] = []
+    day = start_date
+    while day <= end_date:
+        for start_time, end_time in weekly.get(weekday_of(day), ()):
+            windows.append(
+                (datetime.combine(day, start_time), datetime.combine(day, end_time))
+            )
+        day += timedelta(days=1)
+
+    free = subtract_intervals(merge_intervals(windows), merge_intervals(appointments))
+
+    free_by_date: Dict[date, List[Interval]] = {}
+    day = start_date
+    while day <= end_date:
+        free_by_date[day] = []
+        day += timedelta(days=1)
+    for start, end in free:
+        free_by_date[start.date()].append((start, end))
+    return free_by_date
+
+
+async def load_free_slots(
+    db: AsyncSession, doctor_id: str, start_date: date, end_date: date
+) -> Dict[date, List[Interval]]:
+    """
+    Load a doctor's schedule for a date range and compute the free intervals.
+
+    The weekly availability and the booked appointments are each fetched in
+    a single query, then merged in memory.
+
+    Args:
+        db (AsyncSession): The database session.
+        doctor_id (str): The ID of the doctor.
+        start_date (date): The first date of the range.
+        end_date (date): The last date of the range (inclusive).
+
+    Returns:
+        Dict[date, List[Interval]]: The free intervals keyed by date.
+    """
+    range_start = datetime.combine(start_date, datetime.min.time())
+    range_end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+
+    slots = await db.scalars(
+        select(Availability).where(
+            Availability.doctor_id == doctor_id,
+            Availability.available == True,
+        )
+    )
+
+    appointments = await db.execute(
+        select(Appointment.scheduled_start, Appointment.scheduled_end).where(
+            Appointment.doctor_id == doctor_id,
+            Appointment.scheduled_start < range_end,
+            Appointment.scheduled_end > range_start,
+            Appointment.status != AppointmentStatusEnum.cancelled,
+        )
+    )
+
+    return compute_free_slots(
+        slots,
+        [(start, end) for start, end in appointments],
+        start_date,
+        end_date,
+    )
+
+
+def find_slot_conflicts(
+    proposed: Iterable[WeeklySlot], existing: Iterable[WeeklySlot] = ()
+) -> List[Tuple[WeeklySlot, WeeklySlot]]:
+    """
+    Find the weekly slots of a template that overlap each other or existing slots.
+
+    All slots are sorted by weekday and start time, then swept once while
+    tracking the slot reaching furthest so far. Touching slots do not overlap.
+
+    Args:
+        proposed (Iterable[WeeklySlot]): The (weekday, start, end) slots to add.
+        existing (Iterable[WeeklySlot], optional): The slots already stored. Defaults to ().
+
+    Returns:
+        List[Tuple[WeeklySlot, WeeklySlot]]: The overlapping pairs, each with a proposed slot second.
+    """
+    order = {weekday: i for i, weekday in enumerate(_WEEKDAYS)}
+    tagged = [(slot, False) for slot in existing] + [(slot, True) for slot in proposed]
+    tagged.sort(key=lambda item: (order[item[0][0]], item[0][1], item[0][2]))
+
+    conflicts: List[Tuple[WeeklySlot, WeeklySlot]] = []
+    furthest = None
+    for slot, is_new in tagged:
+        if furthest is not None:
+            reaching, reaching_is_new = furthest
+            if reaching[0] == slot[0] and slot[1] < reaching[2]:
+                if is_new or reaching_is_new:
+                    pair = (slot, reaching) if reaching_is_new else (reaching, slot)
+                    conflicts.append(pair)
+                if slot[2] <= reaching[2]:
+                    continue
+        furthest = (slot, is_new)
+    return conflicts
+
+
+async def insert_weekly_templates(
+    db: AsyncSession, templates: Dict[str, List[WeeklySlot]]
+) -> int:
+    """
+    Validate weekly templates against stored slots and insert them in one batch.
+
+    Existing slots of every doctor are loaded in a single query, and the new
+    rows are written with a single executemany. The caller commits.
+
+    Args:
+        db (AsyncSession): The database session.
+        templates (Dict[str, List[WeeklySlot]]): The slots to add, keyed by doctor ID.
+
+    Returns:
+        int: The number of slots inserted.
+    """
+    existing = defaultdict(list)
+    rows = await db.execute(
+        select(
+            Availability.doctor_id,
+            Availability.weekday,
+            Availability.start_time,
+            Availability.end_time,
+        ).where(Availability.doctor_id.in_(list(templates)))
+    )
+    for doctor_id, weekday, start_time, end_time in rows:
+        existing[doctor_id].append((weekday, start_time, end_time))
+
+    conflicts = []
+    for doctor_id, slots in templates.items():
+        for stored, new in find_slot_conflicts(slots, existing[doctor_id]):
+            conflicts.append(
+                {
+                    "doctor_id": doctor_id,
+                    "weekday": new[0].value,
+                    "slot": f"{new[1].isoformat()}-{new[2].isoformat()}",
+                    "overlaps": f"{stored[1].isoformat()}-{stored[2].isoformat()}",
+                }
+            )
+    if conflicts:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Availability slots overlap", "conflicts": conflicts},
+        )
+
+    values = [
+        {
+            "doctor_id": doctor_id,
+            "weekday": weekday,
+            "start_time": start_time,
+            "end_time": end_time,
+            "available": True,
+        }
+        for doctor_id, slots in templates.items()
+        for weekday, start_time, end_time in slots
+    ]
+    if values:
+        await db.execute(insert(Availability), values)
+    return len(values)
@@ -0,0 +1,240 @@
+import threading
+from time import monotonic
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from deps.utils import normalize_specialization
+from models.doctor import Doctor
+
+# Ranking of the ways a query can match a specialization, best first
+EXACT, PREFIX, WORD_PREFIX, FUZZY = range(4)
+MATCH_KINDS = ("exact", "prefix", "word_prefix", "fuzzy")
+
+
+class _TrieNode:
+    __slots__ = ("children", "terms")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.terms: Set[str] = set()
+
+
+class SpecializationIndex:
+    """
+    In-memory search index over the normalized specialization vocabulary.
+
+    The trie is built over the vocabulary, not over doctors: every word start
+    of a specialization is inserted, so "surg" finds "general surgery", and
+    each node keeps the specializations below it. Lookups cost the length of
+    the query, and the fuzzy fallback scans only the vocabulary, so both stay
+    flat as the number of doctors grows.
+
+    Writes from this process are applied incrementally; the index is fully
+    reloaded from the primary after SEARCH_INDEX_REFRESH_SECONDS to pick up
+    other workers' writes. A reload that overlapped a local write is thrown
+    away and retried, so it cannot drop a doctor this worker just added.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._root = _TrieNode()
+        self._doctors: Dict[str, str] = {}
+        self._counts: Dict[str, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _insert_term(self, term: str):
+        words = term.split(" ")
+        for start in range(len(words)):
+            node = self._root
+            for char in " ".join(words[start:]):
+                node = node.children.setdefault(char, _TrieNode())
+                node.terms.add(term)
+
+    def _remove_term(self, term: str):
+        words = term.split(" ")
+        for start in range(len(words)):
+            node = self._root
+            for char in " ".join(words[start:]):
+                child = node.children.get(char)
+                if child is None:
+                    break
+                child.terms.discard(term)
+                if not child.terms:
+                    del node.children[char]
+                    break
+                node = child
+
+    def add(self, doctor_id: str, specialization_key: str):
+        """
+        Index a doctor under a normalized specialization.
+
+        Args:
+            doctor_id (str): The ID of the doctor.
+            specialization_key (str): The normalized specialization.
+        """
+        with self._lock:
+            self._writes += 1
+            self._discard(doctor_id)
+            self._doctors[doctor_id] = specialization_key
+            self._counts[specialization_key] = (
+                self._counts.get(specialization_key, 0) + 1
+            )
+            if self._counts[specialization_key] == 1:
+                self._insert_term(specialization_key)
+
+    def remove(self, doctor_id: str):
+        """
+        Drop a doctor from the index.
+
+        Args:
+            doctor_id (str): The ID of the doctor.
+        """
+        with self._lock:
+            self._writes += 1
+            self._discard(doctor_id)
+
+    def _discard(self, doctor_id: str):
+        term = self._doctors.pop(doctor_id, None)
+        if term is None:
+            return
+        self._counts[term] -= 1
+        if not self._counts[term]:
+            del self._counts[term]
+            self._remove_term(term)
+
+    def rebuild(
+        self, doctors: List[Tuple[str, str]], writes: Optional[int] = None
+    ) -> bool:
+        """
+        Replace the whole index.
+
+        Args:
+            doctors (List[Tuple[str, str]]): The (doctor ID, normalized specialization) pairs.
+            writes (Optional[int], optional): The local write count read before
+                the doctors were loaded; the rebuild is skipped if it changed.
+                Defaults to None.
+
+        Returns:
+            bool: True if the index was replaced, False if it was skipped.
+        """
+        root = _TrieNode()
+        counts: Dict[str, int] = {}
+        for _, term in doctors:
+            counts[term] = counts.get(term, 0) + 1
+        with self._lock:
+            if writes is not None and writes != self._writes:
+                return False
+            self._root = root
+            self._doctors = dict(doctors)
+            self._counts = counts
+            for term in counts:
+                self._insert_term(term)
+            self._loaded_at = monotonic()
+        return True
+
+    async def ensure_loaded(self, db: AsyncSession):
+        """
+        Load the index from the database if it is empty or due for a refresh.
+
+        Args:
+            db (AsyncSession): The primary database session; a lagging replica
+                could miss doctors this worker has already indexed.
+        """
+        loaded_at = self._loaded_at
+        if loaded_at is not None and monotonic() - loaded_at < self.refresh_seconds:
+            return
+        writes = self._writes
+        rows = await db.execute(select(Doctor.id, Doctor.specialization_key))
+        self.rebuild([(doctor_id, key) for doctor_id, key in rows if key], writes)
+
+    def _fuzzy_matches(self, needle: str, limit: int) -> Dict[str, int]:
+        # Walk the trie carrying one Levenshtein row per node (needle against
+        # the path so far), pruning a branch once every entry exceeds the limit.
+        # A node whose path is within the limit matches every term below it
+        found: Dict[str, int] = {}
+        first_row = list(range(len(needle) + 1))
+        stack = [
+            (char, child, first_row) for char, child in self._root.children.items()
+        ]
+        while stack:
+            char, node, previous = stack.pop()
+            row = [previous[0] + 1]
+            best = current = row[0]
+            for i, needle_char in enumerate(needle, start=1):
+                current += 1
+                if previous[i] + 1 < current:
+                    current = previous[i] + 1
+                if previous[i - 1] + (needle_char != char) < current:
+                    current = previous[i - 1] + (needle_char != char)
+                row.append(current)
+                if current < best:
+                    best = current
+            if current <= limit:
+                for term in node.terms:
+                    if current < found.get(term, limit + 1):
+                        found[term] = current
+            if best <= limit:
+                stack.extend(
+                    (next_char, child, row)
+                    for next_char, child in node.children.items()
+                )
+        return found
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, int, str]]:
+        """
+        Find the specializations matching a query, best matches first.
+
+        Exact matches rank first, then prefixes of the whole specialization,
+        then prefixes of a later word. Only when nothing matches a prefix are
+        specializations within a small edit distance returned. Ties are broken
+        by the number of doctors.
+
+        Args:
+            query (str): The search text.
+            limit (int, optional): The maximum number of matches. Defaults to 10.
+
+        Returns:
+            List[Tuple[str, int, str]]: The (specialization, doctor count, match kind) of each match.
+        """
+        needle = normalize_specialization(query)
+        if not needle:
+            return []
+
+        with self._lock:
+            ranked: Dict[str, Tuple[int, int]] = {}
+            node = self._root
+            for char in needle:
+                node = node.children.get(char)
+                if node is None:
+                    break
+            else:
+                for term in node.terms:
+                    if term == needle:
+                        kind = EXACT
+                    elif term.startswith(needle):
+                        kind = PREFIX
+                    else:
+                        kind = WORD_PREFIX
+                    ranked[term] = (kind, 0)
+
+            if not ranked:
+                max_distance = 1 if len(needle) <= 4 else 2
+                for term, distance in self._fuzzy_matches(needle, max_distance).items():
+                    ranked.setdefault(term, (FUZZY, distance))
+
+            matches = sorted(
+                ranked.items(),
+                key=lambda item: (item[1], -self._counts[item[0]], item[0]),
+            )[:limit]
+            return [
+                (term, self._counts[term], MATCH_KINDS[kind])
+                for term, (kind, _) in matches
+            ]
+
+
+specialization_index = SpecializationIndex(
+    refresh_seconds=settings.SEARCH_INDEX_REFRESH_SECONDS
+)
@@ -1,10 +1,38 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
 from core.config import settings
+from core.metrics import Counter, Histogram
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+PASSWORD_JOB_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+password_job_wait_seconds = Histogram(
+    "password_job_wait_seconds",
+    "Time a password job waits in the queue before a worker picks it up",
+    labelnames=("operation",),
+    buckets=PASSWORD_JOB_BUCKETS,
+)
+password_job_run_seconds = Histogram(
+    "password_job_run_seconds",
+    "Time a worker spends hashing or verifying a password",
+    labelnames=("operation",),
+    buckets=PASSWORD_JOB_BUCKETS,
+)
+password_job_rejected_total = Counter(
+    "password_job_rejected_total",
+    "Password jobs rejected because the worker pool queue was full",
+    labelnames=("operation",),
+)
+
 
 def hash_password(password: str):
     """
@@ -33,6 +61,138 @@ def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def _timed_call(fn, *args):
+    """
+    Run a function in a pool worker and report when it started and finished.
+    """
+    started = time.time()
+    result = fn(*args)
+    return started, time.time(), result
+
+
+class PasswordWorkerPool:
+    """
+    A bounded process pool for bcrypt, so hashing never runs on the event loop.
+
+    At most `workers` jobs run at once and at most `max_queue` more wait for a
+    worker; any job beyond that is rejected immediately with a 503. If a
+    worker process dies (e.g. OOM-killed), the executor is broken for good,
+    so it is replaced and the job retried once on the new one.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_pending = workers + max_queue
+        self._pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        # Jobs failing together on one broken executor only replace it once
+        if self._executor is executor:
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, operation: str, fn, *args):
+        """
+        Run a password function in the pool.
+
+        Args:
+            operation (str): The operation name, used as a metric label.
+            fn (Callable): The module-level function to run.
+
+        Returns:
+            Any: The return value of the function.
+
+        Raises:
+            HTTPException: 503 if the queue is full.
+        """
+        if self._pending >= self.max_pending:
+            password_job_rejected_total.labels(operation=operation).inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        self._pending += 1
+        submitted = time.time()
+        try:
+            for attempt in range(2):
+                executor = self._get_executor()
+                try:
+                    (
+                        started,
+                        finished,
+                        result,
+                    ) = await asyncio.get_running_loop().run_in_executor(
+                        executor, _timed_call, fn, *args
+                    )
+                    break
+                except BrokenProcessPool:
+                    self._discard_executor(executor)
+                    if attempt:
+                        raise
+        finally:
+            self._pending -= 1
+
+        password_job_wait_seconds.labels(operation=operation).observe(
+            max(started - submitted, 0.0)
+        )
+        password_job_run_seconds.labels(operation=operation).observe(finished - started)
+        return result
+
+    def shutdown(self):
+        """
+        Stop the worker processes.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordWorkerPool(
+    workers=settings.PASSWORD_POOL_WORKERS,
+    max_queue=settings.PASSWORD_POOL_MAX_QUEUE,
+)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password using bcrypt in the password worker pool.
+
+    Args:
+        password (str): The password to hash.
+
+    Returns:
+        str: The hashed password.
+    """
+    return await password_pool.run("hash", hash_password, password)
+
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    """
+    Verify a password against a hashed password in the password worker pool.
+
+    Args:
+        plain_password (str): The password to verify.
+        hashed_password (str): The hashed password to compare against.
+
+    Returns:
+        bool: True if the passwords match, False otherwise.
+    """
+    return await password_pool.run(
+        "verify", verify_password, plain_password, hashed_password
+    )
+
+
 def create_access_token(data: dict):
     """
     Create an access token.
@@ -44,9 +204,8 @@ def create_access_token(data: dict):
         str: The access token.
     """
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(
-        minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-    )
-    to_encode.update({"exp": expire})
+    issued_at = datetime.now(timezone.utc)
+    expire = issued_at + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"iat": issued_at, "exp": expire})
 
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
@@ -0,0 +1,81 @@
+from contextlib import asynccontextmanager
+from sqlalchemy import select, text
+from sqlalchemy.exc import IntegrityError
+from core.database import AsyncSessionLocal, async_engine
+from core.security import hash_password_async
+from models.user import User
+
+
+@asynccontextmanager
+async def startup_lock(name: str, timeout: int = 30):
+    """
+    Hold a database-wide named lock, so startup work runs in one worker at a time.
+
+    On MySQL this is GET_LOCK on a dedicated connection; other backends rely
+    on the unique constraints of the rows being created.
+
+    Args:
+        name (str): The name of the lock.
+        timeout (int, optional): The longest time to wait for the lock, in seconds. Defaults to 30.
+
+    Raises:
+        RuntimeError: If the lock was not acquired in time.
+    """
+    if async_engine.dialect.name != "mysql":
+        yield
+        return
+
+    async with async_engine.connect() as conn:
+        acquired = await conn.scalar(
+            text("SELECT GET_LOCK(:name, :timeout)"),
+            {"name": name, "timeout": timeout},
+        )
+        if acquired != 1:
+            raise RuntimeError(f"Timed out waiting for the {name} lock")
+        try:
+            yield
+        finally:
+            await conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
+
+
+async def seed_super_admin(email: str, password: str) -> bool:
+    """
+    Create the super admin account unless it already exists.
+
+    The common case, an existing account, costs one indexed lookup and no
+    password hash. Creation is serialized across workers and re-checked
+    under the lock, and a unique-email conflict with a concurrent worker is
+    treated as success.
+
+    Args:
+        email (str): The email of the super admin.
+        password (str): The password of the super admin.
+
+    Returns:
+        bool: True if this call created the account, False otherwise.
+    """
+    exists = select(User.id).where(User.email == email)
+    async with AsyncSessionLocal() as db:
+        if await db.scalar(exists):
+            return False
+        await db.rollback()
+
+        async with startup_lock("seed_super_admin"):
+            if await db.scalar(exists):
+                return False
+
+            db.add(
+                User(
+                    email=email,
+                    first_name="Super",
+                    last_name="Admin",
+                    hashed_password=await hash_password_async(password),
+                    role="admin",
+                )
+            )
+            try:
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()
+                return False
+    return True
@@ -1,46 +1,110 @@
-from typing import Annotated
+from typing import Annotated, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .db import get_db
-from models import User
+from core.cache import principal_cache
+from core.revocation import revoked_tokens
+from models import Doctor, Patient, User
+from schemas.auth import Principal, TokenClaims
 from schemas.user import UserRole
 from core.config import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Profile claim each role must carry to act on its own resources
+PROFILE_CLAIMS = {
+    UserRole.doctor: "doctor_id",
+    UserRole.patient: "patient_id",
+}
 
-def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Annotated[Session, Depends(get_db)],
-) -> User:
+
+def get_current_claims(token: Annotated[str, Depends(oauth2_scheme)]) -> TokenClaims:
     """
-    Get the current user based on the provided token.
+    Get the signed claims of the provided token, without a database lookup.
 
     Args:
         token (str): The JWT token.
-        db (Session): The database session.
 
     Returns:
-        User: The current user.
+        TokenClaims: The claims of the token.
     """
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-
-        user_id: str = str(payload.get("sub"))
-
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        return user
-    except JWTError:
+        claims = TokenClaims(**payload)
+    except (JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
 
+    if revoked_tokens.is_revoked(claims.sub, claims.iat):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked"
+        )
+    return claims
+
+
+async def load_principal(db: AsyncSession, user_id: str) -> Optional[Principal]:
+    """
+    Load a detached principal snapshot of a user and their profile ids.
+
+    Args:
+        db (AsyncSession): The database session.
+        user_id (str): The ID of the user.
+
+    Returns:
+        Optional[Principal]: The principal, or None if the user does not exist.
+    """
+    row = (
+        await db.execute(
+            select(User, Doctor.id, Patient.id)
+            .outerjoin(Doctor, Doctor.user_id == User.id)
+            .outerjoin(Patient, Patient.user_id == User.id)
+            .where(User.id == user_id)
+        )
+    ).first()
+    if row is None:
+        return None
+
+    user, doctor_id, patient_id = row
+    return Principal(
+        id=user.id,
+        email=user.email,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        role=user.role.value,
+        doctor_id=doctor_id,
+        patient_id=patient_id,
+    )
+
+
+async def get_current_user(
+    claims: Annotated[TokenClaims, Depends(get_current_claims)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> Principal:
+    """
+    Get the current user based on the provided token.
+
+    Args:
+        claims (TokenClaims): The claims of the token.
+        db (AsyncSession): The database session.
+
+    Returns:
+        Principal: A read-only snapshot of the current user.
+    """
+    principal = await principal_cache.get(claims.sub)
+    if principal is None:
+        principal = await load_principal(db, claims.sub)
+        if not principal:
+            raise HTTPException(status_code=404, detail="User not found")
+        await principal_cache.set(principal)
+    return principal
+
 
 def require_role(required_role: UserRole):
     """
@@ -53,21 +117,28 @@ def require_role(required_role: UserRole):
         Callable: The decorated function.
     """
 
-    def role_dependency(user: Annotated[User, Depends(get_current_user)]):
+    def role_dependency(claims: Annotated[TokenClaims, Depends(get_current_claims)]):
         """
-        Decorator to require a specific user role.
+        Decorator to require a specific user role, read from the token claims.
 
         Args:
-            user (User): The current user.
+            claims (TokenClaims): The claims of the current token.
 
         Returns:
-            User: The current user.
+            TokenClaims: The claims of the current token.
         """
-        if user.role != required_role:
+        if claims.role != required_role:
             raise HTTPException(
                 status_code=403, detail="You do not have access to this resource"
             )
-        return user
+
+        profile_claim = PROFILE_CLAIMS.get(required_role)
+        if profile_claim and not getattr(claims, profile_claim):
+            raise HTTPException(
+                status_code=404,
+                detail=f"{required_role.value.capitalize()} profile not found",
+            )
+        return claims
 
     return role_dependency
 
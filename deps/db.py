@@ -1,15 +1,27 @@
-from core.database import SessionLocal
+from core.database import AsyncReadSessionLocal, AsyncSessionLocal
 
 
-def get_db():
+async def get_db():
     """
-    Get a database session.
+    Get an async database session.
 
     Returns:
-        Session: A database session.
+        AsyncSession: An async database session.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db():
+    """
+    Get an async database session on the read replica.
+
+    Only for handlers that read and can tolerate replication lag; anything
+    that writes, or must see the caller's own recent writes, uses get_db.
+    Without a replica configured this is a session on the primary.
+
+    Returns:
+        AsyncSession: An async database session on the read replica.
+    """
+    async with AsyncReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
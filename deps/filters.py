@@ -0,0 +1,82 @@
+from datetime import datetime
+from typing import Annotated, Optional
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select
+from core.enums import AppointmentStatusEnum
+from models.appointment import Appointment
+from deps.utils import to_naive_utc
+from schemas.appointment import AppointmentFilters
+
+# Widest window a calendar request may span; about a quarter
+MAX_CALENDAR_RANGE_DAYS = 92
+
+
+def get_appointment_filters(
+    start: Annotated[
+        Optional[datetime],
+        Query(
+            alias="from", description="Only appointments starting at or after this time"
+        ),
+    ] = None,
+    end: Annotated[
+        Optional[datetime],
+        Query(alias="to", description="Only appointments starting before this time"),
+    ] = None,
+    appointment_status: Annotated[
+        Optional[AppointmentStatusEnum],
+        Query(alias="status", description="Only appointments with this status"),
+    ] = None,
+) -> AppointmentFilters:
+    """
+    Get the time window and status filters of an appointment list request.
+
+    The window is half-open: from is included, to is not, so consecutive
+    windows such as weeks never return an appointment twice.
+    Bounds with an offset are converted to the naive UTC form the database
+    stores, so aware and naive bounds can be mixed.
+
+    Args:
+        start (Optional[datetime], optional): The start of the window.
+        end (Optional[datetime], optional): The end of the window.
+        appointment_status (Optional[AppointmentStatusEnum], optional): The status to keep.
+
+    Returns:
+        AppointmentFilters: The filters.
+
+    Raises:
+        HTTPException: If the window ends before it starts.
+    """
+    if start is not None:
+        start = to_naive_utc(start)
+    if end is not None:
+        end = to_naive_utc(end)
+    if start is not None and end is not None and end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="to must be after from",
+        )
+    return AppointmentFilters(start=start, end=end, status=appointment_status)
+
+
+def filter_appointments(query: Select, filters: AppointmentFilters) -> Select:
+    """
+    Restrict an appointment query to a time window and status.
+
+    The window bounds scheduled_start only, so together with the doctor or
+    patient equality the query is a range scan of the matching
+    (owner, scheduled_start) index instead of a read of the whole history.
+
+    Args:
+        query (Select): The query selecting appointments or their columns.
+        filters (AppointmentFilters): The filters to apply.
+
+    Returns:
+        Select: The filtered query.
+    """
+    if filters.start is not None:
+        query = query.where(Appointment.scheduled_start >= filters.start)
+    if filters.end is not None:
+        query = query.where(Appointment.scheduled_start < filters.end)
+    if filters.status is not None:
+        query = query.where(Appointment.status == filters.status)
+    return query
@@ -0,0 +1,144 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Annotated, Any, List, Optional, Sequence
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from schemas.pagination import PageParams
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def get_page_params(
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> PageParams:
+    """
+    Get the pagination parameters of a list request.
+
+    Args:
+        limit (int, optional): The maximum number of items per page.
+        cursor (Optional[str], optional): The cursor returned by the last page.
+
+    Returns:
+        PageParams: The pagination parameters.
+    """
+    return PageParams(limit=limit, cursor=cursor)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the ordering values of the last row of a page into a cursor.
+
+    Args:
+        values (Sequence[Any]): The ordering values.
+
+    Returns:
+        str: The opaque cursor.
+    """
+    plain = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(plain).encode()).decode()
+
+
+def decode_cursor(cursor: str, order_by: Sequence[Any]) -> List[Any]:
+    """
+    Decode a cursor back into typed ordering values.
+
+    Args:
+        cursor (str): The opaque cursor.
+        order_by (Sequence[Any]): The ordering columns the cursor was built from.
+
+    Returns:
+        List[Any]: The ordering values.
+    """
+    try:
+        plain = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(plain, list) or len(plain) != len(order_by):
+            raise ValueError("cursor does not match the ordering")
+
+        values = []
+        for column, value in zip(order_by, plain):
+            python_type = column.type.python_type
+            if python_type in (date, datetime):
+                value = python_type.fromisoformat(value)
+            values.append(value)
+        return values
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def after_cursor(order_by: Sequence[Any], values: Sequence[Any]):
+    """
+    Build the keyset filter selecting the rows after the cursor.
+
+    The row comparison is expanded into OR/AND terms, which every backend
+    can turn into an index range scan.
+
+    Args:
+        order_by (Sequence[Any]): The ordering columns.
+        values (Sequence[Any]): The ordering values of the cursor.
+
+    Returns:
+        ColumnElement: The filter expression.
+    """
+    terms = []
+    for i, column in enumerate(order_by):
+        equal_prefix = [order_by[j] == values[j] for j in range(i)]
+        terms.append(and_(*equal_prefix, column > values[i]))
+    return or_(*terms)
+
+
+def selects_entity(query: Select) -> bool:
+    """
+    Check whether a query selects a single mapped entity rather than columns.
+
+    Args:
+        query (Select): The query.
+
+    Returns:
+        bool: True if the query selects one entity, False otherwise.
+    """
+    descriptions = query.column_descriptions
+    return (
+        len(descriptions) == 1 and descriptions[0]["expr"] is descriptions[0]["entity"]
+    )
+
+
+async def paginate(
+    db: AsyncSession, query: Select, order_by: Sequence[Any], page: PageParams
+) -> dict:
+    """
+    Fetch one page of a query with keyset pagination.
+
+    The last ordering column must be unique, so every row has a distinct key.
+    A query selecting one entity pages through entities; a query selecting
+    columns pages through rows, which must include the ordering columns.
+
+    Args:
+        db (AsyncSession): The database session.
+        query (Select): The query selecting the entities or columns to page through.
+        order_by (Sequence[Any]): The ordering columns.
+        page (PageParams): The pagination parameters.
+
+    Returns:
+        dict: The items of the page and the cursor of the next page.
+    """
+    if page.cursor:
+        query = query.where(
+            after_cursor(order_by, decode_cursor(page.cursor, order_by))
+        )
+
+    result = await db.execute(query.order_by(*order_by).limit(page.limit + 1))
+    rows = (result.scalars() if selects_entity(query) else result).all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        next_cursor = encode_cursor(
+            [getattr(rows[-1], column.key) for column in order_by]
+        )
+    return {"items": rows, "next_cursor": next_cursor}
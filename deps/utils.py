@@ -1,3 +1,6 @@
+import re
+import unicodedata
+from datetime import datetime, timezone
 from uuid import uuid4
 
 
@@ -9,3 +12,40 @@ def generate_uuid():
         str: A new UUID.
     """
     return str(uuid4())
+
+
+def normalize_specialization(specialization: str) -> str:
+    """
+    Normalize a specialization to its canonical search form.
+
+    Case, accents, punctuation and repeated whitespace are folded away, so
+    "Cardiology", " cardiology " and "Cardiology." share one key.
+
+    Args:
+        specialization (str): The specialization as entered.
+
+    Returns:
+        str: The normalized specialization.
+    """
+    folded = unicodedata.normalize("NFKD", specialization.casefold())
+    letters = "".join(c for c in folded if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w\s-]", " ", letters).replace("_", " ").split())
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """
+    Convert a datetime to the naive UTC form the database stores.
+
+    Naive datetimes are taken to be UTC already and returned unchanged;
+    aware ones are converted to UTC and stripped of their offset, so both
+    compare with the stored values.
+
+    Args:
+        value (datetime): The datetime to convert.
+
+    Returns:
+        datetime: The naive UTC datetime.
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -1,52 +1,64 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from core.security import hash_password
-from models.user import User
+from core.metrics import mark_process_dead
+from core.pubsub import subscriber
+from core.security import password_pool
+from core.startup import seed_super_admin
 from routers.patients import patients_router
 from routers.doctors import doctors_router
 from routers.users import users_router
 from routers.auth import auth_router
-from core.database import Base, engine, SessionLocal
+from routers.exports import exports_router
+from routers.metrics import metrics_router
+from core.instrumentation import MetricsMiddleware, instrument_engine
+from core.query_budget import QueryBudgetMiddleware
+from core.database import async_engine, async_read_engine
 from os import getenv
 from dotenv import load_dotenv
 from core.config import settings
 
 load_dotenv()
 
-app = FastAPI()
-
-app.include_router(patients_router)
-app.include_router(doctors_router)
-app.include_router(users_router)
-app.include_router(auth_router)
-
-
 SUPER_ADMIN_EMAIL = getenv("ADMIN_EMAIL")
 SUPER_ADMIN_PASSWORD = getenv("ADMIN_PASSWORD")
 
 if not SUPER_ADMIN_EMAIL or not SUPER_ADMIN_PASSWORD:
     raise ValueError("ADMIN_EMAIL and ADMIN_PASSWORD environment variables must be set")
 
-if settings.DEV_ENV == "test":
-    Base.metadata.drop_all(bind=engine)
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Prepare the app once it is being served, and release its resources on exit.
 
-db = SessionLocal()
+    Importing this module does no database work; the schema is created by
+    `python -m migrations init` before the app starts. The Redis subscriber
+    that carries invalidations between workers starts here, in the background.
 
-existing_admin = db.query(User).filter(User.email == SUPER_ADMIN_EMAIL).first()
+    Args:
+        app (FastAPI): The application.
+    """
+    subscriber.start()
+    await seed_super_admin(SUPER_ADMIN_EMAIL, SUPER_ADMIN_PASSWORD)
+    yield
+    subscriber.stop()
+    password_pool.shutdown()
+    await async_engine.dispose()
+    await async_read_engine.dispose()
+    mark_process_dead()
 
-if not existing_admin:
-    try:
-        super_admin = User(
-            email=SUPER_ADMIN_EMAIL,
-            first_name="Super",
-            last_name="Admin",
-            hashed_password=hash_password(SUPER_ADMIN_PASSWORD),
-            role="admin",
-        )
 
-        db.add(super_admin)
-        db.flush()
-        db.commit()
-    finally:
-        db.close()
+app = FastAPI(lifespan=lifespan)
+
+app.add_middleware(MetricsMiddleware)
+if settings.QUERY_TRACKING_ENABLED:
+    app.add_middleware(QueryBudgetMiddleware, threshold=settings.N_PLUS_ONE_THRESHOLD)
+instrument_engine(async_engine.sync_engine)
+instrument_engine(async_read_engine.sync_engine)
+
+app.include_router(patients_router)
+app.include_router(doctors_router)
+app.include_router(users_router)
+app.include_router(auth_router)
+app.include_router(exports_router)
+app.include_router(metrics_router)
@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+from typing import List
+from sqlalchemy import Column, DateTime, MetaData, String, Table, select
+from sqlalchemy.engine import Connection, Engine
+from core.database import Base
+from migrations.versions import (
+    v0000_appointment_schedule,
+    v0001_scheduling_indexes,
+    v0002_pagination_indexes,
+    v0003_availability_backfill,
+    v0004_outbox,
+    v0005_specialization_key,
+)
+
+# Ordered list of every migration; append new versions at the end
+MIGRATIONS = [
+    v0000_appointment_schedule,
+    v0001_scheduling_indexes,
+    v0002_pagination_indexes,
+    v0003_availability_backfill,
+    v0004_outbox,
+    v0005_specialization_key,
+]
+
+metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    metadata,
+    Column("version", String(length=32), primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def applied_versions(conn: Connection) -> List[str]:
+    """
+    List the migrations already applied to the database.
+
+    Args:
+        conn (Connection): The database connection.
+
+    Returns:
+        List[str]: The applied migration versions.
+    """
+    metadata.create_all(bind=conn, checkfirst=True)
+    return list(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def upgrade(engine: Engine) -> List[str]:
+    """
+    Apply every pending migration in order.
+
+    Args:
+        engine (Engine): The database engine.
+
+    Returns:
+        List[str]: The versions applied by this run.
+    """
+    with engine.begin() as conn:
+        done = set(applied_versions(conn))
+
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.VERSION in done:
+            continue
+
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            conn.execute(
+                schema_migrations.insert().values(
+                    version=migration.VERSION,
+                    applied_at=datetime.now(timezone.utc),
+                )
+            )
+        applied.append(migration.VERSION)
+    return applied
+
+
+def downgrade(engine: Engine, version: str):
+    """
+    Revert a single applied migration.
+
+    Args:
+        engine (Engine): The database engine.
+        version (str): The version of the migration to revert.
+    """
+    migration = next(m for m in MIGRATIONS if m.VERSION == version)
+    with engine.begin() as conn:
+        migration.downgrade(conn)
+        conn.execute(
+            schema_migrations.delete().where(schema_migrations.c.version == version)
+        )
+
+
+def create_schema(engine: Engine, reset: bool = False) -> List[str]:
+    """
+    Create any missing table, then apply every pending migration.
+
+    Tables are created from the current models, so on a new database the
+    migrations only record themselves; on an existing one they bring it up
+    to date. The models must be imported before calling this.
+
+    Args:
+        engine (Engine): The database engine.
+        reset (bool, optional): Drop every table first. Defaults to False.
+
+    Returns:
+        List[str]: The versions applied by this run.
+    """
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+        metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return upgrade(engine)
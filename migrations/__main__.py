@@ -0,0 +1,37 @@
+import argparse
+import models  # noqa: F401
+from core.database import engine
+from migrations import MIGRATIONS, applied_versions, create_schema, downgrade, upgrade
+
+parser = argparse.ArgumentParser(
+    prog="python -m migrations", description="Manage the database schema version."
+)
+subcommands = parser.add_subparsers(dest="command", required=True)
+init = subcommands.add_parser(
+    "init", help="Create missing tables and apply every pending migration"
+)
+init.add_argument(
+    "--reset", action="store_true", help="Drop every table first (destroys all data)"
+)
+subcommands.add_parser("upgrade", help="Apply every pending migration")
+subcommands.add_parser("status", help="List applied and pending migrations")
+revert = subcommands.add_parser("downgrade", help="Revert a single migration")
+revert.add_argument("version")
+
+args = parser.parse_args()
+
+if args.command == "init":
+    applied = create_schema(engine, reset=args.reset)
+    print(f"Schema ready, applied: {', '.join(applied) or 'nothing'}")
+elif args.command == "upgrade":
+    applied = upgrade(engine)
+    print(f"Applied: {', '.join(applied)}" if applied else "Already up to date")
+elif args.command == "status":
+    with engine.begin() as conn:
+        done = set(applied_versions(conn))
+    for migration in MIGRATIONS:
+        state = "applied" if migration.VERSION in done else "pending"
+        print(f"{migration.VERSION}  {state}  {migration.__doc__.strip()}")
+else:
+    downgrade(engine, args.version)
+    print(f"Reverted: {args.version}")
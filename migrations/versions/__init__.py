@@ -0,0 +1,45 @@
+from typing import Sequence
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+def create_index_online(
+    conn: Connection, name: str, table: str, columns: Sequence[str]
+):
+    """
+    Create an index unless it already exists, without locking writes on MySQL.
+
+    Args:
+        conn (Connection): The database connection.
+        name (str): The name of the index.
+        table (str): The name of the table.
+        columns (Sequence[str]): The indexed columns, in order.
+    """
+    existing = {index["name"] for index in inspect(conn).get_indexes(table)}
+    if name in existing:
+        return
+
+    ddl = f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"
+    if conn.dialect.name == "mysql":
+        # InnoDB online DDL: concurrent reads and writes keep running
+        ddl += " ALGORITHM=INPLACE LOCK=NONE"
+    conn.execute(text(ddl))
+
+
+def drop_index(conn: Connection, name: str, table: str):
+    """
+    Drop an index if it exists.
+
+    Args:
+        conn (Connection): The database connection.
+        name (str): The name of the index.
+        table (str): The name of the table.
+    """
+    existing = {index["name"] for index in inspect(conn).get_indexes(table)}
+    if name not in existing:
+        return
+
+    if conn.dialect.name == "mysql":
+        conn.execute(text(f"DROP INDEX {name} ON {table}"))
+    else:
+        conn.execute(text(f"DROP INDEX {name}"))
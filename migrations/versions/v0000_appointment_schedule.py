@@ -0,0 +1,58 @@
+"""
+Replace the single appointment time with a scheduled start and end.
+
+The original schema stored only scheduled_time. It becomes scheduled_start,
+and scheduled_end is backfilled as the start plus the standard appointment
+length. Databases created from the current models already have both
+columns, and nothing is changed.
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+VERSION = "0000"
+
+# Length given to appointments booked before they had an explicit end
+APPOINTMENT_MINUTES = 30
+
+
+def upgrade(conn: Connection):
+    columns = {c["name"] for c in inspect(conn).get_columns("appointments")}
+    if "scheduled_start" not in columns:
+        conn.execute(
+            text(
+                "ALTER TABLE appointments "
+                "RENAME COLUMN scheduled_time TO scheduled_start"
+            )
+        )
+    if "scheduled_end" in columns:
+        return
+
+    conn.execute(text("ALTER TABLE appointments ADD COLUMN scheduled_end DATETIME"))
+    if conn.dialect.name == "mysql":
+        conn.execute(
+            text(
+                "UPDATE appointments SET scheduled_end = "
+                f"DATE_ADD(scheduled_start, INTERVAL {APPOINTMENT_MINUTES} MINUTE)"
+            )
+        )
+        conn.execute(
+            text("ALTER TABLE appointments MODIFY scheduled_end DATETIME NOT NULL")
+        )
+    else:
+        # SQLite stores datetimes as text; keep the fractional seconds suffix.
+        # It cannot add NOT NULL to an existing column, so the model enforces it
+        conn.execute(
+            text(
+                "UPDATE appointments SET scheduled_end = "
+                f"datetime(scheduled_start, '+{APPOINTMENT_MINUTES} minutes') "
+                "|| substr(scheduled_start, 20)"
+            )
+        )
+
+
+def downgrade(conn: Connection):
+    conn.execute(text("ALTER TABLE appointments DROP COLUMN scheduled_end"))
+    conn.execute(
+        text("ALTER TABLE appointments RENAME COLUMN scheduled_start TO scheduled_time")
+    )
@@ -0,0 +1,37 @@
+"""
+Composite indexes for the scheduling hot paths.
+"""
+
+from sqlalchemy.engine import Connection
+from migrations.versions import create_index_online, drop_index
+
+VERSION = "0001"
+
+INDEXES = [
+    (
+        "ix_appointments_doctor_schedule",
+        "appointments",
+        ("doctor_id", "scheduled_start", "scheduled_end"),
+    ),
+    ("ix_appointments_patient_id", "appointments", ("patient_id",)),
+    (
+        "ix_availability_doctor_weekday",
+        "availability",
+        ("doctor_id", "weekday", "available"),
+    ),
+    (
+        "ix_medical_records_doctor_patient",
+        "medical_records",
+        ("doctor_id", "patient_id"),
+    ),
+]
+
+
+def upgrade(conn: Connection):
+    for name, table, columns in INDEXES:
+        create_index_online(conn, name, table, columns)
+
+
+def downgrade(conn: Connection):
+    for name, table, _ in INDEXES:
+        drop_index(conn, name, table)
@@ -0,0 +1,41 @@
+"""
+Indexes backing the keyset pagination orderings.
+"""
+
+from sqlalchemy.engine import Connection
+from migrations.versions import create_index_online, drop_index
+
+VERSION = "0002"
+
+INDEXES = [
+    (
+        "ix_appointments_patient_schedule",
+        "appointments",
+        ("patient_id", "scheduled_start"),
+    ),
+    (
+        "ix_medical_records_doctor_created",
+        "medical_records",
+        ("doctor_id", "created_at"),
+    ),
+    (
+        "ix_medical_records_patient_created",
+        "medical_records",
+        ("patient_id", "created_at"),
+    ),
+]
+
+
+def upgrade(conn: Connection):
+    for name, table, columns in INDEXES:
+        create_index_online(conn, name, table, columns)
+    # Superseded by ix_appointments_patient_schedule, which has the same prefix
+    drop_index(conn, "ix_appointments_patient_id", "appointments")
+
+
+def downgrade(conn: Connection):
+    create_index_online(
+        conn, "ix_appointments_patient_id", "appointments", ("patient_id",)
+    )
+    for name, table, _ in INDEXES:
+        drop_index(conn, name, table)
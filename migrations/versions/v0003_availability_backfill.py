@@ -0,0 +1,17 @@
+"""
+Mark availability slots created without an explicit status as available.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+VERSION = "0003"
+
+
+def upgrade(conn: Connection):
+    conn.execute(text("UPDATE availability SET available = 1 WHERE available IS NULL"))
+
+
+def downgrade(conn: Connection):
+    # The backfilled rows cannot be told apart from real ones; nothing to undo
+    pass
@@ -0,0 +1,16 @@
+"""
+Outbox table for notifications published by the relay.
+"""
+
+from sqlalchemy.engine import Connection
+from models.outbox import OutboxMessage
+
+VERSION = "0004"
+
+
+def upgrade(conn: Connection):
+    OutboxMessage.__table__.create(conn, checkfirst=True)
+
+
+def downgrade(conn: Connection):
+    OutboxMessage.__table__.drop(conn, checkfirst=True)
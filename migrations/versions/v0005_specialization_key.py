@@ -0,0 +1,41 @@
+"""
+Normalized specialization column, backfilled and indexed.
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from deps.utils import normalize_specialization
+from migrations.versions import create_index_online, drop_index
+
+VERSION = "0005"
+
+
+def upgrade(conn: Connection):
+    columns = {column["name"] for column in inspect(conn).get_columns("doctors")}
+    if "specialization_key" not in columns:
+        conn.execute(
+            text("ALTER TABLE doctors ADD COLUMN specialization_key VARCHAR(255)")
+        )
+
+    # The vocabulary is small, so backfill one UPDATE per distinct spelling
+    spellings = conn.execute(text("SELECT DISTINCT specialization FROM doctors"))
+    for (specialization,) in spellings.all():
+        conn.execute(
+            text(
+                "UPDATE doctors SET specialization_key = :key "
+                "WHERE specialization = :specialization"
+            ),
+            {
+                "key": normalize_specialization(specialization),
+                "specialization": specialization,
+            },
+        )
+
+    create_index_online(
+        conn, "ix_doctors_specialization_key", "doctors", ("specialization_key",)
+    )
+
+
+def downgrade(conn: Connection):
+    drop_index(conn, "ix_doctors_specialization_key", "doctors")
+    conn.execute(text("ALTER TABLE doctors DROP COLUMN specialization_key"))
@@ -4,3 +4,4 @@ from .doctor import Doctor
 from .medical_record import MedicalRecord
 from .patient import Patient
 from .user import User
+from .outbox import OutboxMessage
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, DateTime, Enum, String
+from sqlalchemy import Column, ForeignKey, DateTime, Enum, Index, String
 from sqlalchemy.orm import relationship
 from core.database import Base
 from core.enums import AppointmentStatusEnum
@@ -7,13 +7,23 @@ from deps.utils import generate_uuid
 
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        Index(
+            "ix_appointments_doctor_schedule",
+            "doctor_id",
+            "scheduled_start",
+            "scheduled_end",
+        ),
+        Index("ix_appointments_patient_schedule", "patient_id", "scheduled_start"),
+    )
 
     id = Column(String(length=36), primary_key=True, index=True, default=generate_uuid)
     doctor_id = Column(String(length=36), ForeignKey("doctors.id", ondelete="CASCADE"))
     patient_id = Column(
         String(length=36), ForeignKey("patients.id", ondelete="CASCADE")
     )
-    scheduled_time = Column(DateTime, nullable=False)
+    scheduled_start = Column(DateTime, nullable=False)
+    scheduled_end = Column(DateTime, nullable=False)
     status = Column(
         Enum(AppointmentStatusEnum), default=AppointmentStatusEnum.scheduled
     )
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, String, ForeignKey, Time, Enum
+from sqlalchemy import Boolean, Column, String, ForeignKey, Time, Enum, Index
 from sqlalchemy.orm import relationship
 from core.database import Base
 from core.enums import WeekdayEnum
@@ -7,12 +7,15 @@ from deps.utils import generate_uuid
 
 class Availability(Base):
     __tablename__ = "availability"
+    __table_args__ = (
+        Index("ix_availability_doctor_weekday", "doctor_id", "weekday", "available"),
+    )
 
     id = Column(String(length=36), primary_key=True, index=True, default=generate_uuid)
     doctor_id = Column(String(length=36), ForeignKey("doctors.id", ondelete="CASCADE"))
     weekday = Column(Enum(WeekdayEnum), nullable=False)
     start_time = Column(Time, nullable=False)
     end_time = Column(Time, nullable=False)
-    available = Column(Boolean, nullable=True)
+    available = Column(Boolean, nullable=True, default=True)
 
     doctor = relationship("Doctor", back_populates="availability")
@@ -1,7 +1,7 @@
 from sqlalchemy import Column, String, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from core.database import Base
-from deps.utils import generate_uuid
+from deps.utils import generate_uuid, normalize_specialization
 
 
 class Doctor(Base):
@@ -10,6 +10,7 @@ class Doctor(Base):
     id = Column(String(length=36), primary_key=True, index=True, default=generate_uuid)
     user_id = Column(String(length=36), ForeignKey("users.id", ondelete="CASCADE"))
     specialization = Column(String(length=255), nullable=False)
+    specialization_key = Column(String(length=255), nullable=True, index=True)
 
     user = relationship("User", back_populates="doctor_profile")
     availability = relationship(
@@ -17,3 +18,8 @@ class Doctor(Base):
     )
     appointments = relationship("Appointment", back_populates="doctor")
     medical_records = relationship("MedicalRecord", back_populates="doctor")
+
+    @validates("specialization")
+    def _set_specialization_key(self, key, specialization):
+        self.specialization_key = normalize_specialization(specialization)
+        return specialization
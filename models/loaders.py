@@ -0,0 +1,73 @@
+"""
+Named loader options and column projections for the response shapes the
+routers serialize.
+
+Applying one of the loader options to a query loads every relationship its
+schema reads, so serialization never falls back to a lazy load per row.
+Selecting one of the projections loads only the columns its schema reads,
+as plain rows that skip the identity map.
+"""
+
+from typing import Tuple, Type
+from pydantic import BaseModel
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+from models.appointment import Appointment
+from models.doctor import Doctor
+from models.medical_record import MedicalRecord
+from models.patient import Patient
+from models.user import User
+from schemas.appointment import AppointmentOut
+from schemas.medical_record import MedicalRecordOut
+from schemas.user import UserOut
+
+# DoctorOut: the user is joined into the same statement, the availability
+# collection is fetched for the whole page in a second one
+DOCTOR_OUT = (
+    joinedload(Doctor.user),
+    selectinload(Doctor.availability),
+)
+
+# Appointment with both participants, as used by the notification payloads
+APPOINTMENT_WITH_PARTICIPANTS = (
+    selectinload(Appointment.medical_record),
+    joinedload(Appointment.patient).joinedload(Patient.user),
+    joinedload(Appointment.doctor).joinedload(Doctor.user),
+)
+
+
+def columns_for(
+    entity: type, schema: Type[BaseModel], *extra: InstrumentedAttribute
+) -> Tuple[InstrumentedAttribute, ...]:
+    """
+    Get the columns of an entity that a flat response schema reads.
+
+    Args:
+        entity (type): The mapped class.
+        schema (Type[BaseModel]): The response schema; each field must be a column of the entity.
+        *extra (InstrumentedAttribute): Further columns to select, such as pagination keys outside the schema.
+
+    Returns:
+        Tuple[InstrumentedAttribute, ...]: The columns to select.
+    """
+    columns = tuple(getattr(entity, name) for name in schema.model_fields)
+    return columns + extra
+
+
+# Rows for the flat list schemas; medical records also carry created_at,
+# their pagination key
+APPOINTMENT_OUT_COLUMNS = columns_for(Appointment, AppointmentOut)
+MEDICAL_RECORD_OUT_COLUMNS = columns_for(
+    MedicalRecord, MedicalRecordOut, MedicalRecord.created_at
+)
+USER_OUT_COLUMNS = columns_for(User, UserOut)
+
+# Rows for CalendarAppointment, whose start and end are the scheduled times
+CALENDAR_COLUMNS = (
+    Appointment.id,
+    Appointment.doctor_id,
+    Appointment.patient_id,
+    Appointment.scheduled_start.label("start"),
+    Appointment.scheduled_end.label("end"),
+    Appointment.status,
+)
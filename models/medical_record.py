@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from core.database import Base
 from datetime import datetime, timezone
@@ -8,6 +8,11 @@ from deps.utils import generate_uuid
 
 class MedicalRecord(Base):
     __tablename__ = "medical_records"
+    __table_args__ = (
+        Index("ix_medical_records_doctor_patient", "doctor_id", "patient_id"),
+        Index("ix_medical_records_doctor_created", "doctor_id", "created_at"),
+        Index("ix_medical_records_patient_created", "patient_id", "created_at"),
+    )
 
     id = Column(String(length=36), primary_key=True, index=True, default=generate_uuid)
     doctor_id = Column(String(length=36), ForeignKey("doctors.id", ondelete="SET NULL"))
@@ -18,7 +23,7 @@ class MedicalRecord(Base):
         String(length=36), ForeignKey("appointments.id", ondelete="SET NULL")
     )
     notes = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
     doctor = relationship("Doctor", back_populates="medical_records")
     patient = relationship("Patient", back_populates="medical_records")
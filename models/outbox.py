@@ -0,0 +1,17 @@
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Integer, String
+from datetime import datetime, timezone
+from core.database import Base
+
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox_messages"
+
+    # Auto-increment ids give the relay a stable publish order
+    id = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    task_name = Column(String(length=255), nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
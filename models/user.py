@@ -15,5 +15,11 @@ class User(Base):
     hashed_password = Column(String(length=255), nullable=False)
     role = Column(Enum(RoleEnum), nullable=False)
 
-    doctor_profile = relationship("Doctor", back_populates="user", uselist=False)
-    patient_profile = relationship("Patient", back_populates="user", uselist=False)
+    # Profiles are removed by the ON DELETE CASCADE of their user_id, which
+    # also cascades to their slots and appointments
+    doctor_profile = relationship(
+        "Doctor", back_populates="user", uselist=False, passive_deletes=True
+    )
+    patient_profile = relationship(
+        "Patient", back_populates="user", uselist=False, passive_deletes=True
+    )
@@ -1,58 +1,211 @@
-from typing import Annotated
-from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from core.security import hash_password
-from deps.db import get_db
+from datetime import timedelta
+from typing import Annotated, Optional
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.cache import directory_cache
+from core.security import hash_password_async
+from core.serialization import ORJSONResponse, to_items
+from deps.db import get_db, get_read_db
+from deps.filters import (
+    MAX_CALENDAR_RANGE_DAYS,
+    filter_appointments,
+    get_appointment_filters,
+)
+from deps.pagination import get_page_params, paginate
+from deps.utils import normalize_specialization
+from models import loaders
+from models.appointment import Appointment
+from models.doctor import Doctor
 from models.user import User
+from schemas.appointment import AppointmentFilters, CalendarAppointment
+from schemas.auth import Principal, TokenClaims
+from schemas.doctor import DoctorOut
+from schemas.pagination import Page, PageParams
 from schemas.user import UserCreate
 from deps.auth import get_current_admin
+from deps.auth import get_current_claims
 from deps.auth import get_current_doctor
 from deps.auth import get_current_patient
+from deps.auth import get_current_user
 
-Admin_Dependency = Annotated[User, Depends(get_current_admin)]
-Doctor_Dependency = Annotated[User, Depends(get_current_doctor)]
-Patient_Dependency = Annotated[User, Depends(get_current_patient)]
+Admin_Dependency = Annotated[TokenClaims, Depends(get_current_admin)]
+Doctor_Dependency = Annotated[TokenClaims, Depends(get_current_doctor)]
+Patient_Dependency = Annotated[TokenClaims, Depends(get_current_patient)]
 
-DB_Dependency = Annotated[Session, Depends(get_db)]
+# Any signed-in user, from the token claims alone
+Claims_Dependency = Annotated[TokenClaims, Depends(get_current_claims)]
 
+# Principal snapshot; only for handlers that need more than the token claims
+CurrentUser_Dependency = Annotated[Principal, Depends(get_current_user)]
 
-def create_user(user_data: dict, db: DB_Dependency) -> str:
+DB_Dependency = Annotated[AsyncSession, Depends(get_db)]
+
+# Read replica session; only for reads that tolerate replication lag
+ReadDB_Dependency = Annotated[AsyncSession, Depends(get_read_db)]
+
+Page_Dependency = Annotated[PageParams, Depends(get_page_params)]
+
+AppointmentFilters_Dependency = Annotated[
+    AppointmentFilters, Depends(get_appointment_filters)
+]
+
+
+async def create_user(user_data: dict, db: DB_Dependency) -> str:
     """
     Create a new user in the database.
 
     Args:
         user_data (UserCreate): The user data to create.
-        db (Session): The database session.
+        db (AsyncSession): The database session.
 
     Returns:
         str: The ID of the newly created user.
     """
-    existing_user = db.query(User).filter(User.email == user_data.get("email")).first()
+    existing_user = await db.scalar(
+        select(User).where(User.email == user_data.get("email"))
+    )
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this email already exists",
         )
 
+    hashed_password = await hash_password_async(user_data.get("hashed_password"))
+
     try:
         new_user = User(
             email=user_data.get("email"),
             first_name=user_data.get("first_name"),
             last_name=user_data.get("last_name"),
             role=user_data.get("role"),
-            hashed_password=hash_password(user_data.get("hashed_password")),
+            hashed_password=hashed_password,
         )
 
         db.add(new_user)
-        db.flush()
-        db.refresh(new_user)
-        db.commit()
+        await db.flush()
+        await db.refresh(new_user)
+        await db.commit()
 
         return new_user.id
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to create user: {str(e)}",
         )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag, using weak comparison.
+
+    Args:
+        if_none_match (Optional[str]): The If-None-Match header value.
+        etag (str): The current ETag.
+
+    Returns:
+        bool: True if the client's copy is current, False otherwise.
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag.removeprefix("W/") for tag in tags)
+
+
+async def doctor_directory_response(
+    request: Request,
+    db: AsyncSession,
+    page_params: PageParams,
+    specialization: Optional[str] = None,
+    not_found_detail: str = "No Doctors found",
+) -> Response:
+    """
+    Serve a page of the doctor directory from the pre-serialized cache.
+
+    Pages are rendered once per directory version and served as bytes with a
+    strong ETag; a matching If-None-Match gets 304 Not Modified.
+
+    Pages must be rendered from the primary: the version is bumped as soon as
+    a write commits, and a page read from a lagging replica would be cached
+    under the new version and served, with its ETag, for the whole TTL.
+
+    Args:
+        request (Request): The incoming request.
+        db (AsyncSession): A database session on the primary.
+        page_params (PageParams): The pagination parameters.
+        specialization (Optional[str], optional): Only list doctors with this specialization. Defaults to None.
+        not_found_detail (str, optional): The 404 detail for an empty first page.
+
+    Returns:
+        Response: The serialized page, or an empty 304 response.
+    """
+    if specialization is not None:
+        specialization = normalize_specialization(specialization)
+    key = (specialization, page_params.limit, page_params.cursor)
+    entry = directory_cache.get(key)
+    if entry is None:
+        version = directory_cache.version
+        query = select(Doctor).options(*loaders.DOCTOR_OUT)
+        if specialization is not None:
+            query = query.where(Doctor.specialization_key == specialization)
+
+        page = await paginate(db, query, [Doctor.id], page_params)
+        if not page["items"] and not page_params.cursor:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail=not_found_detail
+            )
+        body = Page[DoctorOut].model_validate(page, from_attributes=True)
+        entry = directory_cache.set(key, body.model_dump_json().encode(), version)
+
+    body, etag = entry
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def calendar_response(
+    db: AsyncSession, owner, filters: AppointmentFilters
+) -> ORJSONResponse:
+    """
+    Serve the appointments of a time window grouped by the day they start on.
+
+    Both ends of the window are required and it may span at most
+    MAX_CALENDAR_RANGE_DAYS, so the response is bounded by the window rather
+    than by the length of the owner's history.
+
+    Args:
+        db (AsyncSession): The database session.
+        owner (ColumnElement): The filter selecting the doctor's or patient's appointments.
+        filters (AppointmentFilters): The window and status filters.
+
+    Returns:
+        ORJSONResponse: The days with appointments, in date order, each with its appointments in start order.
+
+    Raises:
+        HTTPException: If the window is missing or too wide.
+    """
+    if filters.start is None or filters.end is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="from and to are required",
+        )
+    if filters.end - filters.start > timedelta(days=MAX_CALENDAR_RANGE_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range must not exceed {MAX_CALENDAR_RANGE_DAYS} days",
+        )
+
+    query = filter_appointments(
+        select(*loaders.CALENDAR_COLUMNS).where(owner), filters
+    ).order_by(Appointment.scheduled_start, Appointment.id)
+    rows = (await db.execute(query)).all()
+
+    days = {}
+    for item in to_items(CalendarAppointment, rows):
+        days.setdefault(item["start"].date(), []).append(item)
+    return ORJSONResponse(
+        [{"day": day, "appointments": items} for day, items in days.items()]
+    )
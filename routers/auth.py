@@ -1,8 +1,9 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from core.security import verify_password, create_access_token
-from models import User
+from sqlalchemy import select
+from core.security import verify_password_async, create_access_token
+from models import Doctor, Patient, User
 from routers import DB_Dependency
 from schemas.auth import Token
 from starlette import status
@@ -11,7 +12,7 @@ auth_router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
 @auth_router.post("/login", response_model=Token, status_code=status.HTTP_200_OK)
-def login(
+async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: DB_Dependency,
 ):
@@ -25,12 +26,32 @@ def login(
     Returns:
         dict: A dictionary containing the access token and token type.
     """
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    row = (
+        await db.execute(
+            select(User, Doctor.id, Patient.id)
+            .outerjoin(Doctor, Doctor.user_id == User.id)
+            .outerjoin(Patient, Patient.user_id == User.id)
+            .where(User.email == form_data.username)
+        )
+    ).first()
+    user, doctor_id, patient_id = row if row else (None, None, None)
+
+    if not user or not await verify_password_async(
+        form_data.password, user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
         )
 
-    access_token = create_access_token(data={"sub": str(user.id)})
+    # Role and profile ids are signed into the token, so authorization
+    # does not need to load the user again on every request
+    access_token = create_access_token(
+        data={
+            "sub": str(user.id),
+            "role": user.role.value,
+            "doctor_id": doctor_id,
+            "patient_id": patient_id,
+        }
+    )
 
     return {"access_token": access_token, "token_type": "bearer"}
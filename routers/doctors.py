@@ -1,17 +1,36 @@
 from typing import Optional
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from sqlalchemy import select
 from starlette import status
 
+from core.cache import directory_cache
+from core.scheduling import insert_weekly_templates
+from core.search import specialization_index
+from core.serialization import page_response
+from models import loaders
 from models.appointment import Appointment
 from models.availability import Availability
 from models.doctor import Doctor
 from models.medical_record import MedicalRecord
-from routers import DB_Dependency, Doctor_Dependency
-from schemas.appointment import AppointmentOut
-from schemas.availability import AvailabilityCreate
-from schemas.doctor import DoctorOut
+from deps.filters import filter_appointments
+from deps.pagination import paginate
+from routers import (
+    AppointmentFilters_Dependency,
+    Claims_Dependency,
+    DB_Dependency,
+    Doctor_Dependency,
+    Page_Dependency,
+    ReadDB_Dependency,
+    calendar_response,
+    doctor_directory_response,
+)
+from schemas.appointment import AppointmentOut, CalendarDay
+from schemas.availability import AvailabilityCreate, WeeklyTemplateCreate
+from schemas.doctor import DoctorOut, SpecializationMatch
 from schemas.medical_record import MedicalRecordCreate, MedicalRecordOut
+from schemas.pagination import Page
 from tasks.email import notify_new_medical_record_creation
+from tasks.outbox import enqueue_task
 
 doctors_router = APIRouter(
     prefix="/doctors",
@@ -31,7 +50,11 @@ async def view_doctor_profile(db: DB_Dependency, current_doctor: Doctor_Dependen
     Returns:
         Doctor: The current doctor's profile.
     """
-    current_doctor = db.query(Doctor).filter(Doctor.id == current_doctor.id).first()
+    current_doctor = await db.scalar(
+        select(Doctor)
+        .where(Doctor.id == current_doctor.doctor_id)
+        .options(*loaders.DOCTOR_OUT)
+    )
     if not current_doctor:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -41,39 +64,68 @@ async def view_doctor_profile(db: DB_Dependency, current_doctor: Doctor_Dependen
 
 
 @doctors_router.get(
-    "/all-doctors", response_model=list[DoctorOut], status_code=status.HTTP_200_OK
+    "/all-doctors", response_model=Page[DoctorOut], status_code=status.HTTP_200_OK
 )
 async def view_all_doctors(
+    request: Request,
     db: DB_Dependency,
     current_doctor: Doctor_Dependency,
+    page_params: Page_Dependency,
     specilization: Optional[str] = None,
 ):
     """
-    Retrieve all doctors from the database.
+    Retrieve a page of doctors from the database.
 
     Args:
         db (DB_Dependency): The database dependency.
+        page_params (Page_Dependency): The pagination parameters.
         specilization (Optional[str], optional): The specilization of the doctor. Defaults to None.
 
     Returns:
-        list: A list of all doctors.
+        Response: The serialized page of doctors, or 304 if the client's copy is current.
     """
-    if specilization is None:
-        all_doctors = db.query(Doctor).all()
-        if not all_doctors:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No Doctors found",
-            )
-        return all_doctors
-
-    all_doctors = db.query(Doctor).filter(Doctor.specialization == specilization).all()
-    if not all_doctors:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No Doctors with that specilization found",
-        )
-    return all_doctors
+    return await doctor_directory_response(
+        request,
+        db,
+        page_params,
+        specialization=specilization,
+        not_found_detail=(
+            "No Doctors found"
+            if specilization is None
+            else "No Doctors with that specilization found"
+        ),
+    )
+
+
+@doctors_router.get(
+    "/search",
+    response_model=list[SpecializationMatch],
+    status_code=status.HTTP_200_OK,
+)
+async def search_specializations(
+    db: DB_Dependency,
+    current_user: Claims_Dependency,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """
+    Search the specialization vocabulary by prefix, with a fuzzy fallback.
+
+    The index is served from memory; its periodic reload reads the primary.
+
+    Args:
+        db (DB_Dependency): The database dependency.
+        q (str): The search text.
+        limit (int, optional): The maximum number of matches. Defaults to 10.
+
+    Returns:
+        list[SpecializationMatch]: The matching specializations, best first.
+    """
+    await specialization_index.ensure_loaded(db)
+    return [
+        {"specialization": term, "doctors": doctors, "match": kind}
+        for term, doctors, kind in specialization_index.search(q, limit)
+    ]
 
 
 @doctors_router.post("/new-availability-slot", status_code=status.HTTP_201_CREATED)
@@ -93,31 +145,61 @@ async def create_new_availability_slot(
     Returns:
         dict: A dictionary containing a success message.
     """
-    doctor = db.query(Doctor).filter(Doctor.user_id == current_doctor.id).first()
-
-    if not doctor:
-        raise HTTPException(status_code=404, detail="Doctor profile not found")
-
     try:
         new_slot = Availability(
             weekday=availability_data.weekday,
             start_time=availability_data.start_time,
             end_time=availability_data.end_time,
-            doctor_id=doctor.id,
+            doctor_id=current_doctor.doctor_id,
         )
         db.add(new_slot)
-        db.commit()
-        db.refresh(new_slot)
+        await db.commit()
+        await db.refresh(new_slot)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to create availability slot: {str(e)}",
         )
 
+    await directory_cache.invalidate()
+
     return {"message": "New availability slot created"}
 
 
+@doctors_router.post("/availability-template", status_code=status.HTTP_201_CREATED)
+async def create_availability_template(
+    template: WeeklyTemplateCreate,
+    db: DB_Dependency,
+    current_doctor: Doctor_Dependency,
+):
+    """
+    Add a weekly template of availability slots for a doctor in one batch.
+
+    Args:
+        template (WeeklyTemplateCreate): The weekly slots to add.
+        db (DB_Dependency): The database dependency.
+        current_doctor (Doctor_Dependency): The current doctor.
+
+    Returns:
+        dict: A dictionary containing a success message and the number of slots created.
+    """
+    created = await insert_weekly_templates(
+        db,
+        {
+            current_doctor.doctor_id: [
+                (slot.weekday, slot.start_time, slot.end_time)
+                for slot in template.slots
+            ]
+        },
+    )
+    await db.commit()
+
+    await directory_cache.invalidate()
+
+    return {"message": "Availability template created", "created": created}
+
+
 @doctors_router.patch(
     "/availability/change-availability/{slot_id}", status_code=status.HTTP_200_OK
 )
@@ -137,16 +219,17 @@ async def change_availability(
     Returns:
         dict: A dictionary containing a success message.
     """
-    availability = (
-        db.query(Availability)
-        .filter(Availability.id == slot_id, Availability.doctor_id == current_doctor.id)
-        .first()
+    availability = await db.scalar(
+        select(Availability).where(
+            Availability.id == slot_id,
+            Availability.doctor_id == current_doctor.doctor_id,
+        )
     )
 
     if not availability:
         raise HTTPException(status_code=404, detail="Availability slot not found")
 
-    if availability.doctor_id != current_doctor.id:
+    if availability.doctor_id != current_doctor.doctor_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not authorized to change this availability slot",
@@ -154,15 +237,17 @@ async def change_availability(
 
     try:
         availability.available = not availability.available
-        db.commit()
-        db.refresh(availability)
+        await db.commit()
+        await db.refresh(availability)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to update availability slot: {str(e)}",
         )
 
+    await directory_cache.invalidate()
+
     return {"message": "Availability status updated"}
 
 
@@ -183,39 +268,81 @@ async def delete_availability(
     Returns:
         dict: A dictionary containing a success message.
     """
-    availability = (
-        db.query(Availability)
-        .filter(Availability.id == slot_id, Availability.doctor_id == current_doctor.id)
-        .first()
+    availability = await db.scalar(
+        select(Availability).where(
+            Availability.id == slot_id,
+            Availability.doctor_id == current_doctor.doctor_id,
+        )
     )
 
     if not availability:
         raise HTTPException(status_code=404, detail="Availability slot not found")
 
-    db.delete(availability)
-    db.commit()
+    await db.delete(availability)
+    await db.commit()
+
+    await directory_cache.invalidate()
 
     return {"message": "Availability slot deleted"}
 
 
 @doctors_router.get(
-    "/appointments", response_model=list[AppointmentOut], status_code=status.HTTP_200_OK
+    "/appointments", response_model=Page[AppointmentOut], status_code=status.HTTP_200_OK
 )
-async def view_all_appointments(db: DB_Dependency, current_doctor: Doctor_Dependency):
+async def view_all_appointments(
+    db: ReadDB_Dependency,
+    current_doctor: Doctor_Dependency,
+    page_params: Page_Dependency,
+    filters: AppointmentFilters_Dependency,
+):
     """
-    Retrieve the appointments for the current doctor.
+    Retrieve a page of the appointments for the current doctor.
 
     Args:
-        db (DB_Dependency): The database dependency.
+        db (ReadDB_Dependency): The read replica database dependency.
+        current_doctor (Doctor_Dependency): The current doctor dependency.
+        page_params (Page_Dependency): The pagination parameters.
+        filters (AppointmentFilters_Dependency): The optional from/to window and status.
+
+    Returns:
+        ORJSONResponse: A page of appointments for the current doctor and the cursor of the next page.
+    """
+    page = await paginate(
+        db,
+        filter_appointments(
+            select(*loaders.APPOINTMENT_OUT_COLUMNS).where(
+                Appointment.doctor_id == current_doctor.doctor_id
+            ),
+            filters,
+        ),
+        [Appointment.scheduled_start, Appointment.id],
+        page_params,
+    )
+    return page_response(AppointmentOut, page)
+
+
+@doctors_router.get(
+    "/calendar", response_model=list[CalendarDay], status_code=status.HTTP_200_OK
+)
+async def view_calendar(
+    db: ReadDB_Dependency,
+    current_doctor: Doctor_Dependency,
+    filters: AppointmentFilters_Dependency,
+):
+    """
+    Retrieve the current doctor's appointments in a time window, grouped by day.
+
+    Args:
+        db (ReadDB_Dependency): The read replica database dependency.
         current_doctor (Doctor_Dependency): The current doctor dependency.
+        filters (AppointmentFilters_Dependency): The required from/to window and optional status.
 
     Returns:
-        list: A list of appointments for the current doctor.
+        ORJSONResponse: The days of the window with appointments, each with its appointments.
     """
-    appointments = (
-        db.query(Appointment).filter(Appointment.doctor_id == current_doctor.id).all()
+    return await calendar_response(
+        db, Appointment.doctor_id == current_doctor.doctor_id, filters
     )
-    return appointments
 
 
 @doctors_router.post(
@@ -238,11 +365,15 @@ async def create_new_medical_report(
     Returns:
         dict: A dictionary containing a success message.
     """
-    appointment = db.query(Appointment).filter(Appointment.id == appointment_id).first()
+    appointment = await db.scalar(
+        select(Appointment)
+        .where(Appointment.id == appointment_id)
+        .options(*loaders.APPOINTMENT_WITH_PARTICIPANTS)
+    )
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
 
-    if appointment.doctor_id != current_doctor.id:
+    if appointment.doctor_id != current_doctor.doctor_id:
         raise HTTPException(
             status_code=403, detail="Not authorized to add record for this appointment"
         )
@@ -254,84 +385,101 @@ async def create_new_medical_report(
 
     try:
         new_record = MedicalRecord(
-            doctor_id=current_doctor.id,
+            doctor_id=current_doctor.doctor_id,
             patient_id=appointment.patient_id,
             appointment_id=appointment.id,
             notes=report_data.notes,
         )
 
         db.add(new_record)
-        db.commit()
-        db.refresh(new_record)
+        # Committed together with the record; the outbox relay publishes it
+        enqueue_task(
+            db,
+            notify_new_medical_record_creation,
+            email=appointment.patient.user.email,
+            doctor_name=(
+                f"{appointment.doctor.user.first_name} "
+                f"{appointment.doctor.user.last_name}"
+            ),
+        )
+        await db.commit()
+        await db.refresh(new_record)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to create medical record: {str(e)}",
         )
 
-    notify_new_medical_record_creation.delay(
-        email=appointment.patient.email, doctor_name=current_doctor.name
-    )
-
     return {"message": "New medical report created"}
 
 
 @doctors_router.get(
     "/medical-records",
-    response_model=list[MedicalRecordOut],
+    response_model=Page[MedicalRecordOut],
     status_code=status.HTTP_200_OK,
 )
 async def view_all_doctor_medical_records(
-    db: DB_Dependency, current_doctor: Doctor_Dependency
+    db: ReadDB_Dependency,
+    current_doctor: Doctor_Dependency,
+    page_params: Page_Dependency,
 ):
     """
-    Retrieve the medical records for the current doctor.
+    Retrieve a page of the medical records for the current doctor.
 
     Args:
-        db (DB_Dependency): The database dependency.
+        db (ReadDB_Dependency): The read replica database dependency.
         current_doctor (Doctor_Dependency): The current doctor dependency.
+        page_params (Page_Dependency): The pagination parameters.
 
     Returns:
-        list: A list of medical records for the current doctor.
+        ORJSONResponse: A page of medical records for the current doctor and the cursor of the next page.
     """
-    medical_records = (
-        db.query(MedicalRecord)
-        .filter(MedicalRecord.doctor_id == current_doctor.id)
-        .all()
+    page = await paginate(
+        db,
+        select(*loaders.MEDICAL_RECORD_OUT_COLUMNS).where(
+            MedicalRecord.doctor_id == current_doctor.doctor_id
+        ),
+        [MedicalRecord.created_at, MedicalRecord.id],
+        page_params,
     )
-    if not medical_records:
+    if not page["items"] and not page_params.cursor:
         raise HTTPException(status_code=404, detail="No medical records found")
-    return medical_records
+    return page_response(MedicalRecordOut, page)
 
 
 @doctors_router.get(
     "/medical-records/{patient_id}",
-    response_model=list[MedicalRecordOut],
+    response_model=Page[MedicalRecordOut],
     status_code=status.HTTP_200_OK,
 )
 async def view_all_medical_records_by_patient_id(
-    patient_id: str, db: DB_Dependency, current_doctor: Doctor_Dependency
+    patient_id: str,
+    db: ReadDB_Dependency,
+    current_doctor: Doctor_Dependency,
+    page_params: Page_Dependency,
 ):
     """
-    Retrieve the medical records for a patient.
+    Retrieve a page of the medical records for a patient.
 
     Args:
         patient_id (str): The ID of the patient.
-        db (DB_Dependency): The database dependency.
+        db (ReadDB_Dependency): The read replica database dependency.
         current_doctor (Doctor_Dependency): The current doctor.
+        page_params (Page_Dependency): The pagination parameters.
 
     Returns:
-        list: A list of medical records for the patient.
+        ORJSONResponse: A page of medical records for the patient and the cursor of the next page.
     """
-    medical_records = (
-        db.query(MedicalRecord)
-        .filter(
-            MedicalRecord.doctor_id == current_doctor.id,
+    page = await paginate(
+        db,
+        select(*loaders.MEDICAL_RECORD_OUT_COLUMNS).where(
+            MedicalRecord.doctor_id == current_doctor.doctor_id,
             MedicalRecord.patient_id == patient_id,
-        )
-        .all()
+        ),
+        [MedicalRecord.created_at, MedicalRecord.id],
+        page_params,
     )
-    if not medical_records:
+    if not page["items"] and not page_params.cursor:
         raise HTTPException(status_code=404, detail="No medical records found")
-    return medical_records
+    return page_response(MedicalRecordOut, page)
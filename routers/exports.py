@@ -0,0 +1,83 @@
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from starlette import status
+from core.enums import ExportFormatEnum
+from core.export import MEDIA_TYPES, stream_export
+from models.appointment import Appointment
+from models.medical_record import MedicalRecord
+from routers import Admin_Dependency
+
+exports_router = APIRouter(
+    prefix="/admin/export",
+    tags=["Exports"],
+)
+
+
+def export_response(query, fmt: ExportFormatEnum, name: str) -> StreamingResponse:
+    """
+    Build a streaming download response for an export query.
+
+    Args:
+        query (Select): The query selecting the exported columns.
+        fmt (ExportFormatEnum): The export format.
+        name (str): The base name of the downloaded file.
+
+    Returns:
+        StreamingResponse: The streaming response.
+    """
+    return StreamingResponse(
+        stream_export(query, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt.value}"'},
+    )
+
+
+@exports_router.get("/appointments", status_code=status.HTTP_200_OK)
+async def export_appointments(
+    current_user: Admin_Dependency,
+    format: ExportFormatEnum = ExportFormatEnum.ndjson,
+):
+    """
+    Export every appointment as NDJSON or CSV.
+
+    Args:
+        format (ExportFormatEnum, optional): The export format. Defaults to ndjson.
+
+    Returns:
+        StreamingResponse: The streamed export.
+    """
+    query = select(
+        Appointment.id,
+        Appointment.doctor_id,
+        Appointment.patient_id,
+        Appointment.scheduled_start,
+        Appointment.scheduled_end,
+        Appointment.status,
+    ).order_by(Appointment.id)
+    return export_response(query, format, "appointments")
+
+
+@exports_router.get("/medical-records", status_code=status.HTTP_200_OK)
+async def export_medical_records(
+    current_user: Admin_Dependency,
+    format: ExportFormatEnum = ExportFormatEnum.ndjson,
+):
+    """
+    Export every medical record as NDJSON or CSV.
+
+    Args:
+        format (ExportFormatEnum, optional): The export format. Defaults to ndjson.
+
+    Returns:
+        StreamingResponse: The streamed export.
+    """
+    query = select(
+        MedicalRecord.id,
+        MedicalRecord.doctor_id,
+        MedicalRecord.patient_id,
+        MedicalRecord.appointment_id,
+        MedicalRecord.created_at,
+        MedicalRecord.notes,
+    ).order_by(MedicalRecord.id)
+    return export_response(query, format, "medical_records")
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Response
+from starlette import status
+from core.metrics import CONTENT_TYPE, render
+
+metrics_router = APIRouter(tags=["Metrics"])
+
+
+@metrics_router.get("/metrics", status_code=status.HTTP_200_OK)
+async def metrics():
+    """
+    Expose the metrics of this process in the Prometheus text format.
+
+    Returns:
+        Response: The metrics exposition.
+    """
+    return Response(content=render(), media_type=CONTENT_TYPE)
@@ -1,18 +1,42 @@
-from fastapi import APIRouter, HTTPException
+from datetime import date, timedelta
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request
+from sqlalchemy import select
 from starlette import status
-from core.enums import WeekdayEnum
+from core.enums import AppointmentStatusEnum
+from core.booking import lock_doctor, run_serialized
+from core.cache import principal_cache
+from core.interval_index import appointment_index
+from core.scheduling import MAX_AVAILABILITY_RANGE_DAYS, load_free_slots, weekday_of
+from core.serialization import ORJSONResponse, page_response
+from models import loaders
 from models.appointment import Appointment
 from models.availability import Availability
 from models.doctor import Doctor
 from models.medical_record import MedicalRecord
 from models.patient import Patient
-from routers import DB_Dependency, Patient_Dependency, create_user
-from schemas.appointment import AppointmentCreate, AppointmentOut
-from schemas.availability import AvailabilitySlotResponse
+from models.user import User
+from deps.filters import filter_appointments
+from deps.pagination import paginate
+from routers import (
+    AppointmentFilters_Dependency,
+    CurrentUser_Dependency,
+    DB_Dependency,
+    Page_Dependency,
+    Patient_Dependency,
+    ReadDB_Dependency,
+    calendar_response,
+    create_user,
+    doctor_directory_response,
+)
+from schemas.appointment import AppointmentCreate, AppointmentOut, CalendarDay
+from schemas.availability import DailyFreeSlots
 from schemas.doctor import DoctorOut
 from schemas.medical_record import MedicalRecordOut
+from schemas.pagination import Page
 from schemas.patient import PatientCreate
 from tasks.email import notify_appointment_creation, send_welcome_email
+from tasks.outbox import enqueue_task
 
 patients_router = APIRouter(
     prefix="/patients",
@@ -40,7 +64,7 @@ async def register_new_patient(patient_data: PatientCreate, db: DB_Dependency):
         "hashed_password": patient_data.hashed_password,
     }
 
-    user_id = create_user(user_data, db)
+    user_id = await create_user(user_data, db)
 
     try:
         new_patient = Patient(
@@ -56,10 +80,11 @@ async def register_new_patient(patient_data: PatientCreate, db: DB_Dependency):
             )
 
         db.add(new_patient)
-        db.commit()
-        db.refresh(new_patient)
+        await db.commit()
+        await db.refresh(new_patient)
+        await principal_cache.invalidate(user_id)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
     send_welcome_email.delay(
@@ -74,6 +99,7 @@ async def create_new_appointment(
     appointment_data: AppointmentCreate,
     db: DB_Dependency,
     current_patient: Patient_Dependency,
+    current_user: CurrentUser_Dependency,
 ):
     """
     Create a new appointment for a patient.
@@ -82,278 +108,350 @@ async def create_new_appointment(
         appointment_data (AppointmentCreate): The appointment data to create.
         db (DB_Dependency): The database dependency.
         current_patient (Patient_Dependency): The current patient dependency.
+        current_user (CurrentUser_Dependency): The current user, for the notification.
 
     Returns:
         dict: A dictionary containing a success message.
     """
-    patient = db.query(Patient).filter(Patient.user_id == current_patient.id).first()
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient profile not found")
-
-    appointment_weekday = WeekdayEnum(
-        appointment_data.scheduled_start.strftime("%A").upper()
-    )
+    appointment_weekday = weekday_of(appointment_data.scheduled_start)
 
     if appointment_data.scheduled_start >= appointment_data.scheduled_end:
         raise HTTPException(status_code=400, detail="Invalid time range")
 
-    # Check if a valid availability slot exists
-    slot = (
-        db.query(Availability)
-        .filter(
-            Availability.doctor_id == appointment_data.doctor_id,
-            Availability.weekday == appointment_weekday,
-            Availability.start_time <= appointment_data.scheduled_start.time(),
-            Availability.end_time >= appointment_data.scheduled_end.time(),
-            Availability.available == True,
-        )
-        .first()
+    # The index may be stale, so a hit is only confirmed under the doctor lock
+    index = await appointment_index.lookup(db, appointment_data.doctor_id)
+    probably_taken = index.overlaps(
+        appointment_data.scheduled_start, appointment_data.scheduled_end
     )
 
-    if not slot:
-        raise HTTPException(
-            status_code=400,
-            detail="Doctor is not available at the selected time",
+    async def book():
+        if not await lock_doctor(db, appointment_data.doctor_id):
+            raise HTTPException(status_code=404, detail="Doctor not found")
+
+        # Check if a valid availability slot exists
+        slot = await db.scalar(
+            select(Availability).where(
+                Availability.doctor_id == appointment_data.doctor_id,
+                Availability.weekday == appointment_weekday,
+                Availability.start_time <= appointment_data.scheduled_start.time(),
+                Availability.end_time >= appointment_data.scheduled_end.time(),
+                Availability.available == True,
+            )
         )
 
-    # Check for overlapping appointments
-    conflict = (
-        db.query(Appointment)
-        .filter(
-            Appointment.doctor_id == appointment_data.doctor_id,
-            Appointment.scheduled_start < appointment_data.scheduled_end,
-            Appointment.scheduled_end > appointment_data.scheduled_start,
+        if not slot:
+            raise HTTPException(
+                status_code=400,
+                detail="Doctor is not available at the selected time",
+            )
+
+        # With the doctor locked, this check cannot race another booking
+        conflict = await db.scalar(
+            select(Appointment.id).where(
+                Appointment.doctor_id == appointment_data.doctor_id,
+                Appointment.scheduled_start < appointment_data.scheduled_end,
+                Appointment.scheduled_end > appointment_data.scheduled_start,
+                Appointment.status != AppointmentStatusEnum.cancelled,
+            )
         )
-        .first()
-    )
 
-    if conflict:
-        raise HTTPException(
-            status_code=409,
-            detail="This appointment overlaps with an existing one",
+        if conflict:
+            if not probably_taken:
+                appointment_index.drop(appointment_data.doctor_id)
+            raise HTTPException(
+                status_code=409,
+                detail="This appointment overlaps with an existing one",
+            )
+        if probably_taken:
+            # The slot was freed elsewhere; reload the index on the next booking
+            appointment_index.drop(appointment_data.doctor_id)
+
+        new_appointment = Appointment(
+            doctor_id=appointment_data.doctor_id,
+            patient_id=current_patient.patient_id,
+            scheduled_start=appointment_data.scheduled_start,
+            scheduled_end=appointment_data.scheduled_end,
+            status=appointment_data.status,
         )
+        db.add(new_appointment)
 
-    new_appointment = Appointment(
-        doctor_id=appointment_data.doctor_id,
-        patient_id=patient.id,
-        scheduled_start=appointment_data.scheduled_start,
-        scheduled_end=appointment_data.scheduled_end,
-        status=appointment_data.status,
-    )
+        doctor_user = await db.scalar(
+            select(User).join(Doctor).where(Doctor.id == appointment_data.doctor_id)
+        )
 
-    db.add(new_appointment)
-    db.commit()
-    db.refresh(new_appointment)
+        # Committed together with the appointment; the outbox relay publishes it
+        enqueue_task(
+            db,
+            notify_appointment_creation,
+            email=current_user.email,
+            doctor_name=f"{doctor_user.first_name} {doctor_user.last_name}",
+            date_time=new_appointment.scheduled_start.isoformat(),
+        )
+
+        await db.commit()
 
-    notify_appointment_creation.delay(
-        email=patient.email,
-        doctor_name=new_appointment.doctor.name,
-        date_time=new_appointment.scheduled_start,
+    await run_serialized(db, appointment_data.doctor_id, book)
+
+    appointment_index.record(
+        appointment_data.doctor_id,
+        appointment_data.scheduled_start,
+        appointment_data.scheduled_end,
+        appointment_data.status,
     )
 
     return {"message": "New appointment created"}
 
 
 @patients_router.get(
-    "/view-all-doctors", response_model=list[DoctorOut], status_code=status.HTTP_200_OK
+    "/view-all-doctors", response_model=Page[DoctorOut], status_code=status.HTTP_200_OK
 )
-async def view_all_doctors(db: DB_Dependency, current_patient: Patient_Dependency):
+async def view_all_doctors(
+    request: Request,
+    db: DB_Dependency,
+    current_patient: Patient_Dependency,
+    page_params: Page_Dependency,
+):
     """
-    Retrieve all doctors from the database.
+    Retrieve a page of doctors from the database.
 
     Args:
         db (DB_Dependency): The database dependency.
+        page_params (Page_Dependency): The pagination parameters.
 
     Returns:
-        list: A list of all doctors.
+        Response: The serialized page of doctors, or 304 if the client's copy is current.
     """
-    all_doctors = db.query(Doctor).all()
-    if not all_doctors:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No Doctors found",
-        )
-    return all_doctors
+    return await doctor_directory_response(request, db, page_params)
 
 
 @patients_router.get(
     "/doctor/availability/{doctor_id}",
-    response_model=list[AvailabilitySlotResponse],
+    response_model=list[DailyFreeSlots],
     status_code=status.HTTP_200_OK,
 )
 async def view_doctor_availability_by_doctor_id(
-    doctor_id: str, db: DB_Dependency, current_patient: Patient_Dependency
+    doctor_id: str,
+    db: ReadDB_Dependency,
+    current_patient: Patient_Dependency,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
 ):
     """
-    Retrieve the availability slots for a doctor.
+    Retrieve the free intervals of a doctor for each date in a range.
 
     Args:
         doctor_id (str): The ID of the doctor.
-        db (DB_Dependency): The database dependency.
+        db (ReadDB_Dependency): The read replica database dependency.
+        start_date (Optional[date], optional): The first date of the range. Defaults to today.
+        end_date (Optional[date], optional): The last date of the range. Defaults to a week after start_date.
 
     Returns:
-        list: A list of availability slots for the doctor.
+        ORJSONResponse: The free intervals of the doctor, grouped by date.
     """
-    doctor = db.query(Doctor).filter(Doctor.id == doctor_id).first()
-    if not doctor:
+    if start_date is None:
+        start_date = date.today()
+    if end_date is None:
+        end_date = start_date + timedelta(days=6)
+
+    if end_date < start_date:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Doctor not found",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date",
         )
 
-    availability_slots = (
-        db.query(Availability).filter(Availability.doctor_id == doctor_id).all()
-    )
+    if (end_date - start_date).days >= MAX_AVAILABILITY_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range must not exceed {MAX_AVAILABILITY_RANGE_DAYS} days",
+        )
 
-    if not availability_slots:
+    doctor = await db.get(Doctor, doctor_id)
+    if not doctor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="No availabile slots found for this doctor",
+            detail="Doctor not found",
         )
 
-    # Check for booked appointments within the availability slots
-    availability_responses = []
-    for slot in availability_slots:
-        # Check if there's any existing appointment that overlaps with this availability slot
-        booked_appointments = (
-            db.query(Appointment)
-            .filter(
-                Appointment.doctor_id == doctor_id,
-                Appointment.scheduled_start < slot.end_time,
-                Appointment.scheduled_end > slot.start_time,
-            )
-            .all()
-        )
+    free_slots = await load_free_slots(db, doctor_id, start_date, end_date)
+
+    return ORJSONResponse(
+        [
+            {
+                "day": day,
+                "free_slots": [
+                    {"start": start, "end": end} for start, end in intervals
+                ],
+            }
+            for day, intervals in free_slots.items()
+        ]
+    )
 
-        # If there are booked appointments, mark the slot as unavailable
-        is_available = len(booked_appointments) == 0
 
-        availability_responses.append(
-            AvailabilitySlotResponse(
-                weekday=slot.weekday.name,
-                start_time=slot.start_time,
-                end_time=slot.end_time,
-                available=is_available,
-            )
-        )
+@patients_router.get(
+    "/doctor/appointments",
+    response_model=Page[AppointmentOut],
+    status_code=status.HTTP_200_OK,
+)
+async def view_my_appointments(
+    current_user: Patient_Dependency,
+    db: ReadDB_Dependency,
+    page_params: Page_Dependency,
+    filters: AppointmentFilters_Dependency,
+):
+    """
+    Retrieve a page of the appointments for the current patient.
 
-    # Construct the DoctorResponse object
-    doctor_response = DoctorOut(
-        id=doctor.id,
-        specialization=doctor.specialization,
-        availability=availability_responses,
-        email=doctor.user.email,
-        first_name=doctor.user.first_name,
-        last_name=doctor.user.last_name,
-    )
+    Args:
+        current_user (Patient_Dependency): The current patient dependency.
+        db (ReadDB_Dependency): The read replica database dependency.
+        page_params (Page_Dependency): The pagination parameters.
+        filters (AppointmentFilters_Dependency): The optional from/to window and status.
 
-    return doctor_response
+    Returns:
+        ORJSONResponse: A page of appointments for the current patient and the cursor of the next page.
+    """
+    page = await paginate(
+        db,
+        filter_appointments(
+            select(*loaders.APPOINTMENT_OUT_COLUMNS).where(
+                Appointment.patient_id == current_user.patient_id
+            ),
+            filters,
+        ),
+        [Appointment.scheduled_start, Appointment.id],
+        page_params,
+    )
+    return page_response(AppointmentOut, page)
 
 
 @patients_router.get(
-    "/doctor/appointments",
-    response_model=list[AppointmentOut],
-    status_code=status.HTTP_200_OK,
+    "/calendar", response_model=list[CalendarDay], status_code=status.HTTP_200_OK
 )
-async def view_my_appointments(current_user: Patient_Dependency, db: DB_Dependency):
+async def view_my_calendar(
+    current_user: Patient_Dependency,
+    db: ReadDB_Dependency,
+    filters: AppointmentFilters_Dependency,
+):
     """
-    Retrieve the appointments for the current patient.
+    Retrieve the current patient's appointments in a time window, grouped by day.
 
     Args:
         current_user (Patient_Dependency): The current patient dependency.
-        db (DB_Dependency): The database dependency.
+        db (ReadDB_Dependency): The read replica database dependency.
+        filters (AppointmentFilters_Dependency): The required from/to window and optional status.
 
     Returns:
-        list: A list of appointments for the current patient.
+        ORJSONResponse: The days of the window with appointments, each with its appointments.
     """
-    appointments = (
-        db.query(Appointment).filter(Appointment.patient_id == current_user.id).all()
+    return await calendar_response(
+        db, Appointment.patient_id == current_user.patient_id, filters
     )
-    return appointments
 
 
 @patients_router.get(
     "/doctor/appointments/{doctor_id}",
-    response_model=list[AppointmentOut],
+    response_model=Page[AppointmentOut],
     status_code=status.HTTP_200_OK,
 )
 async def view_all_appointments_by_doctor_id(
-    doctor_id: str, db: DB_Dependency, current_user: Patient_Dependency
+    doctor_id: str,
+    db: ReadDB_Dependency,
+    current_user: Patient_Dependency,
+    page_params: Page_Dependency,
 ):
     """
-    Retrieve the appointments for a specific doctor.
+    Retrieve a page of the appointments for a specific doctor.
 
     Args:
         doctor_id (str): The ID of the doctor.
-        db (DB_Dependency): The database dependency.
+        db (ReadDB_Dependency): The read replica database dependency.
+        page_params (Page_Dependency): The pagination parameters.
 
     Returns:
-        list: A list of appointments for the doctor.
+        ORJSONResponse: A page of appointments for the doctor and the cursor of the next page.
     """
-    appointments = (
-        db.query(Appointment).filter(Appointment.doctor_id == doctor_id).all()
+    page = await paginate(
+        db,
+        select(*loaders.APPOINTMENT_OUT_COLUMNS).where(
+            Appointment.doctor_id == doctor_id
+        ),
+        [Appointment.scheduled_start, Appointment.id],
+        page_params,
     )
-    if not appointments:
+    if not page["items"] and not page_params.cursor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No appointments found for this doctor",
         )
-    return appointments
+    return page_response(AppointmentOut, page)
 
 
 @patients_router.get(
     "/medical-records/",
-    response_model=list[MedicalRecordOut],
+    response_model=Page[MedicalRecordOut],
     status_code=status.HTTP_200_OK,
 )
-async def view_all_medical_records(db: DB_Dependency, current_user: Patient_Dependency):
+async def view_all_medical_records(
+    db: ReadDB_Dependency,
+    current_user: Patient_Dependency,
+    page_params: Page_Dependency,
+):
     """
-    Retrieve the medical records for the current patient.
+    Retrieve a page of the medical records for the current patient.
 
     Args:
-        db (DB_Dependency): The database dependency.
+        db (ReadDB_Dependency): The read replica database dependency.
         current_user (Patient_Dependency): The current patient dependency.
+        page_params (Page_Dependency): The pagination parameters.
 
     Returns:
-        list: A list of medical records for the current patient.
+        ORJSONResponse: A page of medical records for the current patient and the cursor of the next page.
     """
-    medical_records = (
-        db.query(MedicalRecord)
-        .filter(MedicalRecord.patient_id == current_user.id)
-        .all()
+    page = await paginate(
+        db,
+        select(*loaders.MEDICAL_RECORD_OUT_COLUMNS).where(
+            MedicalRecord.patient_id == current_user.patient_id
+        ),
+        [MedicalRecord.created_at, MedicalRecord.id],
+        page_params,
     )
-    if not medical_records:
+    if not page["items"] and not page_params.cursor:
         raise HTTPException(status_code=404, detail="No medical records found")
-    return medical_records
+    return page_response(MedicalRecordOut, page)
 
 
 @patients_router.get(
     "/medical-records/{doctor_id}",
-    response_model=list[MedicalRecordOut],
+    response_model=Page[MedicalRecordOut],
     status_code=status.HTTP_200_OK,
 )
 async def view_all_medical_records_by_doctor_id(
-    doctor_id: str, db: DB_Dependency, current_user: Patient_Dependency
+    doctor_id: str,
+    db: ReadDB_Dependency,
+    current_user: Patient_Dependency,
+    page_params: Page_Dependency,
 ):
     """
-    Retrieve the medical records from a specific doctor.
+    Retrieve a page of the medical records from a specific doctor.
 
     Args:
         doctor_id (str): The ID of the doctor.
-        db (DB_Dependency): The database dependency.
+        db (ReadDB_Dependency): The read replica database dependency.
         current_user (Patient_Dependency): The current patient dependency.
+        page_params (Page_Dependency): The pagination parameters.
 
     Returns:
-        list: A list of medical records from a specific doctor.
+        ORJSONResponse: A page of medical records from a specific doctor and the cursor of the next page.
     """
-    medical_records = (
-        db.query(MedicalRecord)
-        .filter(
+    page = await paginate(
+        db,
+        select(*loaders.MEDICAL_RECORD_OUT_COLUMNS).where(
             MedicalRecord.doctor_id == doctor_id,
-            MedicalRecord.patient_id == current_user.id,
-        )
-        .all()
+            MedicalRecord.patient_id == current_user.patient_id,
+        ),
+        [MedicalRecord.created_at, MedicalRecord.id],
+        page_params,
     )
-    if not medical_records:
+    if not page["items"] and not page_params.cursor:
         raise HTTPException(status_code=404, detail="No medical records found")
-    return medical_records
+    return page_response(MedicalRecordOut, page)
@@ -1,9 +1,26 @@
 from fastapi import APIRouter, HTTPException, status
+from sqlalchemy import select
+from core.cache import directory_cache, principal_cache
+from core.interval_index import appointment_index
+from core.revocation import revoked_tokens
+from core.scheduling import insert_weekly_templates
+from core.search import specialization_index
+from core.serialization import page_response
+from models import loaders
 from models.patient import Patient
 from models.doctor import Doctor
 from models.user import User
-from routers import Admin_Dependency, DB_Dependency, create_user
+from deps.pagination import paginate
+from routers import (
+    Admin_Dependency,
+    DB_Dependency,
+    Page_Dependency,
+    ReadDB_Dependency,
+    create_user,
+)
+from schemas.availability import ClinicTemplateCreate
 from schemas.doctor import DoctorCreate
+from schemas.pagination import Page
 from schemas.patient import PatientCreate
 from schemas.user import AdminOut, UserCreate, UserOut
 from tasks.email import send_welcome_email
@@ -15,20 +32,23 @@ users_router = APIRouter(
 
 
 @users_router.get(
-    "/all-users", response_model=list[UserOut], status_code=status.HTTP_200_OK
+    "/all-users", response_model=Page[UserOut], status_code=status.HTTP_200_OK
 )
-async def get_all_users(db: DB_Dependency, current_user: Admin_Dependency):
+async def get_all_users(
+    db: ReadDB_Dependency, current_user: Admin_Dependency, page_params: Page_Dependency
+):
     """
-    Retrieve all users from the database.
+    Retrieve a page of users from the database.
 
     Args:
-        db (DB_Dependency): The database dependency.
+        db (ReadDB_Dependency): The read replica database dependency.
+        page_params (Page_Dependency): The pagination parameters.
 
     Returns:
-        list: A list of all users.
+        ORJSONResponse: A page of users and the cursor of the next page.
     """
-    all_users = db.query(User).all()
-    return all_users
+    page = await paginate(db, select(*loaders.USER_OUT_COLUMNS), [User.id], page_params)
+    return page_response(UserOut, page)
 
 
 @users_router.get(
@@ -47,7 +67,7 @@ async def get_user_by_id(
     Returns:
         User: The user object.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,7 +94,7 @@ async def register_new_admin(user_data: UserCreate, db: DB_Dependency):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User role must be 'admin'",
         )
-    create_user(user_data.model_dump(), db)
+    await create_user(user_data.model_dump(), db)
 
     send_welcome_email.delay(email=user_data.email, first_name=user_data.first_name)
 
@@ -104,7 +124,7 @@ async def register_new_doctor(
         "hashed_password": doctor_data.hashed_password,
     }
 
-    user_id = create_user(user_data, db)
+    user_id = await create_user(user_data, db)
 
     new_doctor = Doctor(user_id=user_id, specialization=doctor_data.specialization)
 
@@ -115,8 +135,11 @@ async def register_new_doctor(
         )
 
     db.add(new_doctor)
-    db.commit()
-    db.refresh(new_doctor)
+    await db.commit()
+    await db.refresh(new_doctor)
+    await principal_cache.invalidate(user_id)
+    await directory_cache.invalidate()
+    specialization_index.add(new_doctor.id, new_doctor.specialization_key)
 
     send_welcome_email.delay(email=doctor_data.email, first_name=doctor_data.first_name)
 
@@ -145,7 +168,7 @@ async def register_new_patient(
         "hashed_password": patient_data.hashed_password,
     }
 
-    user_id = create_user(user_data, db)
+    user_id = await create_user(user_data, db)
 
     new_patient = Patient(
         user_id=user_id,
@@ -160,14 +183,54 @@ async def register_new_patient(
         )
 
     db.add(new_patient)
-    db.commit()
-    db.refresh(new_patient)
+    await db.commit()
+    await db.refresh(new_patient)
+    await principal_cache.invalidate(user_id)
 
-    send_welcome_email(email=patient_data.email, first_name=patient_data.first_name)
+    send_welcome_email.delay(
+        email=patient_data.email, first_name=patient_data.first_name
+    )
 
     return {"message": "patient registered successfully"}
 
 
+@users_router.post("/availability-template", status_code=status.HTTP_201_CREATED)
+async def create_clinic_availability_template(
+    template: ClinicTemplateCreate,
+    db: DB_Dependency,
+    current_user: Admin_Dependency,
+):
+    """
+    Roll out a weekly template of availability slots to several doctors at once.
+
+    Args:
+        template (ClinicTemplateCreate): The doctors and the weekly slots to add.
+        db (DB_Dependency): The database dependency.
+        current_user (Admin_Dependency): The current admin user.
+
+    Returns:
+        dict: A dictionary containing a success message and the number of slots created.
+    """
+    doctor_ids = list(dict.fromkeys(template.doctor_ids))
+    found = set(await db.scalars(select(Doctor.id).where(Doctor.id.in_(doctor_ids))))
+    missing = [doctor_id for doctor_id in doctor_ids if doctor_id not in found]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"message": "Doctors not found", "doctor_ids": missing},
+        )
+
+    slots = [(slot.weekday, slot.start_time, slot.end_time) for slot in template.slots]
+    created = await insert_weekly_templates(
+        db, {doctor_id: slots for doctor_id in doctor_ids}
+    )
+    await db.commit()
+
+    await directory_cache.invalidate()
+
+    return {"message": "Availability template created", "created": created}
+
+
 @users_router.delete("/delete-user/{user_id}", status_code=status.HTTP_200_OK)
 async def delete_user(user_id: str, db: DB_Dependency, current_user: Admin_Dependency):
     """
@@ -180,12 +243,24 @@ async def delete_user(user_id: str, db: DB_Dependency, current_user: Admin_Depen
     Returns:
         dict: A dictionary containing a success message.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
-    db.delete(user)
-    db.commit()
+    doctor_id = await db.scalar(select(Doctor.id).where(Doctor.user_id == user_id))
+    await db.delete(user)
+    await db.commit()
+
+    # Tokens are authorized from their claims alone, so revoke them explicitly
+    await revoked_tokens.revoke(user_id)
+    await principal_cache.invalidate(user_id)
+
+    # Cascaded appointment deletes can free booked intervals of any doctor
+    await appointment_index.invalidate()
+    await directory_cache.invalidate()
+    if doctor_id is not None:
+        specialization_index.remove(doctor_id)
+
     return {"message": "User deleted successfully"}
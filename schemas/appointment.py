@@ -1,5 +1,9 @@
-from pydantic import BaseModel, ConfigDict, Field
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from datetime import date, datetime
+from typing import List, Optional
+
+from core.enums import AppointmentStatusEnum
+from deps.utils import to_naive_utc
 
 
 class AppointmentBase(BaseModel):
@@ -8,6 +12,12 @@ class AppointmentBase(BaseModel):
     scheduled_end: datetime = Field(..., description="End of the appointment")
     status: str = Field(..., description="Appointment status")
 
+    @field_validator("scheduled_start", "scheduled_end")
+    @classmethod
+    def store_as_naive_utc(cls, value):
+        # Stored and compared as naive UTC; an offset would not compare
+        return to_naive_utc(value)
+
 
 class AppointmentCreate(AppointmentBase):
     pass
@@ -17,3 +27,31 @@ class AppointmentOut(AppointmentBase):
     id: str = Field(..., description="Appointment's ID")
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class AppointmentFilters(BaseModel):
+    start: Optional[datetime] = Field(
+        None, description="Only appointments starting at or after this time"
+    )
+    end: Optional[datetime] = Field(
+        None, description="Only appointments starting before this time"
+    )
+    status: Optional[AppointmentStatusEnum] = Field(
+        None, description="Only appointments with this status"
+    )
+
+
+class CalendarAppointment(BaseModel):
+    id: str = Field(..., description="Appointment's ID")
+    doctor_id: str = Field(..., description="Doctor's ID")
+    patient_id: str = Field(..., description="Patient's ID")
+    start: datetime = Field(..., description="Start of the appointment")
+    end: datetime = Field(..., description="End of the appointment")
+    status: str = Field(..., description="Appointment status")
+
+
+class CalendarDay(BaseModel):
+    day: date = Field(..., description="Calendar date")
+    appointments: List[CalendarAppointment] = Field(
+        ..., description="Appointments starting on this date, in start order"
+    )
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, EmailStr
+from schemas.user import UserRole
 
 
 class LoginRequest(BaseModel):
@@ -9,3 +11,31 @@ class LoginRequest(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+
+
+class TokenClaims(BaseModel):
+    sub: str
+    role: UserRole
+    doctor_id: Optional[str] = None
+    patient_id: Optional[str] = None
+    iat: int
+    exp: int
+
+    @property
+    def id(self) -> str:
+        """
+        The ID of the user the token was issued to.
+        """
+        return self.sub
+
+
+class Principal(BaseModel):
+    id: str
+    email: EmailStr
+    first_name: str
+    last_name: str
+    role: UserRole
+    doctor_id: Optional[str] = None
+    patient_id: Optional[str] = None
+
+    model_config = ConfigDict(frozen=True)
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, ConfigDict, Field, field_validator
-from datetime import time
+from datetime import date, datetime, time
+from typing import List
 
 from core.enums import WeekdayEnum
 
@@ -25,6 +26,32 @@ class AvailabilityCreate(AvailabilityBase):
     pass
 
 
+class WeeklySlotIn(BaseModel):
+    weekday: WeekdayEnum = Field(..., description="Day Available")
+    start_time: time = Field(..., description="Availability start time")
+    end_time: time = Field(..., description="Availability end time")
+
+    @field_validator("end_time")
+    @classmethod
+    def check_time_order(cls, end, info):
+        start = info.data.get("start_time")
+        if start and end <= start:
+            raise ValueError("end_time must be after start_time")
+        return end
+
+
+class WeeklyTemplateCreate(BaseModel):
+    slots: List[WeeklySlotIn] = Field(
+        ..., min_length=1, max_length=500, description="Weekly availability slots"
+    )
+
+
+class ClinicTemplateCreate(WeeklyTemplateCreate):
+    doctor_ids: List[str] = Field(
+        ..., min_length=1, max_length=500, description="Doctors receiving the template"
+    )
+
+
 class AvailabilityOut(AvailabilityBase):
     id: str = Field(..., description="Availability's ID")
     available: bool = Field(..., description="Availability status")
@@ -36,3 +63,15 @@ class AvailabilitySlotResponse(AvailabilityOut):
     pass
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class FreeInterval(BaseModel):
+    start: datetime = Field(..., description="Start of the free interval")
+    end: datetime = Field(..., description="End of the free interval")
+
+
+class DailyFreeSlots(BaseModel):
+    day: date = Field(..., description="Calendar date")
+    free_slots: List[FreeInterval] = Field(
+        ..., description="Free intervals on this date"
+    )
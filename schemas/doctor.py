@@ -20,3 +20,11 @@ class DoctorOut(DoctorBase):
     user: UserOut
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class SpecializationMatch(BaseModel):
+    specialization: str = Field(..., description="Normalized specialization")
+    doctors: int = Field(..., description="Number of doctors with this specialization")
+    match: str = Field(
+        ..., description="How the query matched: exact, prefix, word_prefix or fuzzy"
+    )
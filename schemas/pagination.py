@@ -0,0 +1,16 @@
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel, Field
+
+T = TypeVar("T")
+
+
+class PageParams(BaseModel):
+    limit: int = Field(..., description="Maximum number of items per page")
+    cursor: Optional[str] = Field(None, description="Cursor returned by the last page")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T] = Field(..., description="Items of this page")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor of the next page, null on the last page"
+    )
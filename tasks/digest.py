@@ -0,0 +1,150 @@
+import json
+from time import time
+from typing import List, Optional, Tuple
+import redis
+from core.config import settings
+from core.metrics import Counter, Histogram
+
+notification_messages_saved_total = Counter(
+    "notification_messages_saved_total",
+    "Emails not sent because their notification was folded into a digest",
+)
+notification_digest_delay_seconds = Histogram(
+    "notification_digest_delay_seconds",
+    "Time a notification waited in the digest buffer before being sent",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600),
+)
+
+DIGEST_SUBJECT = "You have {count} new notifications"
+
+
+class DigestBuffer:
+    """
+    Per-recipient notification buffers kept in Redis lists.
+
+    Notifications for one recipient are appended to a list. The first push
+    into an empty list tells the caller to schedule a flush after the window,
+    and the flush drains the whole list atomically, so a push racing with it
+    either lands in the drained batch or starts a new window. A batch that
+    could not be sent is pushed back to the front of the list.
+    """
+
+    def __init__(self, redis_url: str, window_seconds: int):
+        self.redis_url = redis_url
+        self.window_seconds = window_seconds
+        self._redis: Optional[redis.Redis] = None
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(self.redis_url)
+        return self._redis
+
+    @staticmethod
+    def _key(recipient: str) -> str:
+        return f"digest:{recipient.lower()}"
+
+    def push(self, recipient: str, subject: str, body: str) -> bool:
+        """
+        Buffer a notification for a recipient.
+
+        Args:
+            recipient (str): The email address of the recipient.
+            subject (str): The subject of the notification.
+            body (str): The body of the notification.
+
+        Returns:
+            bool: True if the caller must schedule a flush for this recipient.
+        """
+        key = self._key(recipient)
+        item = json.dumps({"subject": subject, "body": body, "queued_at": time()})
+        length = self.client.rpush(key, item)
+        if length == 1:
+            return True
+
+        # A flush that was lost (e.g. a worker crash) would strand the buffer;
+        # reschedule once the oldest entry is well past its window
+        oldest = self.client.lindex(key, 0)
+        return (
+            oldest is not None
+            and time() - json.loads(oldest)["queued_at"] > 2 * self.window_seconds
+        )
+
+    def drain(self, recipient: str) -> List[Tuple[str, str, float]]:
+        """
+        Remove and return every buffered notification of a recipient.
+
+        Args:
+            recipient (str): The email address of the recipient.
+
+        Returns:
+            List[Tuple[str, str, float]]: The (subject, body, queued_at) of each notification, oldest first.
+        """
+        key = self._key(recipient)
+        with self.client.pipeline(transaction=True) as pipe:
+            pipe.lrange(key, 0, -1)
+            pipe.delete(key)
+            items, _ = pipe.execute()
+
+        entries = [json.loads(item) for item in items]
+        return [(e["subject"], e["body"], e["queued_at"]) for e in entries]
+
+    def restore(self, recipient: str, entries: List[Tuple[str, str, float]]):
+        """
+        Put drained notifications back ahead of any buffered since the drain.
+
+        Args:
+            recipient (str): The email address of the recipient.
+            entries (List[Tuple[str, str, float]]): The drained entries, oldest first.
+        """
+        if not entries:
+            return
+        items = [
+            json.dumps({"subject": subject, "body": body, "queued_at": queued_at})
+            for subject, body, queued_at in entries
+        ]
+        # LPUSH prepends one at a time, so push newest first to keep the order
+        self.client.lpush(self._key(recipient), *reversed(items))
+
+
+def render_digest(entries: List[Tuple[str, str, float]]) -> Tuple[str, str]:
+    """
+    Combine buffered notifications into a single email.
+
+    A single notification is sent unchanged.
+
+    Args:
+        entries (List[Tuple[str, str, float]]): The buffered (subject, body, queued_at) entries.
+
+    Returns:
+        Tuple[str, str]: The subject and body of the email.
+    """
+    if len(entries) == 1:
+        subject, body, _ = entries[0]
+        return subject, body
+
+    sections = [f"{subject}\n\n{body}" for subject, body, _ in entries]
+    return (
+        DIGEST_SUBJECT.format(count=len(entries)),
+        ("\n\n" + "-" * 40 + "\n\n").join(sections),
+    )
+
+
+def record_flush(entries: List[Tuple[str, str, float]]):
+    """
+    Record the emails saved and the delay added by one digest.
+
+    Args:
+        entries (List[Tuple[str, str, float]]): The entries sent in the digest.
+    """
+    now = time()
+    for _, _, queued_at in entries:
+        notification_digest_delay_seconds.observe(now - queued_at)
+    if len(entries) > 1:
+        notification_messages_saved_total.inc(len(entries) - 1)
+
+
+digest_buffer = DigestBuffer(
+    settings.REDIS_URL or settings.CELERY_BROKER_URL,
+    settings.NOTIFICATION_DIGEST_WINDOW_SECONDS,
+)
@@ -1,29 +1,191 @@
 import smtplib
+from datetime import datetime
 from email.message import EmailMessage
+from time import perf_counter, time
+from typing import Dict, Iterable, Tuple
 from celery import Celery
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_shutdown,
+)
 from core.config import settings
+from core.metrics import Histogram, mark_process_dead, start_http_server
+from tasks.digest import digest_buffer, record_flush, render_digest
+from tasks.smtp import smtp_pool
 
-celery = Celery("email_tasks", broker="redis://redis:6379/0")
+celery = Celery("email_tasks", broker=settings.CELERY_BROKER_URL)
 
+celery_task_queue_wait_seconds = Histogram(
+    "celery_task_queue_wait_seconds",
+    "Time a task waited in the broker after it was published or became due",
+    labelnames=("task",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 15, 60, 300),
+)
+celery_task_duration_seconds = Histogram(
+    "celery_task_duration_seconds",
+    "Time to execute a task, by final state",
+    labelnames=("task", "state"),
+)
 
-def send_email(subject: str, recipient: str, body: str):
+# Start times of the tasks running in this process, by task ID
+_task_started: Dict[str, float] = {}
+
+
+def build_message(subject: str, recipient: str, body: str) -> EmailMessage:
     """
-    Send an email.
+    Build a plain-text email from the platform address.
 
     Args:
         subject (str): The subject of the email.
         recipient (str): The email address of the recipient.
         body (str): The body of the email.
+
+    Returns:
+        EmailMessage: The email message.
     """
     msg = EmailMessage()
     msg["Subject"] = subject
     msg["From"] = settings.EMAIL_ADDRESS
     msg["To"] = recipient
     msg.set_content(body)
+    return msg
+
+
+def send_email(subject: str, recipient: str, body: str):
+    """
+    Send an email over a pooled SMTP session.
+
+    Args:
+        subject (str): The subject of the email.
+        recipient (str): The email address of the recipient.
+        body (str): The body of the email.
+    """
+    smtp_pool.send([build_message(subject, recipient, body)])
+
+
+def send_emails(messages: Iterable[Tuple[str, str, str]]) -> int:
+    """
+    Send several emails back to back over a single pooled SMTP session.
+
+    Args:
+        messages (Iterable[Tuple[str, str, str]]): The (subject, recipient, body) of each email.
+
+    Returns:
+        int: The number of emails sent.
+    """
+    return smtp_pool.send(build_message(*message) for message in messages)
+
+
+def notify(recipient: str, subject: str, body: str):
+    """
+    Send a notification, folding it into the recipient's digest if enabled.
+
+    The first notification of a window schedules a flush; later ones within
+    the window are sent together with it in a single email.
+
+    Args:
+        recipient (str): The email address of the recipient.
+        subject (str): The subject of the notification.
+        body (str): The body of the notification.
+    """
+    window = settings.NOTIFICATION_DIGEST_WINDOW_SECONDS
+    if window <= 0:
+        send_email(subject, recipient, body)
+        return
+
+    if digest_buffer.push(recipient, subject, body):
+        flush_digest.apply_async(args=[recipient], countdown=window)
+
 
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-        smtp.login(settings.EMAIL_ADDRESS, settings.EMAIL_PASSWORD)
-        smtp.send_message(msg)
+@celery.task(bind=True, max_retries=5)
+def flush_digest(self, recipient: str):
+    """
+    Send every buffered notification of a recipient as one email.
+
+    If the email cannot be sent, the notifications are pushed back into the
+    buffer and the flush is retried after a window. Once the retries run out
+    they stay buffered, and the next notification schedules a new flush.
+
+    Args:
+        recipient (str): The email address of the recipient.
+    """
+    entries = digest_buffer.drain(recipient)
+    if not entries:
+        return
+
+    subject, body = render_digest(entries)
+    try:
+        send_email(subject, recipient, body)
+    except (smtplib.SMTPException, OSError) as e:
+        digest_buffer.restore(recipient, entries)
+        raise self.retry(exc=e, countdown=settings.NOTIFICATION_DIGEST_WINDOW_SECONDS)
+    record_flush(entries)
+
+
+@before_task_publish.connect
+def stamp_publish_time(headers=None, **kwargs):
+    """
+    Record when a task was published, so the worker can measure its queue wait.
+    """
+    if headers is not None:
+        headers.setdefault("published_at", time())
+
+
+@task_prerun.connect
+def record_queue_wait(task_id=None, task=None, **kwargs):
+    """
+    Record how long a task waited in the broker and start timing its run.
+
+    A task scheduled for later only starts waiting once its ETA has passed.
+    """
+    _task_started[task_id] = perf_counter()
+
+    published_at = getattr(task.request, "published_at", None)
+    if published_at is None:
+        return
+    eta = task.request.eta
+    if eta:
+        published_at = max(published_at, datetime.fromisoformat(eta).timestamp())
+    celery_task_queue_wait_seconds.labels(task=task.name).observe(
+        max(0.0, time() - published_at)
+    )
+
+
+@task_postrun.connect
+def record_task_duration(task_id=None, task=None, state=None, **kwargs):
+    """
+    Record how long a task ran.
+    """
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        celery_task_duration_seconds.labels(task=task.name, state=state).observe(
+            perf_counter() - started
+        )
+
+
+@worker_init.connect
+def serve_worker_metrics(**kwargs):
+    """
+    Expose the task metrics of the worker over HTTP if a port is configured.
+
+    Pool children record their metrics in the process that runs the task; with
+    PROMETHEUS_MULTIPROC_DIR set, the server aggregates every child's samples.
+    """
+    if settings.CELERY_METRICS_PORT:
+        start_http_server(settings.CELERY_METRICS_PORT)
+
+
+@worker_process_shutdown.connect
+def close_smtp_connections(**kwargs):
+    """
+    Log out of the pooled SMTP sessions when a worker process exits, and
+    drop its live metrics from the aggregate.
+    """
+    smtp_pool.close()
+    mark_process_dead()
 
 
 @celery.task
@@ -37,7 +199,7 @@ def send_welcome_email(email: str, first_name: str):
     """
     subject = "Welcome to Our HealthCare Platform"
     body = f"Hi {first_name},\n\nThank you for registering. We're excited to have you!"
-    send_email(subject, email, body)
+    notify(email, subject, body)
 
 
 @celery.task
@@ -52,7 +214,7 @@ def notify_appointment_creation(email: str, doctor_name: str, date_time: str):
     """
     subject = "New Appointment Confirmation"
     body = f"Dear {email},\n\nYour appointment with Dr. {doctor_name} is confirmed for {date_time}."
-    send_email(subject, email, body)
+    notify(email, subject, body)
 
 
 @celery.task
@@ -66,4 +228,4 @@ def notify_new_medical_record_creation(email: str, doctor_name: str):
     """
     subject = "New Medical Record Added"
     body = f"Dear {email},\n\nA new medical record has been added to your profile by Dr. {doctor_name}."
-    send_email(subject, email, body)
+    notify(email, subject, body)
@@ -0,0 +1,135 @@
+"""
+Transactional outbox for Celery notifications.
+
+Handlers add an OutboxMessage in the same transaction as the rows the
+notification is about, so a notification exists exactly when its data was
+committed and the broker is never on the request path. The relay drains the
+table into Celery in id order:
+
+    python -m tasks.outbox
+
+Only one relay publishes at a time, so the order holds across relays: on
+MySQL each batch is taken under a named lock, and a second relay stays idle
+while another holds it. Other backends have no such lock, so run a single
+relay there.
+"""
+
+import logging
+from contextlib import contextmanager
+from time import sleep
+from typing import Iterator
+from celery import Task
+from sqlalchemy import delete, select, text
+from core.config import settings
+from core.database import SessionLocal, engine
+from models.outbox import OutboxMessage
+from tasks.email import celery
+
+logger = logging.getLogger(__name__)
+
+RELAY_LOCK = "outbox-relay"
+
+
+def enqueue_task(db, task: Task, **kwargs):
+    """
+    Queue a Celery task in the outbox as part of the caller's transaction.
+
+    Args:
+        db (AsyncSession | Session): The database session.
+        task (Task): The Celery task to run once the transaction commits.
+        **kwargs: The keyword arguments of the task.
+    """
+    db.add(OutboxMessage(task_name=task.name, payload=kwargs))
+
+
+@contextmanager
+def relay_lock() -> Iterator[bool]:
+    """
+    Try to take the relay lock without waiting.
+
+    On MySQL this is GET_LOCK on a dedicated connection, so it is held across
+    the commits of the batch; other backends always get the lock.
+
+    Returns:
+        Iterator[bool]: True if this relay holds the lock, False otherwise.
+    """
+    if engine.dialect.name != "mysql":
+        yield True
+        return
+
+    with engine.connect() as conn:
+        acquired = conn.scalar(text("SELECT GET_LOCK(:name, 0)"), {"name": RELAY_LOCK})
+        try:
+            yield acquired == 1
+        finally:
+            if acquired == 1:
+                conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": RELAY_LOCK})
+
+
+def relay_batch(batch_size: int = settings.OUTBOX_BATCH_SIZE) -> int:
+    """
+    Publish the oldest pending outbox messages to Celery.
+
+    The batch is taken under the relay lock: relays publishing side by side
+    would interleave their batches and break the order. Rows are deleted in
+    the same transaction once published. Each message is published with the
+    task id "outbox-<id>", so a message that is published again after a
+    failed commit keeps its identity. Publishing stops at the first failure
+    to preserve the order of what follows.
+
+    Args:
+        batch_size (int, optional): The maximum number of messages to publish.
+
+    Returns:
+        int: The number of messages published; 0 if another relay holds the lock.
+    """
+    with relay_lock() as acquired:
+        if not acquired:
+            return 0
+
+        with SessionLocal() as db:
+            messages = db.scalars(
+                select(OutboxMessage)
+                .order_by(OutboxMessage.id)
+                .limit(batch_size)
+                .with_for_update()
+            ).all()
+
+            published = []
+            try:
+                for message in messages:
+                    celery.send_task(
+                        message.task_name,
+                        kwargs=message.payload,
+                        task_id=f"outbox-{message.id}",
+                    )
+                    published.append(message.id)
+            finally:
+                if published:
+                    db.execute(
+                        delete(OutboxMessage).where(OutboxMessage.id.in_(published))
+                    )
+                db.commit()
+        return len(published)
+
+
+def run_relay(poll_interval: float = settings.OUTBOX_POLL_INTERVAL_SECONDS):
+    """
+    Drain the outbox forever, sleeping only when it is empty.
+
+    Args:
+        poll_interval (float, optional): Seconds to wait after an empty poll.
+    """
+    while True:
+        try:
+            published = relay_batch()
+        except Exception:
+            logger.exception("Outbox relay failed, retrying")
+            published = 0
+        if not published:
+            sleep(poll_interval)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_relay()
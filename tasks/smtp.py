@@ -0,0 +1,207 @@
+import os
+import queue
+import smtplib
+import ssl
+import threading
+from contextlib import contextmanager
+from email.message import EmailMessage
+from time import monotonic
+from typing import Iterable, Iterator, Optional
+from core.config import settings
+
+
+def is_connection_error(exc: BaseException) -> bool:
+    """
+    Tell a dead session apart from the server rejecting a single message.
+
+    SMTPException derives from OSError, so the SMTP reply errors are excluded
+    explicitly: after those the session is still usable.
+
+    Args:
+        exc (BaseException): The raised exception.
+
+    Returns:
+        bool: True if the session can no longer be used, False otherwise.
+    """
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(exc, OSError) and not isinstance(exc, smtplib.SMTPException)
+
+
+class PooledConnection:
+    """
+    An authenticated SMTP session and the bookkeeping the pool needs for it.
+    """
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.messages_sent = 0
+        self.last_used = monotonic()
+
+    def close(self):
+        """
+        Close the session, ignoring errors from an already dead socket.
+        """
+        try:
+            self.smtp.quit()
+        except Exception:
+            self.smtp.close()
+
+
+class SMTPConnectionPool:
+    """
+    Bounded pool of persistent, authenticated SMTP sessions.
+
+    Sessions are reused across messages instead of paying a TLS handshake and
+    a login per email. A session idle for longer than the health-check
+    interval is probed with NOOP before reuse, and sessions are recycled
+    after a fixed number of messages so providers' per-session limits are
+    never hit. The pool is reset in forked children, since a socket must not
+    be shared between processes.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        use_ssl: bool = True,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        size: int = 2,
+        max_messages: int = 100,
+        healthcheck_after: float = 30.0,
+        timeout: float = 10.0,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.username = username
+        self.password = password
+        self.size = size
+        self.max_messages = max_messages
+        self.healthcheck_after = healthcheck_after
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle: "queue.LifoQueue[PooledConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+
+    def _connect(self) -> PooledConnection:
+        if self.use_ssl:
+            context = self.ssl_context or ssl.create_default_context()
+            smtp = smtplib.SMTP_SSL(
+                self.host, self.port, timeout=self.timeout, context=context
+            )
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.username:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        return PooledConnection(smtp)
+
+    def _is_healthy(self, connection: PooledConnection) -> bool:
+        if connection.messages_sent >= self.max_messages:
+            return False
+        if monotonic() - connection.last_used < self.healthcheck_after:
+            return True
+        try:
+            return connection.smtp.noop()[0] == 250
+        except OSError:
+            return False
+
+    def _checkout(self) -> PooledConnection:
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if self._is_healthy(connection):
+                return connection
+            connection.close()
+
+    def _release(self, connection: PooledConnection):
+        connection.last_used = monotonic()
+        self._idle.put(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        """
+        Borrow a healthy session, opening one if none is idle.
+
+        A session that fails with a connection error is closed instead of
+        being returned to the pool.
+
+        Returns:
+            Iterator[PooledConnection]: The borrowed session.
+        """
+        if self._pid != os.getpid():
+            self._reset()
+
+        with self._slots:
+            connection = self._checkout()
+            try:
+                yield connection
+            except BaseException as exc:
+                if is_connection_error(exc):
+                    connection.close()
+                    raise
+                self._release(connection)
+                raise
+            self._release(connection)
+
+    def send(self, messages: Iterable[EmailMessage]) -> int:
+        """
+        Send messages over one pooled session, reconnecting once on failure.
+
+        Args:
+            messages (Iterable[EmailMessage]): The messages to send.
+
+        Returns:
+            int: The number of messages sent.
+        """
+        pending = list(messages)
+        sent = 0
+        retried = False
+        while sent < len(pending):
+            try:
+                with self.connection() as connection:
+                    while sent < len(pending):
+                        if connection.messages_sent >= self.max_messages:
+                            break
+                        connection.smtp.send_message(pending[sent])
+                        connection.messages_sent += 1
+                        sent += 1
+            except Exception as exc:
+                if retried or not is_connection_error(exc):
+                    raise
+                retried = True
+        return sent
+
+    def close(self):
+        """
+        Close every idle session.
+        """
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+smtp_pool = SMTPConnectionPool(
+    host=settings.SMTP_HOST,
+    port=settings.SMTP_PORT,
+    use_ssl=settings.SMTP_USE_SSL,
+    username=settings.EMAIL_ADDRESS,
+    password=settings.EMAIL_PASSWORD,
+    size=settings.SMTP_POOL_SIZE,
+    max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+    healthcheck_after=settings.SMTP_HEALTHCHECK_AFTER_SECONDS,
+)
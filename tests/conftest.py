@@ -0,0 +1,202 @@
+"""
+Shared fixtures for the test suite.
+
+The settings are pointed at a throwaway SQLite database and an in-memory
+Celery broker before any project module is imported, so the tests run
+without MySQL, Redis or SMTP.
+"""
+
+import os
+import tempfile
+from datetime import time
+from typing import Optional
+
+TEST_DB_PATH = os.path.join(tempfile.mkdtemp(), "appointments_test.db")
+
+os.environ.setdefault("MYSQL_USER", "test")
+os.environ.setdefault("MYSQL_PASSWORD", "test")
+os.environ.setdefault("MYSQL_DATABASE", "test")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("EMAIL_ADDRESS", "test@example.com")
+os.environ.setdefault("EMAIL_PASSWORD", "test")
+os.environ.setdefault("DEV_ENV", "local")
+os.environ.setdefault("ADMIN_EMAIL", "admin@example.com")
+os.environ.setdefault("ADMIN_PASSWORD", "admin-password")
+os.environ["PROD_DB"] = f"sqlite:///{TEST_DB_PATH}"
+os.environ["CELERY_BROKER_URL"] = "memory://"
+os.environ.pop("REDIS_URL", None)
+os.environ.pop("READ_DB", None)
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from core.cache import directory_cache, principal_cache  # noqa: E402
+from core.database import Base, SessionLocal, engine  # noqa: E402
+from core.enums import WeekdayEnum  # noqa: E402
+from core.interval_index import appointment_index  # noqa: E402
+from core.security import create_access_token  # noqa: E402
+from deps.db import get_read_db  # noqa: E402
+from main import app  # noqa: E402
+from migrations import create_schema  # noqa: E402
+from models import Availability, Doctor, Patient, User  # noqa: E402
+
+
+def auth_headers(
+    user_id: str,
+    role: str,
+    doctor_id: Optional[str] = None,
+    patient_id: Optional[str] = None,
+) -> dict:
+    """
+    Build the Authorization header of a token with the login route's claims.
+
+    Args:
+        user_id (str): The ID of the user.
+        role (str): The role of the user.
+        doctor_id (Optional[str], optional): The doctor profile ID. Defaults to None.
+        patient_id (Optional[str], optional): The patient profile ID. Defaults to None.
+
+    Returns:
+        dict: The request headers.
+    """
+    token = create_access_token(
+        data={
+            "sub": user_id,
+            "role": role,
+            "doctor_id": doctor_id,
+            "patient_id": patient_id,
+        }
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="session")
+def client():
+    create_schema(engine, reset=True)
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def clean_database(client):
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    appointment_index.drop()
+    directory_cache.local.clear()
+    principal_cache.local.clear()
+    yield
+
+
+def add_doctor(db, name: str = "Doctor", specialization: str = "cardiology") -> Doctor:
+    """
+    Create a doctor available from 08:00 to 18:00 every day of the week.
+
+    Args:
+        db (Session): The database session.
+        name (str, optional): The doctor's first name. Defaults to "Doctor".
+        specialization (str, optional): The doctor's specialization. Defaults to "cardiology".
+
+    Returns:
+        Doctor: The new doctor.
+    """
+    user = User(
+        email=f"{name.lower()}-{os.urandom(4).hex()}@example.com",
+        first_name=name,
+        last_name="Tester",
+        hashed_password="not-a-real-hash",
+        role="doctor",
+    )
+    db.add(user)
+    db.flush()
+    doctor = Doctor(user_id=user.id, specialization=specialization)
+    db.add(doctor)
+    db.flush()
+    db.execute(
+        insert(Availability),
+        [
+            {
+                "doctor_id": doctor.id,
+                "weekday": weekday,
+                "start_time": time(8),
+                "end_time": time(18),
+                "available": True,
+            }
+            for weekday in WeekdayEnum
+        ],
+    )
+    db.commit()
+    return doctor
+
+
+def add_patient(db, name: str = "Patient") -> Patient:
+    """
+    Create a patient.
+
+    Args:
+        db (Session): The database session.
+        name (str, optional): The patient's first name. Defaults to "Patient".
+
+    Returns:
+        Patient: The new patient.
+    """
+    user = User(
+        email=f"{name.lower()}-{os.urandom(4).hex()}@example.com",
+        first_name=name,
+        last_name="Tester",
+        hashed_password="not-a-real-hash",
+        role="patient",
+    )
+    db.add(user)
+    db.flush()
+    patient = Patient(user_id=user.id)
+    db.add(patient)
+    db.commit()
+    return patient
+
+
+@pytest.fixture
+def doctor():
+    with SessionLocal() as db:
+        doctor = add_doctor(db)
+        return {
+            "id": doctor.id,
+            "user_id": doctor.user_id,
+            "headers": auth_headers(doctor.user_id, "doctor", doctor_id=doctor.id),
+        }
+
+
+@pytest.fixture
+def patient():
+    with SessionLocal() as db:
+        patient = add_patient(db)
+        return {
+            "id": patient.id,
+            "user_id": patient.user_id,
+            "headers": auth_headers(patient.user_id, "patient", patient_id=patient.id),
+        }
+
+
+@pytest.fixture
+def lagging_replica():
+    """
+    Route read replica sessions to an empty database, like a replica that
+    has not caught up with any write yet.
+    """
+    path = os.path.join(tempfile.mkdtemp(), "replica.db")
+    Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+    replica = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    sessions = async_sessionmaker(bind=replica, expire_on_commit=False)
+
+    async def get_lagging_db():
+        async with sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_read_db] = get_lagging_db
+    yield
+    del app.dependency_overrides[get_read_db]
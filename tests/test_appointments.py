@@ -0,0 +1,155 @@
+import asyncio
+from datetime import datetime
+
+from core.database import AsyncSessionLocal, SessionLocal
+from core.enums import AppointmentStatusEnum
+from core.interval_index import AppointmentIndexRegistry, appointment_index
+from models import Appointment
+
+
+def book(client, patient, doctor, start: str, end: str, status: str = "scheduled"):
+    return client.post(
+        "/patients/create-new-appointment",
+        headers=patient["headers"],
+        json={
+            "doctor_id": doctor["id"],
+            "scheduled_start": start,
+            "scheduled_end": end,
+            "status": status,
+        },
+    )
+
+
+def stored_times(doctor_id: str):
+    with SessionLocal() as db:
+        return sorted(
+            (a.scheduled_start, a.scheduled_end)
+            for a in db.query(Appointment).filter_by(doctor_id=doctor_id)
+        )
+
+
+def test_aware_booking_after_naive_booking(client, doctor, patient):
+    response = book(
+        client, patient, doctor, "2030-01-07T09:00:00", "2030-01-07T09:30:00"
+    )
+    assert response.status_code == 201
+
+    response = book(
+        client, patient, doctor, "2030-01-07T10:00:00Z", "2030-01-07T10:30:00Z"
+    )
+    assert response.status_code == 201
+
+    # 11:00+02:00 is 09:00 UTC, which the first booking holds
+    response = book(
+        client,
+        patient,
+        doctor,
+        "2030-01-07T11:00:00+02:00",
+        "2030-01-07T11:30:00+02:00",
+    )
+    assert response.status_code == 409
+
+    assert stored_times(doctor["id"]) == [
+        (datetime(2030, 1, 7, 9), datetime(2030, 1, 7, 9, 30)),
+        (datetime(2030, 1, 7, 10), datetime(2030, 1, 7, 10, 30)),
+    ]
+
+
+def test_naive_booking_after_aware_booking(client, doctor, patient):
+    response = book(
+        client,
+        patient,
+        doctor,
+        "2030-01-07T11:00:00+02:00",
+        "2030-01-07T11:30:00+02:00",
+    )
+    assert response.status_code == 201
+
+    response = book(
+        client, patient, doctor, "2030-01-07T10:00:00", "2030-01-07T10:30:00"
+    )
+    assert response.status_code == 201
+
+    response = book(
+        client, patient, doctor, "2030-01-07T09:15:00", "2030-01-07T09:45:00"
+    )
+    assert response.status_code == 409
+
+    assert stored_times(doctor["id"]) == [
+        (datetime(2030, 1, 7, 9), datetime(2030, 1, 7, 9, 30)),
+        (datetime(2030, 1, 7, 10), datetime(2030, 1, 7, 10, 30)),
+    ]
+
+
+def test_slot_freed_elsewhere_can_be_booked_again(client, doctor, patient):
+    response = book(
+        client, patient, doctor, "2030-01-07T09:00:00", "2030-01-07T09:30:00"
+    )
+    assert response.status_code == 201
+
+    # Deleted behind this worker's back, as another worker or a script would
+    with SessionLocal() as db:
+        db.query(Appointment).filter_by(doctor_id=doctor["id"]).delete()
+        db.commit()
+
+    response = book(
+        client, patient, doctor, "2030-01-07T09:00:00", "2030-01-07T09:30:00"
+    )
+    assert response.status_code == 201
+    assert stored_times(doctor["id"]) == [
+        (datetime(2030, 1, 7, 9), datetime(2030, 1, 7, 9, 30)),
+    ]
+
+
+def test_cancelled_booking_does_not_hold_its_slot(client, doctor, patient):
+    response = book(
+        client,
+        patient,
+        doctor,
+        "2030-01-07T09:00:00",
+        "2030-01-07T09:30:00",
+        status="cancelled",
+    )
+    assert response.status_code == 201
+
+    response = book(
+        client, patient, doctor, "2030-01-07T09:00:00", "2030-01-07T09:30:00"
+    )
+    assert response.status_code == 201
+
+
+def lookup(registry: AppointmentIndexRegistry, doctor_id: str):
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return await registry.lookup(db, doctor_id)
+
+    return asyncio.run(run())
+
+
+def test_index_expires_after_its_ttl(doctor):
+    registry = AppointmentIndexRegistry(ttl_seconds=0)
+    index = lookup(registry, doctor["id"])
+
+    assert lookup(registry, doctor["id"]) is not index
+
+
+def test_broadcast_invalidation_drops_the_index(doctor):
+    index = lookup(appointment_index, doctor["id"])
+    assert lookup(appointment_index, doctor["id"]) is index
+
+    appointment_index._on_message({"data": doctor["id"].encode()})
+
+    assert lookup(appointment_index, doctor["id"]) is not index
+
+
+def test_cancelled_appointments_are_not_recorded(doctor):
+    index = lookup(appointment_index, doctor["id"])
+
+    appointment_index.record(
+        doctor["id"],
+        datetime(2030, 1, 7, 9),
+        datetime(2030, 1, 7, 9, 30),
+        AppointmentStatusEnum.cancelled,
+    )
+
+    assert not index.overlaps(datetime(2030, 1, 7, 9), datetime(2030, 1, 7, 9, 30))
@@ -0,0 +1,47 @@
+import time
+
+from conftest import auth_headers
+from core.revocation import RevocationSet
+
+
+def test_deleted_user_tokens_are_rejected(client, doctor, patient):
+    admin = auth_headers("admin-id", "admin")
+
+    response = client.delete(f"/admin/delete-user/{patient['user_id']}", headers=admin)
+    assert response.status_code == 200
+
+    response = client.get("/patients/doctor/appointments", headers=patient["headers"])
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Token has been revoked"}
+
+
+def test_broadcast_revocations_are_applied():
+    revocations = RevocationSet(ttl_seconds=60)
+    revoked_at = time.time()
+
+    revocations._on_message({"data": f"user-1 {revoked_at}".encode()})
+
+    assert revocations.is_revoked("user-1", revoked_at - 1)
+    assert not revocations.is_revoked("user-1", revoked_at + 1)
+    assert not revocations.is_revoked("user-2", revoked_at - 1)
+
+
+class StoredRevocations:
+    def __init__(self, stored):
+        self.stored = stored
+
+    def scan_iter(self, match):
+        return [key.encode() for key in self.stored]
+
+    def get(self, key):
+        return self.stored.get(key.decode())
+
+
+def test_stored_revocations_are_loaded_on_subscribe():
+    revocations = RevocationSet(ttl_seconds=60)
+    revoked_at = time.time()
+
+    revocations._load(StoredRevocations({"revoked:user-1": str(revoked_at).encode()}))
+
+    assert revocations.is_revoked("user-1", revoked_at - 1)
+    assert not revocations.is_revoked("user-2", revoked_at - 1)
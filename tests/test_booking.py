@@ -0,0 +1,56 @@
+"""
+lock_doctor leaves the MySQL session's lock wait timeout as it found it.
+
+MySQL is not available here, so a session double records the statements
+lock_doctor issues for the mysql dialect.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from core.booking import lock_doctor
+
+
+class RecordingSession:
+    def __init__(self, lock_error=None):
+        self.bind = SimpleNamespace(dialect=SimpleNamespace(name="mysql"))
+        self.statements = []
+        self.lock_error = lock_error
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+
+    async def scalar(self, statement):
+        self.statements.append("SELECT ... FOR UPDATE")
+        if self.lock_error is not None:
+            raise self.lock_error
+        return "doctor-id"
+
+
+def assert_timeout_restored(statements):
+    assert statements[0].startswith("SET @booking_lock_wait_timeout")
+    assert statements[1] == "SELECT ... FOR UPDATE"
+    assert statements[2] == (
+        "SET SESSION innodb_lock_wait_timeout = @booking_lock_wait_timeout"
+    )
+
+
+def test_timeout_is_restored_after_the_lock_is_taken():
+    db = RecordingSession()
+
+    assert asyncio.run(lock_doctor(db, "doctor-id")) is True
+
+    assert_timeout_restored(db.statements)
+
+
+def test_timeout_is_restored_when_the_lock_wait_fails():
+    error = OperationalError("SELECT", {}, Exception(1205, "Lock wait timeout"))
+    db = RecordingSession(lock_error=error)
+
+    with pytest.raises(OperationalError):
+        asyncio.run(lock_doctor(db, "doctor-id"))
+
+    assert_timeout_restored(db.statements)
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from core.database import SessionLocal
+from models import Appointment
+
+MONDAY = datetime(2030, 1, 7, 9)
+
+
+def seed_week(doctor, patient):
+    with SessionLocal() as db:
+        db.execute(
+            insert(Appointment),
+            [
+                {
+                    "doctor_id": doctor["id"],
+                    "patient_id": patient["id"],
+                    "scheduled_start": MONDAY + timedelta(days=day),
+                    "scheduled_end": MONDAY + timedelta(days=day, minutes=30),
+                    "status": "scheduled",
+                }
+                for day in (0, 1, 1, 8)
+            ],
+        )
+        db.commit()
+
+
+def test_calendar_groups_a_window_by_day(client, doctor, patient):
+    seed_week(doctor, patient)
+
+    response = client.get(
+        "/doctors/calendar",
+        headers=doctor["headers"],
+        params={"from": "2030-01-07", "to": "2030-01-14"},
+    )
+
+    assert response.status_code == 200
+    assert [(d["day"], len(d["appointments"])) for d in response.json()] == [
+        ("2030-01-07", 1),
+        ("2030-01-08", 2),
+    ]
+
+
+def test_mixed_aware_and_naive_bounds(client, doctor, patient):
+    seed_week(doctor, patient)
+    window = {"from": "2030-01-07T02:00:00+02:00", "to": "2030-01-08T00:00:00"}
+
+    response = client.get(
+        "/patients/doctor/appointments", headers=patient["headers"], params=window
+    )
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 1
+
+    response = client.get(
+        "/patients/calendar", headers=patient["headers"], params=window
+    )
+    assert response.status_code == 200
+    assert [d["day"] for d in response.json()] == ["2030-01-07"]
+
+
+def test_window_ending_before_it_starts(client, doctor):
+    response = client.get(
+        "/doctors/appointments",
+        headers=doctor["headers"],
+        params={"from": "2030-01-07T00:00:00Z", "to": "2030-01-07T01:00:00+02:00"},
+    )
+
+    assert response.status_code == 400
@@ -0,0 +1,95 @@
+"""
+Digest flushes keep their notifications when the email cannot be sent.
+
+The buffer's Redis client is replaced by an in-memory list store with the
+few list commands the buffer uses.
+"""
+
+import smtplib
+
+import pytest
+
+from tasks import email
+from tasks.digest import digest_buffer
+
+
+class ListStore:
+    def __init__(self):
+        self.lists = {}
+
+    def rpush(self, key, *items):
+        self.lists.setdefault(key, []).extend(items)
+        return len(self.lists[key])
+
+    def lpush(self, key, *items):
+        for item in items:
+            self.lists.setdefault(key, []).insert(0, item)
+        return len(self.lists[key])
+
+    def lindex(self, key, index):
+        items = self.lists.get(key, [])
+        return items[index] if items else None
+
+    def pipeline(self, transaction=True):
+        return Pipeline(self)
+
+
+class Pipeline:
+    def __init__(self, store):
+        self.store = store
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def lrange(self, key, start, end):
+        self.commands.append(lambda: list(self.store.lists.get(key, [])))
+
+    def delete(self, key):
+        self.commands.append(lambda: int(self.store.lists.pop(key, None) is not None))
+
+    def execute(self):
+        return [command() for command in self.commands]
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = ListStore()
+    monkeypatch.setattr(digest_buffer, "_redis", store)
+    return store
+
+
+def subjects(recipient):
+    return [subject for subject, _, _ in digest_buffer.drain(recipient)]
+
+
+def test_failed_send_keeps_the_notifications(store, monkeypatch):
+    def fail(subject, recipient, body):
+        digest_buffer.push(recipient, "Third", "Buffered during the send")
+        raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+
+    monkeypatch.setattr(email, "send_email", fail)
+    digest_buffer.push("patient@example.com", "First", "One")
+    digest_buffer.push("patient@example.com", "Second", "Two")
+
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        email.flush_digest("patient@example.com")
+
+    assert subjects("patient@example.com") == ["First", "Second", "Third"]
+
+
+def test_sent_notifications_are_removed(store, monkeypatch):
+    sent = []
+    monkeypatch.setattr(
+        email, "send_email", lambda subject, recipient, body: sent.append(subject)
+    )
+    digest_buffer.push("patient@example.com", "First", "One")
+    digest_buffer.push("patient@example.com", "Second", "Two")
+
+    email.flush_digest("patient@example.com")
+
+    assert sent == ["You have 2 new notifications"]
+    assert store.lists == {}
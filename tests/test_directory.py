@@ -0,0 +1,143 @@
+import pytest
+from sqlalchemy import select
+
+from conftest import add_doctor, auth_headers
+from core.cache import directory_cache
+from core.database import SessionLocal
+from core.query_budget import query_budget
+from models import Availability
+
+
+def test_directory_is_rendered_from_the_primary(
+    client, doctor, patient, lagging_replica
+):
+    for path, headers in (
+        ("/patients/view-all-doctors", patient["headers"]),
+        ("/doctors/all-doctors", doctor["headers"]),
+    ):
+        response = client.get(path, headers=headers)
+
+        assert response.status_code == 200
+        assert [d["id"] for d in response.json()["items"]] == [doctor["id"]]
+
+
+@pytest.mark.parametrize("doctors", [2, 20])
+def test_doctor_reads_run_a_constant_number_of_statements(
+    client, doctor, patient, doctors
+):
+    with SessionLocal() as db:
+        for n in range(doctors - 1):
+            add_doctor(db, name=f"Doctor{n}")
+
+    for path, headers in (
+        ("/doctors/me", doctor["headers"]),
+        ("/doctors/all-doctors", doctor["headers"]),
+        ("/patients/view-all-doctors", patient["headers"]),
+    ):
+        directory_cache.local.clear()
+        with query_budget(2, max_repeats=1) as tracker:
+            response = client.get(path, headers=headers)
+
+        assert response.status_code == 200
+        assert len(tracker) == 2, path
+
+
+def directory_etag(client, headers) -> str:
+    response = client.get("/patients/view-all-doctors", headers=headers)
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+
+def test_unchanged_directory_is_not_modified(client, doctor, patient):
+    first = client.get("/patients/view-all-doctors", headers=patient["headers"])
+    etag = first.headers["ETag"]
+
+    response = client.get(
+        "/patients/view-all-doctors",
+        headers={**patient["headers"], "If-None-Match": etag},
+    )
+
+    assert first.headers["Cache-Control"] == "no-cache"
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert response.headers["Cache-Control"] == "no-cache"
+
+
+def test_stale_etag_gets_the_page(client, doctor, patient):
+    response = client.get(
+        "/patients/view-all-doctors",
+        headers={**patient["headers"], "If-None-Match": '"stale"'},
+    )
+
+    assert response.status_code == 200
+    assert [d["id"] for d in response.json()["items"]] == [doctor["id"]]
+
+
+def first_slot_id(doctor_id: str) -> str:
+    with SessionLocal() as db:
+        return db.scalar(
+            select(Availability.id).where(Availability.doctor_id == doctor_id)
+        )
+
+
+ADMIN = auth_headers("admin-id", "admin")
+MONDAY_EVENING = {"weekday": "monday", "start_time": "19:00", "end_time": "20:00"}
+
+WRITES = {
+    "register_new_doctor": lambda client, doctor: client.post(
+        "/admin/register-new-doctor",
+        headers=ADMIN,
+        json={
+            "email": "new-doctor@example.com",
+            "first_name": "New",
+            "last_name": "Doctor",
+            "role": "doctor",
+            "hashed_password": "password123",
+            "specialization": "Dermatology",
+        },
+    ),
+    "new_availability_slot": lambda client, doctor: client.post(
+        "/doctors/new-availability-slot",
+        headers=doctor["headers"],
+        json={**MONDAY_EVENING, "doctor_id": doctor["id"]},
+    ),
+    "doctor_availability_template": lambda client, doctor: client.post(
+        "/doctors/availability-template",
+        headers=doctor["headers"],
+        json={"slots": [MONDAY_EVENING]},
+    ),
+    "clinic_availability_template": lambda client, doctor: client.post(
+        "/admin/availability-template",
+        headers=ADMIN,
+        json={"doctor_ids": [doctor["id"]], "slots": [MONDAY_EVENING]},
+    ),
+    "change_availability": lambda client, doctor: client.patch(
+        f"/doctors/availability/change-availability/{first_slot_id(doctor['id'])}",
+        headers=doctor["headers"],
+    ),
+    "delete_availability": lambda client, doctor: client.delete(
+        f"/doctors/availability/delete-availability/{first_slot_id(doctor['id'])}",
+        headers=doctor["headers"],
+    ),
+    "delete_user": lambda client, doctor: client.delete(
+        f"/admin/delete-user/{doctor['user_id']}", headers=ADMIN
+    ),
+}
+
+
+@pytest.mark.parametrize("write", WRITES.values(), ids=WRITES.keys())
+def test_writes_invalidate_the_cached_directory(client, doctor, patient, write):
+    # Keeps the directory non-empty when the doctor is deleted
+    with SessionLocal() as db:
+        add_doctor(db, "Other")
+    etag = directory_etag(client, patient["headers"])
+
+    assert write(client, doctor).status_code in (200, 201)
+
+    response = client.get(
+        "/patients/view-all-doctors",
+        headers={**patient["headers"], "If-None-Match": etag},
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,84 @@
+import csv
+import io
+from datetime import datetime, timedelta
+
+import orjson
+import pytest
+from sqlalchemy import insert
+
+import core.export
+from conftest import auth_headers
+from core.database import SessionLocal
+from core.enums import AppointmentStatusEnum
+from models import Appointment
+
+ADMIN = auth_headers("admin-id", "admin")
+COLUMNS = [
+    "id",
+    "doctor_id",
+    "patient_id",
+    "scheduled_start",
+    "scheduled_end",
+    "status",
+]
+
+
+@pytest.fixture
+def appointments(doctor, patient, monkeypatch):
+    # Small batches, so the export spans several of them
+    monkeypatch.setattr(core.export, "EXPORT_BATCH_SIZE", 2)
+    start = datetime(2030, 1, 7, 9)
+    with SessionLocal() as db:
+        db.execute(
+            insert(Appointment),
+            [
+                {
+                    "doctor_id": doctor["id"],
+                    "patient_id": patient["id"],
+                    "scheduled_start": start + timedelta(hours=n),
+                    "scheduled_end": start + timedelta(hours=n, minutes=30),
+                    "status": AppointmentStatusEnum.scheduled,
+                }
+                for n in range(5)
+            ],
+        )
+        db.commit()
+    return 5
+
+
+def test_ndjson_export(client, appointments):
+    response = client.get("/admin/export/appointments", headers=ADMIN)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert (
+        response.headers["content-disposition"]
+        == 'attachment; filename="appointments.ndjson"'
+    )
+    rows = [orjson.loads(line) for line in response.content.splitlines()]
+    assert len(rows) == appointments
+    assert list(rows[0]) == COLUMNS
+    first = min(rows, key=lambda row: row["scheduled_start"])
+    assert first["scheduled_start"] == "2030-01-07T09:00:00"
+    assert {row["status"] for row in rows} == {"scheduled"}
+
+
+def test_csv_export(client, appointments):
+    response = client.get(
+        "/admin/export/appointments", params={"format": "csv"}, headers=ADMIN
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert (
+        response.headers["content-disposition"]
+        == 'attachment; filename="appointments.csv"'
+    )
+    header, *rows = csv.reader(io.StringIO(response.text))
+    assert header == COLUMNS
+    assert len(rows) == appointments
+    assert min(rows, key=lambda row: row[3])[3:] == [
+        "2030-01-07T09:00:00",
+        "2030-01-07T09:30:00",
+        "scheduled",
+    ]
@@ -0,0 +1,91 @@
+"""
+Metrics exposition, statement timing cleanup and multiprocess aggregation.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from core.database import timed_pool
+from core.instrumentation import instrument_engine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_requests_are_counted_by_route(client, doctor):
+    client.get("/doctors/me", headers=doctor["headers"])
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_requests_total{method="GET",route="/doctors/me",status="200"}'
+        in response.text
+    )
+
+
+def test_failed_statement_does_not_leave_its_start_time():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 1"))
+
+        assert conn.info["query_started"] == []
+
+
+def test_pool_checkouts_are_timed(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=timed_pool(QueuePool, "timed"),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    labels = {"pool": "timed"}
+
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    assert REGISTRY.get_sample_value("db_pool_checkout_timeouts_total", labels) == 1
+    assert REGISTRY.get_sample_value("db_pool_checkout_wait_seconds_count", labels) == 2
+    assert REGISTRY.get_sample_value("db_pool_checkout_wait_seconds_sum", labels) >= 0.1
+
+
+def run_python(code: str, multiproc_dir: str) -> str:
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=multiproc_dir)
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout
+
+
+def test_samples_are_summed_across_processes(tmp_path):
+    increment = (
+        "from core.metrics import Counter\n"
+        "Counter('test_jobs_total', 'Jobs run').inc()\n"
+    )
+    run_python(increment, str(tmp_path))
+    run_python(increment, str(tmp_path))
+
+    body = run_python(
+        "from core.metrics import render\nprint(render().decode())", str(tmp_path)
+    )
+
+    assert "test_jobs_total 2.0" in body
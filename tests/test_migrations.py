@@ -0,0 +1,64 @@
+import os
+import tempfile
+from datetime import datetime
+
+from sqlalchemy import create_engine, inspect, text
+
+from core.database import Base
+from migrations import MIGRATIONS, applied_versions, upgrade
+
+BASELINE_APPOINTMENTS = """
+CREATE TABLE appointments (
+    id VARCHAR(36) NOT NULL PRIMARY KEY,
+    doctor_id VARCHAR(36) REFERENCES doctors (id) ON DELETE CASCADE,
+    patient_id VARCHAR(36) REFERENCES patients (id) ON DELETE CASCADE,
+    scheduled_time DATETIME NOT NULL,
+    status VARCHAR(9)
+)
+"""
+
+
+def test_upgrades_a_database_with_the_original_appointments_table():
+    engine = create_engine(
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'baseline.db')}"
+    )
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE appointments"))
+        conn.execute(text(BASELINE_APPOINTMENTS))
+        conn.execute(
+            text(
+                "INSERT INTO appointments VALUES "
+                "('a1', NULL, NULL, '2030-01-07 09:00:00.000000', 'scheduled')"
+            )
+        )
+
+    assert upgrade(engine) == [m.VERSION for m in MIGRATIONS]
+
+    with engine.connect() as conn:
+        columns = {c["name"] for c in inspect(conn).get_columns("appointments")}
+        row = conn.execute(
+            text("SELECT scheduled_start, scheduled_end FROM appointments")
+        ).one()
+    assert {"scheduled_start", "scheduled_end"} <= columns
+    assert "scheduled_time" not in columns
+    assert row == ("2030-01-07 09:00:00.000000", "2030-01-07 09:30:00.000000")
+
+
+def test_first_migration_is_a_no_op_on_a_current_schema():
+    engine = create_engine(
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'current.db')}"
+    )
+    Base.metadata.create_all(engine)
+
+    upgrade(engine)
+
+    with engine.connect() as conn:
+        assert applied_versions(conn) == [m.VERSION for m in MIGRATIONS]
+        conn.execute(
+            text(
+                "INSERT INTO appointments (id, scheduled_start, scheduled_end) "
+                "VALUES ('a1', :start, :end)"
+            ),
+            {"start": datetime(2030, 1, 7, 9), "end": datetime(2030, 1, 7, 9, 30)},
+        )
@@ -0,0 +1,57 @@
+"""
+The outbox relay publishes pending messages in id order, one relay at a time.
+"""
+
+from contextlib import contextmanager
+
+from core.database import SessionLocal
+from models.outbox import OutboxMessage
+from tasks import outbox
+from tasks.email import send_welcome_email
+
+
+def enqueue(count: int):
+    with SessionLocal() as db:
+        for n in range(count):
+            outbox.enqueue_task(
+                db, send_welcome_email, email=f"{n}@example.com", first_name="Test"
+            )
+        db.commit()
+
+
+def pending() -> int:
+    with SessionLocal() as db:
+        return db.query(OutboxMessage).count()
+
+
+def test_relay_publishes_in_id_order(monkeypatch):
+    published = []
+    monkeypatch.setattr(
+        outbox.celery,
+        "send_task",
+        lambda name, kwargs, task_id: published.append(kwargs["email"]),
+    )
+    enqueue(3)
+
+    assert outbox.relay_batch() == 3
+
+    assert published == ["0@example.com", "1@example.com", "2@example.com"]
+    assert pending() == 0
+
+
+def test_relay_stays_idle_while_another_holds_the_lock(monkeypatch):
+    @contextmanager
+    def held_elsewhere():
+        yield False
+
+    published = []
+    monkeypatch.setattr(outbox, "relay_lock", held_elsewhere)
+    monkeypatch.setattr(
+        outbox.celery, "send_task", lambda *args, **kwargs: published.append(args)
+    )
+    enqueue(2)
+
+    assert outbox.relay_batch() == 0
+
+    assert published == []
+    assert pending() == 2
@@ -0,0 +1,111 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from core.database import SessionLocal
+from deps.pagination import decode_cursor, encode_cursor
+from models import Appointment
+
+ORDER = [Appointment.scheduled_start, Appointment.id]
+
+
+def add_appointments(doctor, patient, starts) -> list:
+    with SessionLocal() as db:
+        appointments = [
+            Appointment(
+                doctor_id=doctor["id"],
+                patient_id=patient["id"],
+                scheduled_start=start,
+                scheduled_end=start + timedelta(minutes=30),
+                status="scheduled",
+            )
+            for start in starts
+        ]
+        db.add_all(appointments)
+        db.commit()
+        return sorted((a.scheduled_start, a.id) for a in appointments)
+
+
+def walk(client, patient, limit: int) -> list:
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(
+            "/patients/doctor/appointments", headers=patient["headers"], params=params
+        )
+        assert response.status_code == 200
+        body = response.json()
+        pages.append([item["id"] for item in body["items"]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_pages_walk_every_row_once_with_tied_sort_keys(client, doctor, patient):
+    # Five appointments share a start, so only the id tells them apart
+    tied = datetime(2030, 1, 7, 9)
+    starts = [tied] * 5 + [tied + timedelta(hours=n) for n in (1, 2)]
+    expected = [
+        appointment_id
+        for _, appointment_id in add_appointments(doctor, patient, starts)
+    ]
+
+    pages = walk(client, patient, limit=2)
+
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+    assert [appointment_id for page in pages for appointment_id in page] == expected
+
+
+def test_last_full_page_has_no_cursor(client, doctor, patient):
+    add_appointments(doctor, patient, [datetime(2030, 1, 7, 9 + n) for n in range(4)])
+
+    # The second page ends the rows, so no empty third page is needed
+    assert [len(page) for page in walk(client, patient, limit=2)] == [2, 2]
+
+
+def test_datetime_cursor_round_trips_exactly():
+    start = datetime(2030, 1, 7, 9, 15, 30, 123456)
+
+    values = decode_cursor(encode_cursor([start, "appointment-1"]), ORDER)
+
+    assert values == [start, "appointment-1"]
+    assert isinstance(values[0], datetime)
+
+
+def encode(plain) -> str:
+    return base64.urlsafe_b64encode(json.dumps(plain).encode()).decode()
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor!",
+        base64.urlsafe_b64encode(b"{not json").decode(),
+        encode({"scheduled_start": "2030-01-07T09:00:00"}),
+        encode(["2030-01-07T09:00:00"]),
+        encode(["yesterday", "appointment-1"]),
+        encode([42, "appointment-1"]),
+    ],
+)
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, ORDER)
+
+    assert error.value.status_code == 400
+    assert error.value.detail == "Invalid cursor"
+
+
+def test_malformed_cursor_returns_400(client, patient):
+    response = client.get(
+        "/patients/doctor/appointments",
+        headers=patient["headers"],
+        params={"cursor": "not a cursor!"},
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
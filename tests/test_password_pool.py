@@ -0,0 +1,60 @@
+"""
+The password worker pool bounds its queue, records its timings and recovers
+from worker processes that die.
+"""
+
+import asyncio
+import time
+
+from fastapi import HTTPException
+from prometheus_client import REGISTRY
+
+from core.security import PasswordWorkerPool
+
+
+def sample(name: str, operation: str) -> float:
+    return REGISTRY.get_sample_value(name, {"operation": operation}) or 0.0
+
+
+def test_saturated_pool_rejects_with_503_and_records_timings():
+    pool = PasswordWorkerPool(workers=1, max_queue=1)
+
+    async def saturate():
+        return await asyncio.gather(
+            *(pool.run("saturate", time.sleep, 0.5) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    try:
+        results = asyncio.run(saturate())
+    finally:
+        pool.shutdown()
+
+    rejected = [r for r in results if isinstance(r, HTTPException)]
+    assert len(rejected) == 1
+    assert rejected[0].status_code == 503
+    assert rejected[0].headers == {"Retry-After": "1"}
+    assert sample("password_job_rejected_total", "saturate") == 1
+
+    assert sample("password_job_run_seconds_count", "saturate") == 2
+    assert sample("password_job_run_seconds_sum", "saturate") >= 1.0
+    # The queued job waited for the first one to finish
+    assert sample("password_job_wait_seconds_count", "saturate") == 2
+    assert sample("password_job_wait_seconds_sum", "saturate") >= 0.5
+
+
+def test_dead_worker_process_is_replaced():
+    pool = PasswordWorkerPool(workers=1, max_queue=1)
+
+    async def kill_worker_then_run():
+        await pool.run("recover", time.sleep, 0)
+        for process in list(pool._executor._processes.values()):
+            process.kill()
+            process.join()
+        await asyncio.sleep(0.2)
+        return await pool.run("recover", abs, -3)
+
+    try:
+        assert asyncio.run(kill_worker_then_run()) == 3
+    finally:
+        pool.shutdown()
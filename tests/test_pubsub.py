@@ -0,0 +1,82 @@
+"""
+The shared Redis subscriber dispatches by channel and backs off while
+Redis is unreachable.
+"""
+
+import socket
+
+from core.cache import directory_cache, principal_cache
+from core.pubsub import Subscriber, subscriber
+from schemas.auth import Principal
+
+
+def closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_messages_are_dispatched_by_channel():
+    received = []
+    subscriber = Subscriber(None)
+    subscriber.subscribe("a", lambda message: received.append(("a", message["data"])))
+    subscriber.subscribe("b", lambda message: received.append(("b", message["data"])))
+
+    subscriber._dispatch({"channel": b"b", "data": b"1"})
+    subscriber._dispatch({"channel": b"a", "data": b"2"})
+    subscriber._dispatch({"channel": b"other", "data": b"3"})
+
+    assert received == [("b", b"1"), ("a", b"2")]
+
+
+def test_failing_handler_does_not_stop_the_subscriber():
+    def fail(message):
+        raise ValueError("bad message")
+
+    subscriber = Subscriber(None)
+    subscriber.subscribe("a", fail)
+
+    subscriber._dispatch({"channel": b"a", "data": b"1"})
+
+
+def test_reconnects_with_exponential_backoff():
+    subscriber = Subscriber(f"redis://127.0.0.1:{closed_port()}/0", max_backoff=4.0)
+    subscriber.subscribe("a", lambda message: None)
+    delays = []
+
+    def wait(delay):
+        delays.append(delay)
+        if len(delays) == 5:
+            subscriber._stop.set()
+
+    subscriber._stop.wait = wait
+    subscriber._run()
+
+    assert delays == [1.0, 2.0, 4.0, 4.0, 4.0]
+
+
+def test_start_is_a_no_op_without_redis():
+    subscriber = Subscriber(None)
+    subscriber.subscribe("a", lambda message: None)
+
+    subscriber.start()
+
+    assert subscriber._thread is None
+
+
+def test_cache_invalidations_share_the_process_subscriber():
+    principal = Principal(
+        id="user-1",
+        email="user@example.com",
+        first_name="Test",
+        last_name="User",
+        role="patient",
+    )
+    principal_cache.local.set("user-1", principal)
+    directory_cache.local.set((directory_cache.version, "page"), (b"[]", '"etag"'))
+
+    subscriber._dispatch({"channel": b"principal-invalidations", "data": b"user-1"})
+    subscriber._dispatch({"channel": b"directory-invalidations", "data": b"bump"})
+
+    assert principal_cache.local.get("user-1") is None
+    assert directory_cache.get("page") is None
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import core.database
+from conftest import TEST_DB_PATH
+from core.query_budget import QueryBudgetExceeded, fingerprint, query_budget
+from models import User
+
+
+def test_fingerprint_ignores_literals():
+    assert fingerprint("SELECT * FROM users WHERE id = 'a' AND n IN (1, 2, 3)") == (
+        fingerprint("select *  from users where id = 'b' and n in (4)")
+    )
+
+
+def test_budget_counts_statements(client, patient):
+    with query_budget(10) as tracker:
+        client.get("/patients/doctor/appointments", headers=patient["headers"])
+    assert len(tracker) == 1
+
+    with pytest.raises(QueryBudgetExceeded):
+        with query_budget(0):
+            client.get("/patients/doctor/appointments", headers=patient["headers"])
+
+
+def test_budget_counts_read_replica_statements(monkeypatch):
+    replica = create_async_engine(f"sqlite+aiosqlite:///{TEST_DB_PATH}")
+    monkeypatch.setattr(core.database, "async_read_engine", replica)
+
+    async def read():
+        async with replica.connect() as conn:
+            await conn.execute(select(User.id))
+            await conn.execute(text("SELECT 1"))
+        await replica.dispose()
+
+    with pytest.raises(QueryBudgetExceeded, match="2 statements, budget is 1"):
+        with query_budget(1):
+            asyncio.run(read())
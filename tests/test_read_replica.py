@@ -0,0 +1,85 @@
+"""
+Replica routing as configured in production: READ_DB set in the environment
+before the app is imported, rather than a dependency override.
+"""
+
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import orjson
+from sqlalchemy import create_engine, insert
+
+from core.database import Base
+from models import Appointment, Doctor, Patient, User
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REQUEST = """
+from fastapi.testclient import TestClient
+from core.security import create_access_token
+from main import app
+
+token = create_access_token(
+    data={"sub": "doctor-user", "role": "doctor", "doctor_id": "doctor", "patient_id": None}
+)
+response = TestClient(app).get(
+    "/doctors/appointments", headers={"Authorization": f"Bearer {token}"}
+)
+print(response.status_code, response.text)
+"""
+
+
+def seed(url: str, appointment_ids):
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for user_id, role in (("doctor-user", "doctor"), ("patient-user", "patient")):
+            conn.execute(
+                insert(User).values(
+                    id=user_id,
+                    email=f"{user_id}@example.com",
+                    first_name="Test",
+                    last_name="User",
+                    hashed_password="not-a-real-hash",
+                    role=role,
+                )
+            )
+        conn.execute(
+            insert(Doctor).values(
+                id="doctor", user_id="doctor-user", specialization="Cardiology"
+            )
+        )
+        conn.execute(insert(Patient).values(id="patient", user_id="patient-user"))
+        for appointment_id in appointment_ids:
+            conn.execute(
+                insert(Appointment).values(
+                    id=appointment_id,
+                    doctor_id="doctor",
+                    patient_id="patient",
+                    scheduled_start=datetime(2030, 1, 7, 9),
+                    scheduled_end=datetime(2030, 1, 7, 10),
+                )
+            )
+    engine.dispose()
+
+
+def test_get_handlers_read_from_the_configured_replica(tmp_path):
+    primary = f"sqlite:///{tmp_path / 'primary.db'}"
+    replica = f"sqlite:///{tmp_path / 'replica.db'}"
+    seed(primary, ["on-primary"])
+    seed(replica, ["on-replica"])
+
+    result = subprocess.run(
+        [sys.executable, "-c", REQUEST],
+        cwd=ROOT,
+        env=dict(os.environ, PROD_DB=primary, READ_DB=replica),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    status, body = result.stdout.strip().split(" ", 1)
+    assert status == "200"
+    assert [item["id"] for item in orjson.loads(body)["items"]] == ["on-replica"]
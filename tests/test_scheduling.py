@@ -0,0 +1,283 @@
+from datetime import date, datetime, time
+
+from conftest import add_doctor, auth_headers
+from core.database import SessionLocal
+from core.enums import AppointmentStatusEnum, WeekdayEnum
+from core.scheduling import (
+    compute_free_slots,
+    find_slot_conflicts,
+    merge_intervals,
+    subtract_intervals,
+)
+from models import Appointment, Availability
+
+MON = WeekdayEnum.monday
+TUE = WeekdayEnum.tuesday
+
+
+def slot(weekday: WeekdayEnum, start: int, end: int):
+    return (weekday, time(start), time(end))
+
+
+# 2030-01-07 is a Monday
+MONDAY = date(2030, 1, 7)
+
+
+def at(hour: int, minute: int = 0, day: date = MONDAY) -> datetime:
+    return datetime.combine(day, time(hour, minute))
+
+
+def availability(weekday: WeekdayEnum, start: int, end: int) -> Availability:
+    return Availability(weekday=weekday, start_time=time(start), end_time=time(end))
+
+
+def test_merge_joins_overlapping_and_adjacent_intervals():
+    intervals = [
+        (at(11), at(12)),
+        (at(9), at(10)),
+        (at(10), at(10, 30)),
+        (at(9, 15), at(9, 45)),
+    ]
+
+    assert merge_intervals(intervals) == [(at(9), at(10, 30)), (at(11), at(12))]
+
+
+def test_adjacent_bookings_leave_no_gap():
+    windows = [(at(9), at(12))]
+    booked = merge_intervals([(at(9, 30), at(10)), (at(10), at(10, 30))])
+
+    assert subtract_intervals(windows, booked) == [
+        (at(9), at(9, 30)),
+        (at(10, 30), at(12)),
+    ]
+
+
+def test_booking_spanning_several_windows():
+    windows = [(at(8), at(10)), (at(11), at(13)), (at(14), at(16))]
+    booked = [(at(9), at(15)), (at(15, 30), at(17))]
+
+    assert subtract_intervals(windows, booked) == [
+        (at(8), at(9)),
+        (at(15), at(15, 30)),
+    ]
+
+
+def test_free_slots_per_day_across_a_range():
+    slots = [
+        availability(MON, 9, 12),
+        availability(MON, 14, 17),
+        availability(TUE, 9, 10),
+    ]
+    booked = [
+        (at(11), at(15)),
+        (at(9, day=date(2030, 1, 8)), at(10, day=date(2030, 1, 8))),
+    ]
+
+    free = compute_free_slots(slots, booked, MONDAY, date(2030, 1, 9))
+
+    assert free == {
+        MONDAY: [(at(9), at(11)), (at(15), at(17))],
+        date(2030, 1, 8): [],
+        date(2030, 1, 9): [],
+    }
+
+
+def test_empty_availability_has_no_free_slots():
+    booked = [(at(9), at(10))]
+
+    assert compute_free_slots([], booked, MONDAY, date(2030, 1, 8)) == {
+        MONDAY: [],
+        date(2030, 1, 8): [],
+    }
+
+
+def test_cancelled_appointments_do_not_take_free_time(client, doctor, patient):
+    with SessionLocal() as db:
+        for status, start in (
+            (AppointmentStatusEnum.cancelled, 9),
+            (AppointmentStatusEnum.scheduled, 10),
+        ):
+            db.add(
+                Appointment(
+                    doctor_id=doctor["id"],
+                    patient_id=patient["id"],
+                    scheduled_start=at(start),
+                    scheduled_end=at(start, 30),
+                    status=status,
+                )
+            )
+        db.commit()
+
+    response = client.get(
+        f"/patients/doctor/availability/{doctor['id']}",
+        headers=patient["headers"],
+        params={"start_date": "2030-01-07", "end_date": "2030-01-07"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "day": "2030-01-07",
+            "free_slots": [
+                {"start": "2030-01-07T08:00:00", "end": "2030-01-07T10:00:00"},
+                {"start": "2030-01-07T10:30:00", "end": "2030-01-07T18:00:00"},
+            ],
+        }
+    ]
+
+
+def test_touching_slots_do_not_conflict():
+    proposed = [slot(MON, 9, 12), slot(MON, 12, 15)]
+    existing = [slot(MON, 8, 9), slot(MON, 15, 17)]
+
+    assert find_slot_conflicts(proposed, existing) == []
+
+
+def test_overlaps_within_one_template():
+    proposed = [slot(MON, 9, 12), slot(MON, 11, 13), slot(MON, 10, 11)]
+
+    # Both slots are new, so each pair holds the later slot, then the one it hits
+    assert find_slot_conflicts(proposed) == [
+        (slot(MON, 10, 11), slot(MON, 9, 12)),
+        (slot(MON, 11, 13), slot(MON, 9, 12)),
+    ]
+
+
+def test_overlaps_with_existing_slots():
+    existing = [slot(MON, 9, 12), slot(MON, 14, 16)]
+    proposed = [slot(MON, 11, 13), slot(MON, 16, 17)]
+
+    assert find_slot_conflicts(proposed, existing) == [
+        (slot(MON, 9, 12), slot(MON, 11, 13))
+    ]
+
+
+def test_existing_slots_overlapping_each_other_are_not_reported():
+    existing = [slot(MON, 9, 12), slot(MON, 10, 11)]
+
+    assert find_slot_conflicts([slot(TUE, 9, 12)], existing) == []
+
+
+def test_different_weekdays_do_not_conflict():
+    proposed = [slot(MON, 9, 17), slot(TUE, 9, 17)]
+    existing = [slot(WeekdayEnum.wednesday, 9, 17)]
+
+    assert find_slot_conflicts(proposed, existing) == []
+
+
+def doctor_without_availability(name: str) -> dict:
+    with SessionLocal() as db:
+        doctor = add_doctor(db, name)
+        db.query(Availability).filter_by(doctor_id=doctor.id).delete()
+        db.commit()
+        return {
+            "id": doctor.id,
+            "headers": auth_headers(doctor.user_id, "doctor", doctor_id=doctor.id),
+        }
+
+
+def stored_slots(doctor_id: str) -> list:
+    with SessionLocal() as db:
+        return sorted(
+            (a.weekday, a.start_time, a.end_time)
+            for a in db.query(Availability).filter_by(doctor_id=doctor_id)
+        )
+
+
+def template(*slots) -> list:
+    return [
+        {"weekday": weekday.value, "start_time": start, "end_time": end}
+        for weekday, start, end in slots
+    ]
+
+
+def test_doctor_template_is_inserted(client):
+    doctor = doctor_without_availability("Templated")
+
+    response = client.post(
+        "/doctors/availability-template",
+        headers=doctor["headers"],
+        json={"slots": template((MON, "09:00", "12:00"), (TUE, "09:00", "12:00"))},
+    )
+
+    assert response.status_code == 201
+    assert response.json() == {"message": "Availability template created", "created": 2}
+    assert stored_slots(doctor["id"]) == [slot(MON, 9, 12), slot(TUE, 9, 12)]
+
+
+def test_doctor_template_overlapping_stored_slots_is_rejected(client):
+    doctor = doctor_without_availability("Overlapping")
+    client.post(
+        "/doctors/availability-template",
+        headers=doctor["headers"],
+        json={"slots": template((MON, "09:00", "12:00"))},
+    )
+
+    response = client.post(
+        "/doctors/availability-template",
+        headers=doctor["headers"],
+        json={"slots": template((MON, "11:00", "13:00"), (TUE, "09:00", "10:00"))},
+    )
+
+    assert response.status_code == 409
+    assert response.json() == {
+        "detail": {
+            "message": "Availability slots overlap",
+            "conflicts": [
+                {
+                    "doctor_id": doctor["id"],
+                    "weekday": "monday",
+                    "slot": "11:00:00-13:00:00",
+                    "overlaps": "09:00:00-12:00:00",
+                }
+            ],
+        }
+    }
+    assert stored_slots(doctor["id"]) == [slot(MON, 9, 12)]
+
+
+def test_clinic_template_is_inserted_for_every_doctor(client):
+    doctors = [doctor_without_availability(name) for name in ("First", "Second")]
+
+    response = client.post(
+        "/admin/availability-template",
+        headers=auth_headers("admin-id", "admin"),
+        json={
+            "doctor_ids": [doctor["id"] for doctor in doctors],
+            "slots": template((MON, "09:00", "12:00"), (MON, "12:00", "15:00")),
+        },
+    )
+
+    assert response.status_code == 201
+    assert response.json() == {"message": "Availability template created", "created": 4}
+    for doctor in doctors:
+        assert stored_slots(doctor["id"]) == [slot(MON, 9, 12), slot(MON, 12, 15)]
+
+
+def test_clinic_template_conflicting_for_one_doctor_inserts_nothing(client):
+    free, busy = (doctor_without_availability(name) for name in ("Free", "Busy"))
+    client.post(
+        "/doctors/availability-template",
+        headers=busy["headers"],
+        json={"slots": template((MON, "10:00", "11:00"))},
+    )
+
+    response = client.post(
+        "/admin/availability-template",
+        headers=auth_headers("admin-id", "admin"),
+        json={
+            "doctor_ids": [free["id"], busy["id"]],
+            "slots": template((MON, "09:00", "12:00")),
+        },
+    )
+
+    assert response.status_code == 409
+    assert response.json()["detail"]["conflicts"] == [
+        {
+            "doctor_id": busy["id"],
+            "weekday": "monday",
+            "slot": "09:00:00-12:00:00",
+            "overlaps": "10:00:00-11:00:00",
+        }
+    ]
+    assert stored_slots(free["id"]) == []
@@ -0,0 +1,130 @@
+import pytest
+
+from conftest import add_doctor, auth_headers
+from core.database import SessionLocal
+from core.search import SpecializationIndex, specialization_index
+
+
+def build(*doctors) -> SpecializationIndex:
+    index = SpecializationIndex(refresh_seconds=300)
+    index.rebuild(list(doctors))
+    return index
+
+
+def test_exact_then_prefix_then_word_prefix():
+    index = build(
+        ("d1", "surgery"),
+        ("d2", "surgery oncology"),
+        ("d3", "general surgery"),
+        ("d4", "general surgery"),
+        ("d5", "cardiology"),
+    )
+
+    assert index.search("Surgery") == [
+        ("surgery", 1, "exact"),
+        ("surgery oncology", 1, "prefix"),
+        ("general surgery", 2, "word_prefix"),
+    ]
+
+
+def test_ties_are_ranked_by_doctor_count():
+    index = build(
+        ("d1", "cardiology"),
+        ("d2", "cardiac surgery"),
+        ("d3", "cardiac surgery"),
+    )
+
+    assert index.search("card") == [
+        ("cardiac surgery", 2, "prefix"),
+        ("cardiology", 1, "prefix"),
+    ]
+
+
+def test_typos_fall_back_to_edit_distance():
+    index = build(("d1", "cardiology"), ("d2", "dermatology"), ("d3", "neurology"))
+
+    assert index.search("cardiolgy") == [("cardiology", 1, "fuzzy")]
+    assert index.search("nuerology") == [("neurology", 1, "fuzzy")]
+
+
+def test_short_queries_allow_a_single_edit():
+    index = build(("d1", "ent"), ("d2", "eye"))
+
+    assert index.search("ant") == [("ent", 1, "fuzzy")]
+    assert index.search("axt") == []
+
+
+def test_fuzzy_is_only_used_without_prefix_matches():
+    index = build(("d1", "cardiology"), ("d2", "cardiologist"))
+
+    assert [kind for _, _, kind in index.search("cardiolog")] == ["prefix", "prefix"]
+
+
+def test_add_and_remove_update_the_counts():
+    index = build(("d1", "cardiology"))
+
+    index.add("d2", "cardiology")
+    index.add("d3", "neurology")
+    assert index.search("cardiology") == [("cardiology", 2, "exact")]
+
+    index.remove("d1")
+    index.remove("d2")
+    assert index.search("cardiology") == []
+    assert index.search("neuro") == [("neurology", 1, "prefix")]
+
+
+def test_moving_a_doctor_drops_the_old_term():
+    index = build(("d1", "cardiology"))
+
+    index.add("d1", "neurology")
+
+    assert index.search("cardio") == []
+    assert index.search("neuro") == [("neurology", 1, "prefix")]
+
+
+def test_reload_racing_a_local_add_keeps_the_add():
+    index = build()
+    writes = index._writes
+
+    index.add("d1", "cardiology")
+
+    assert not index.rebuild([], writes)
+    assert index.search("cardiology") == [("cardiology", 1, "exact")]
+
+
+@pytest.fixture
+def fresh_index(monkeypatch):
+    monkeypatch.setattr(specialization_index, "_loaded_at", None)
+    return specialization_index
+
+
+def test_reload_reads_the_specialization_key_set_by_the_model(client, fresh_index):
+    with SessionLocal() as db:
+        doctor = add_doctor(db, "Heart", specialization="Cardiology.")
+        assert doctor.specialization_key == "cardiology"
+
+    response = client.get(
+        "/doctors/search",
+        params={"q": "cardio"},
+        headers=auth_headers("admin-id", "admin"),
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"specialization": "cardiology", "doctors": 1, "match": "prefix"}
+    ]
+
+
+def test_reload_reads_the_primary(client, fresh_index, lagging_replica):
+    with SessionLocal() as db:
+        add_doctor(db, "Brain", specialization="Neurology")
+
+    response = client.get(
+        "/doctors/search",
+        params={"q": "neurology"},
+        headers=auth_headers("admin-id", "admin"),
+    )
+
+    assert response.json() == [
+        {"specialization": "neurology", "doctors": 1, "match": "exact"}
+    ]
@@ -0,0 +1,158 @@
+"""
+SMTPConnectionPool against a local aiosmtpd server.
+
+Each session is told apart by the client's address as the server sees it.
+"""
+
+import smtplib
+import socket
+import threading
+import time
+from email.message import EmailMessage
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from tasks.smtp import SMTPConnectionPool
+
+REJECTED = "rejected@example.com"
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.delivered = []
+        self.noops = 0
+        self.connections = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == REJECTED:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.delivered.append((session.peer, envelope.rcpt_tos))
+        self.connections.append(server)
+        return "250 Message accepted"
+
+    async def handle_NOOP(self, server, session, envelope, arg):
+        self.noops += 1
+        return "250 OK"
+
+    def sessions(self):
+        return list(dict.fromkeys(peer for peer, _ in self.delivered))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller
+    controller.stop()
+
+
+def drop_connections(server):
+    """
+    Close every session from the server side, as a provider timing out would.
+    """
+    done = threading.Event()
+
+    def close():
+        for connection in server.handler.connections:
+            if connection.transport is not None:
+                connection.transport.close()
+        done.set()
+
+    server.loop.call_soon_threadsafe(close)
+    done.wait(5)
+    time.sleep(0.1)
+
+
+def make_pool(server, **options) -> SMTPConnectionPool:
+    options.setdefault("healthcheck_after", 60.0)
+    return SMTPConnectionPool(
+        host=server.hostname, port=server.port, use_ssl=False, size=1, **options
+    )
+
+
+def message(to: str = "someone@example.com") -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "clinic@example.com"
+    msg["To"] = to
+    msg["Subject"] = "Appointment"
+    msg.set_content("See you soon.")
+    return msg
+
+
+def test_sessions_are_reused(server):
+    pool = make_pool(server)
+
+    pool.send([message()])
+    pool.send([message()])
+
+    assert len(server.handler.sessions()) == 1
+    pool.close()
+
+
+def test_reconnects_after_the_server_drops_the_connection(server):
+    pool = make_pool(server)
+    pool.send([message()])
+
+    drop_connections(server)
+
+    assert pool.send([message()]) == 1
+    assert len(server.handler.delivered) == 2
+    assert len(server.handler.sessions()) == 2
+    pool.close()
+
+
+def test_idle_session_is_checked_with_noop(server):
+    pool = make_pool(server, healthcheck_after=0.0)
+
+    pool.send([message()])
+    pool.send([message()])
+
+    assert server.handler.noops == 1
+    assert len(server.handler.sessions()) == 1
+    pool.close()
+
+
+def test_dead_idle_session_is_replaced_on_checkout(server):
+    pool = make_pool(server, healthcheck_after=0.0)
+    pool.send([message()])
+
+    drop_connections(server)
+
+    assert pool.send([message()]) == 1
+    assert len(server.handler.sessions()) == 2
+    pool.close()
+
+
+def test_sessions_are_recycled_after_max_messages(server):
+    pool = make_pool(server, max_messages=2)
+
+    assert pool.send([message() for _ in range(5)]) == 5
+
+    peers = [peer for peer, _ in server.handler.delivered]
+    assert [peers.count(peer) for peer in server.handler.sessions()] == [2, 2, 1]
+    pool.close()
+
+
+def test_rejected_recipient_keeps_the_session(server):
+    pool = make_pool(server)
+    pool.send([message()])
+
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        pool.send([message(to=REJECTED)])
+    pool.send([message()])
+
+    assert len(server.handler.delivered) == 2
+    assert len(server.handler.sessions()) == 1
+    pool.close()